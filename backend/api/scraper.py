@@ -1,29 +1,114 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from ..schemas.scraper import ScraperRequest, ScraperResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from ..schemas.scraper import ScraperRequest, ScraperResponse, JobResponse
 from ..services.scraper import scraper_service
+from ..services.jobs import job_manager
+from utils.jobs import JobManagerClosedError, JobQueueFullError
+from utils.search_cache import search_cache
+from utils.http_client import http_client
+from utils.circuit_breaker import circuit_breakers
+from utils.export import EXPORT_FORMATS, split_export_name
+import asyncio
 import os
+import json
 
 router = APIRouter()
 
 @router.post("/run-scraper", response_model=ScraperResponse)
 async def run_scraper(request: ScraperRequest):
     try:
-        results = scraper_service.run_scraper(request.query)
+        results = await scraper_service.run_scraper_async(request.query)
         return results
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/run-scraper/stream")
+async def stream_scraper(request: ScraperRequest, http_request: Request):
+    """
+    Streams leads, per-platform summaries and errors as each platform finishes.
+    Sends server-sent events when the client accepts text/event-stream, NDJSON otherwise.
+    """
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+
+    async def body():
+        async for event in scraper_service.stream_scraper(request.query):
+            payload = json.dumps(event)
+            if use_sse:
+                yield f"event: {event['event']}\ndata: {payload}\n\n"
+            else:
+                yield payload + "\n"
+
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+@router.post("/jobs", response_model=JobResponse, status_code=202)
+def submit_job(request: ScraperRequest):
+    try:
+        return job_manager.submit("run-scraper", {"query": request.query})
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except JobManagerClosedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/jobs/{job_id}/result", response_model=ScraperResponse)
+def get_job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != job_manager.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}; no result available")
+    return job_manager.result(job_id)
+
+@router.delete("/jobs/{job_id}", response_model=JobResponse)
+def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/search-cache/stats")
+def get_search_cache_stats():
+    return search_cache.stats()
+
+@router.get("/http-cache/stats")
+def get_http_cache_stats():
+    return http_client.cache.stats() if http_client.cache else {}
+
+@router.get("/circuit-breakers")
+def get_circuit_breakers():
+    return circuit_breakers.states()
+
 @router.get("/download-excel")
-async def download_excel(filename: str):
+async def download_excel(filename: str, request: Request):
+    """
+    Downloads a run's export; the extension picks the format (.xlsx, .csv, .ndjson,
+    .csv.gz or .ndjson.gz). Exports are generated once per run and format, and carry an
+    ETag, so polling clients revalidate with If-None-Match and get a 304.
+    """
     try:
         # Basic security check to prevent directory traversal
         if ".." in filename or "/" in filename:
             raise HTTPException(status_code=400, detail="Invalid filename")
 
+        # Files written before runs were kept in the store
         file_path = scraper_service.get_excel_path(filename)
         if os.path.exists(file_path):
-            return FileResponse(file_path, media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', filename=filename)
+            return FileResponse(file_path, media_type=EXPORT_FORMATS.get(split_export_name(filename)[1], "application/octet-stream"), filename=filename)
+
+        # Generating an export on first request blocks, so it runs off the event loop
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(scraper_service.executor, scraper_service.download_response, filename, request.headers)
+        if response is not None:
+            return response
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
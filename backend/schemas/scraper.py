@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Optional, Dict, Any
 
 class ScraperRequest(BaseModel):
     query: str
@@ -10,3 +10,14 @@ class ScraperResponse(BaseModel):
     pagination: Dict[str, bool]
     errors: list
     filename: Optional[str] = None
+
+class JobResponse(BaseModel):
+    job_id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
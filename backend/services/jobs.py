@@ -0,0 +1,5 @@
+from utils.jobs import JobManager
+from .scraper import scraper_service
+
+job_manager = JobManager(db_path="output/jobs.sqlite3", max_workers=4, job_ttl=7 * 24 * 3600)
+job_manager.register("run-scraper", lambda params: scraper_service.run_scraper(params["query"]))
@@ -1,35 +1,93 @@
-import pandas as pd
 import os
 import time
+import uuid
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from orchestrator import scrape_orchestrator
+from utils.search_cache import normalize_query
+from utils.single_flight import single_flight
+from utils.lead_store import LeadStore
+from utils.export import split_export_name
+from utils.export_cache import ExportCache, export_response
 import scrapers # Import the scrapers package to ensure registration
 
 class ScraperService:
+    OUTPUT_DIR = "output"
+
+    def __init__(self, max_workers: int = 32, store: LeadStore = None):
+        """
+        Args:
+            max_workers: Size of the executor that runs blocking scrapers and exports for the
+                async path. Scrapers use at most the orchestrator's `max_in_flight` of its
+                threads across all in-flight requests, timed-out ones included, so storing
+                and exporting results always has threads left.
+            store: Where run results are kept. Defaults to a store in the output directory.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scraper-service")
+        self.store = store or LeadStore(os.path.join(self.OUTPUT_DIR, "leads.sqlite3"))
+        self.exports = ExportCache(os.path.join(self.OUTPUT_DIR, "exports"))
+
     def run_scraper(self, query: str) -> dict:
+        # Requests for the same query that arrive while it is running share its result
+        return single_flight.do(("run-scraper", normalize_query(query)), self._run_scraper, query)
+
+    async def run_scraper_async(self, query: str) -> dict:
+        """Same as `run_scraper`, but scraping and storing the results never block the event loop."""
+        return await single_flight.ado(("run-scraper", normalize_query(query)), lambda: self._run_scraper_async(query))
+
+    def _run_scraper(self, query: str) -> dict:
         print(f"Running scrapers for query: {query}")
 
         aggregated_results = scrape_orchestrator.run(query)
+        return self._store_results(aggregated_results)
+
+    async def _run_scraper_async(self, query: str) -> dict:
+        print(f"Running scrapers for query: {query}")
 
+        aggregated_results = await scrape_orchestrator.arun(query, executor=self.executor)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._store_results, aggregated_results)
+
+    async def stream_scraper(self, query: str):
+        """Yields orchestrator events as platforms finish. Streamed runs are not stored."""
+        print(f"Streaming scrapers for query: {query}")
+
+        async for event in scrape_orchestrator.astream(query, executor=self.executor):
+            yield event
+
+    def _store_results(self, aggregated_results: dict) -> dict:
+        """
+        Appends the run's results to the store under a new run id. The run's Excel file is
+        only generated when it is downloaded (see `download_response`); its name is returned as
+        `filename`.
+        """
         all_results = []
         for platform, platform_results in aggregated_results['platforms'].items():
             all_results.extend(platform_results)
 
         if all_results:
-            df = pd.DataFrame(all_results)
-            output_dir = "output"
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-
+            # Concurrent requests can finish within the same second, so the id needs a unique suffix
             timestamp = int(time.time())
-            filename = f"{output_dir}/aggregated_output_{timestamp}.xlsx"
-            df.to_excel(filename, index=False)
-            aggregated_results['filename'] = os.path.basename(filename)
+            run_id = f"aggregated_output_{timestamp}_{uuid.uuid4().hex[:8]}"
+            self.store.append(all_results, run_id=run_id)
+            aggregated_results['filename'] = f"{run_id}.xlsx"
         else:
             aggregated_results['filename'] = None
 
         return aggregated_results
 
     def get_excel_path(self, filename: str) -> str:
-        return f"output/{filename}"
+        return f"{self.OUTPUT_DIR}/{filename}"
+
+    def download_response(self, filename: str, request_headers):
+        """
+        Download response for a run's export (see `export_response`), with an ETag, Range
+        support and gzip for clients that accept it. None if the run is unknown.
+        """
+        run_id, fmt = split_export_name(filename)
+        digest = self.store.digest(run_id) if run_id and fmt else None
+        if digest is None:
+            return None
+        return export_response(request_headers, self.exports, digest, fmt, filename, lambda variant: self.store.stream_export(variant, run_id=run_id))
 
 scraper_service = ScraperService()
@@ -0,0 +1,147 @@
+"""
+Deduplication benchmark.
+
+Generates synthetic leads with a known share of duplicates (same website, or same
+company and city) and runs them through `Deduplicator.deduplicate`, reporting wall time,
+leads/sec and the peak memory the call allocates on top of its input. Exits non-zero if
+the run goes over the time or memory budget, so it can guard against quadratic merges or
+per-merge copies creeping back in.
+
+Peak memory is measured by tracemalloc in a separate, untimed run, since tracing slows
+allocation-heavy code down several times.
+
+    python -m benchmarks.dedup
+    python -m benchmarks.dedup --leads 200000 --max-seconds 5 --output /tmp/dedup.json
+    python -m benchmarks.dedup --leads 100000 --fuzzy-threshold 0.8 --output /tmp/fuzzy.json
+    python -m benchmarks.dedup --columnar --output /tmp/columnar.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.modules.deduplicator import Deduplicator
+from src.agent.models.lead import Lead
+from src.agent.models.lead_batch import LeadBatch
+
+DEFAULT_OUTPUT = os.path.join(ROOT, "benchmarks", "results", "dedup.json")
+SOURCES = ("google", "linkedin", "facebook", "instagram", "google_maps")
+CITIES = ("London", "Leeds", "Bristol", "Dubai", "Lahore", "Austin")
+
+def synthetic_leads(count: int, duplicate_ratio: float = 0.3, seed: int = 0) -> list:
+    """
+    `count` leads of which about `duplicate_ratio` repeat an earlier lead's website or
+    company and city, with some fields left empty so merging has gaps to fill.
+    """
+    rng = random.Random(seed)
+    timestamp = "2024-01-01T00:00:00"
+    leads = []
+    for i in range(count):
+        if leads and rng.random() < duplicate_ratio:
+            original = leads[rng.randrange(len(leads))]
+            by_website = original.website and rng.random() < 0.5
+            leads.append(Lead(
+                name=f"Contact {i}",
+                company=original.company if not by_website else f"{original.company} Ltd",
+                city=original.city if not by_website else None,
+                email=f"contact{i}@example.com" if rng.random() < 0.5 else None,
+                website=original.website if by_website else None,
+                source=rng.choice(SOURCES),
+                linkedin_profile=f"https://linkedin.com/in/contact-{i}" if rng.random() < 0.2 else None,
+                timestamp=timestamp,
+            ))
+        else:
+            leads.append(Lead(
+                name=f"Contact {i}",
+                company=f"Company {i}",
+                city=rng.choice(CITIES),
+                phone=f"555-{i % 10000:04d}" if rng.random() < 0.5 else None,
+                website=f"https://company{i}.example" if rng.random() < 0.8 else None,
+                source=rng.choice(SOURCES),
+                timestamp=timestamp,
+            ))
+    return leads
+
+def _round(value: float) -> float:
+    # Three significant digits keep run-to-run noise out of diffs
+    return float(f"{value:.3g}")
+
+def run_benchmark(count: int, duplicate_ratio: float = 0.3, seed: int = 0, fuzzy_threshold: float = None, columnar: bool = False) -> dict:
+    leads = synthetic_leads(count, duplicate_ratio, seed)
+    deduplicator = Deduplicator(fuzzy_threshold=fuzzy_threshold)
+    if columnar:
+        leads = LeadBatch.from_leads(leads)
+        deduplicate = deduplicator.deduplicate_batch
+    else:
+        deduplicate = deduplicator.deduplicate
+
+    started = time.perf_counter()
+    unique = deduplicate(leads)
+    elapsed = time.perf_counter() - started
+    unique_count = len(unique)
+    del unique
+
+    tracemalloc.start()
+    deduplicate(leads)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "leads": count,
+        "fuzzy_threshold": fuzzy_threshold,
+        "columnar": columnar,
+        "unique_leads": unique_count,
+        "seconds": _round(elapsed),
+        "leads_per_sec": _round(count / elapsed) if elapsed else None,
+        "peak_memory_mb": _round(peak / 1e6),
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+    }
+
+def over_budget(result: dict, max_seconds: float = None, max_memory_mb: float = None) -> list:
+    problems = []
+    if max_seconds is not None and result["seconds"] > max_seconds:
+        problems.append(f"took {result['seconds']}s, budget {max_seconds}s")
+    if max_memory_mb is not None and result["peak_memory_mb"] > max_memory_mb:
+        problems.append(f"peaked at {result['peak_memory_mb']} MB, budget {max_memory_mb} MB")
+    return problems
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark lead deduplication on synthetic leads.")
+    parser.add_argument("--leads", type=int, default=1_000_000, help="Number of synthetic leads.")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3, help="Share of leads that duplicate an earlier one.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fuzzy-threshold", type=float, help="Also merge near-duplicate company names.")
+    parser.add_argument("--columnar", action="store_true", help="Deduplicate a LeadBatch instead of Lead objects.")
+    parser.add_argument("--max-seconds", type=float, default=30.0, help="Fail if deduplication takes longer.")
+    parser.add_argument("--max-memory-mb", type=float, default=1024.0, help="Fail if deduplication allocates more at peak.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the JSON results.")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args.leads, args.duplicate_ratio, args.seed, args.fuzzy_threshold, args.columnar)
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+    print(f"{result['leads']} leads -> {result['unique_leads']} unique in {result['seconds']}s "
+          f"({result['leads_per_sec']} leads/s, {result['peak_memory_mb']} MB peak)")
+    print(f"Results written to {args.output}")
+
+    problems = over_budget(result, args.max_seconds, args.max_memory_mb)
+    for problem in problems:
+        print(f"OVER BUDGET {problem}")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Export benchmark.
+
+Fills a temporary `LeadStore` with synthetic leads and streams it out in each export
+format, reporting wall time, leads/sec, output size and the peak memory the export
+allocates. Exits non-zero if an export goes over the time or memory budget, so it can
+guard against exports that build the whole file, or the whole result set, in memory.
+
+Peak memory is measured by tracemalloc in a separate, untimed run, since tracing slows
+allocation-heavy code down several times.
+
+    python -m benchmarks.export
+    python -m benchmarks.export --leads 100000 --formats xlsx csv.gz --output /tmp/export.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils.export import EXPORT_FORMATS
+from utils.lead_store import LeadStore
+from benchmarks.dedup import CITIES, SOURCES
+
+DEFAULT_OUTPUT = os.path.join(ROOT, "benchmarks", "results", "export.json")
+BATCH_SIZE = 10_000
+
+def fill_store(store: LeadStore, count: int):
+    """Appends `count` leads shaped like the agent's, some with empty fields, in batches."""
+    for start in range(0, count, BATCH_SIZE):
+        store.append([
+            {
+                "name": f"Contact {i}",
+                "company": f"Company {i}",
+                "city": CITIES[i % len(CITIES)],
+                "title": "Owner" if i % 3 == 0 else None,
+                "email": f"contact{i}@company{i}.example" if i % 2 == 0 else None,
+                "phone": f"555-{i % 10000:04d}",
+                "website": f"https://company{i}.example",
+                "source": SOURCES[i % len(SOURCES)],
+                "linkedin_profile": None,
+                "notes": "Found via <search> & \"maps\"" if i % 7 == 0 else None,
+                "timestamp": "2024-01-01T00:00:00",
+            }
+            for i in range(start, min(start + BATCH_SIZE, count))
+        ])
+
+def _round(value: float) -> float:
+    # Three significant digits keep run-to-run noise out of diffs
+    return float(f"{value:.3g}")
+
+def _drain(store: LeadStore, fmt: str) -> int:
+    size = 0
+    for chunk in store.stream_export(fmt):
+        size += len(chunk)
+    return size
+
+def run_benchmark(count: int, formats: list) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        store = LeadStore(os.path.join(directory, "leads.sqlite3"))
+        fill_store(store, count)
+        results = {}
+        for fmt in formats:
+            started = time.perf_counter()
+            size = _drain(store, fmt)
+            elapsed = time.perf_counter() - started
+
+            tracemalloc.start()
+            _drain(store, fmt)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results[fmt] = {
+                "seconds": _round(elapsed),
+                "leads_per_sec": _round(count / elapsed) if elapsed else None,
+                "output_mb": _round(size / 1e6),
+                "peak_memory_mb": _round(peak / 1e6),
+            }
+        store.close()
+
+    return {
+        "leads": count,
+        "formats": results,
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+    }
+
+def over_budget(result: dict, max_seconds: float = None, max_memory_mb: float = None) -> list:
+    problems = []
+    for fmt, metrics in result["formats"].items():
+        if max_seconds is not None and metrics["seconds"] > max_seconds:
+            problems.append(f"{fmt} took {metrics['seconds']}s, budget {max_seconds}s")
+        if max_memory_mb is not None and metrics["peak_memory_mb"] > max_memory_mb:
+            problems.append(f"{fmt} peaked at {metrics['peak_memory_mb']} MB, budget {max_memory_mb} MB")
+    return problems
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark streaming exports of the lead store.")
+    parser.add_argument("--leads", type=int, default=1_000_000, help="Number of synthetic leads in the store.")
+    parser.add_argument("--formats", nargs="+", default=list(EXPORT_FORMATS), choices=list(EXPORT_FORMATS))
+    parser.add_argument("--max-seconds", type=float, default=120.0, help="Fail if an export takes longer.")
+    parser.add_argument("--max-memory-mb", type=float, default=32.0, help="Fail if an export allocates more at peak.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the JSON results.")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args.leads, args.formats)
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+    for fmt, metrics in result["formats"].items():
+        print(f"{fmt}: {result['leads']} leads in {metrics['seconds']}s ({metrics['leads_per_sec']} leads/s, "
+              f"{metrics['output_mb']} MB written, {metrics['peak_memory_mb']} MB peak)")
+    print(f"Results written to {args.output}")
+
+    problems = over_budget(result, args.max_seconds, args.max_memory_mb)
+    for problem in problems:
+        print(f"OVER BUDGET {problem}")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
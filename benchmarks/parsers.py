@@ -0,0 +1,215 @@
+"""
+Offline parser benchmarks.
+
+Replays a corpus of saved pages through every registered scraper's
+`_parse_search_results` / `_parse_profile_page`, the `src/agent/sources` extraction
+logic and the contact extractor, once per HTML parser backend, and reports pages/sec,
+MB/sec and peak memory. Results are written as sorted, indented JSON so two runs can be
+compared with `git diff` or with `--compare`.
+
+Peak memory is what tracemalloc sees for one warmed-up pass over the corpus, i.e. Python objects;
+memory that lxml and lexbor allocate internally is not included.
+
+    python -m benchmarks.parsers
+    python -m benchmarks.parsers --backends lxml selectolax --mmap
+    python -m benchmarks.parsers --output /tmp/new.json --compare benchmarks/results/parsers.json
+"""
+import argparse
+import glob
+import hashlib
+import json
+import mmap
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import utils.html_parser as html_parser
+from utils.html_parser import parse_html, available_backends
+from utils.contacts import extract_contacts
+from scrapers.registry import scraper_registry
+import scrapers  # noqa: F401  (registers the scrapers)
+from src.agent.sources.google_scraper import GoogleScraper
+from src.agent.sources.linkedin_public_scraper import LinkedInPublicScraper
+
+DEFAULT_CORPUS = [os.path.join(ROOT, "*_results.html"), os.path.join(ROOT, "tests", "samples", "*.html")]
+DEFAULT_OUTPUT = os.path.join(ROOT, "benchmarks", "results", "parsers.json")
+
+class CorpusPage:
+    """A saved page, read into memory or memory-mapped."""
+
+    def __init__(self, path: str, use_mmap: bool = False):
+        self.path = path
+        self.name = os.path.relpath(path, ROOT)
+        with open(path, "rb") as f:
+            if use_mmap and os.path.getsize(path) > 0:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.data = self._mmap
+            else:
+                self._mmap = None
+                self.data = f.read()
+        self.size = len(self.data)
+        self.sha1 = hashlib.sha1(self.data).hexdigest()
+
+    def html(self) -> str:
+        # Scrapers receive decoded text, as they would from the HTTP client
+        return self.data[:].decode("utf-8", errors="replace")
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+
+def load_corpus(patterns: list = None, use_mmap: bool = False) -> list:
+    paths = sorted({path for pattern in (patterns or DEFAULT_CORPUS) for path in glob.glob(pattern)})
+    return [CorpusPage(path, use_mmap) for path in paths]
+
+def _scraper_workload(scraper):
+    def run(html: str, backend: str):
+        page = parse_html(html, backend, only=scraper.parse_only)
+        scraper._parse_search_results(page)
+        scraper._parse_profile_page(page, "")
+    return run
+
+def _google_source(html: str, backend: str):
+    GoogleScraper("benchmark")._parse_results(html, backend)
+
+def _linkedin_source(html: str, backend: str):
+    LinkedInPublicScraper("benchmark")._parse_company_page(html, backend)
+
+def _contacts(html: str, backend: str):
+    extract_contacts(parse_html(html, backend).text())
+
+def workloads() -> dict:
+    """Name -> callable(html, backend) for everything that parses pages."""
+    runs = {f"scrapers.{platform}": _scraper_workload(scraper_registry.get_scraper(platform)) for platform in scraper_registry.supported_platforms}
+    runs["sources.google"] = _google_source
+    runs["sources.linkedin_public"] = _linkedin_source
+    runs["contacts"] = _contacts
+    return runs
+
+def _round(value: float) -> float:
+    # Three significant digits keep run-to-run noise out of diffs
+    return float(f"{value:.3g}")
+
+def measure(run, pages: list, backend: str, min_time: float) -> dict:
+    total_bytes = sum(page.size for page in pages)
+    texts = [page.html() for page in pages]
+
+    # Warm up first so one-off costs (imports, selector compilation) stay out of the numbers
+    for html in texts:
+        run(html, backend)
+
+    tracemalloc.start()
+    for html in texts:
+        run(html, backend)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    rounds = 0
+    started = time.perf_counter()
+    while True:
+        for html in texts:
+            run(html, backend)
+        rounds += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+
+    return {
+        "pages_per_sec": _round(rounds * len(texts) / elapsed),
+        "mb_per_sec": _round(rounds * total_bytes / elapsed / 1e6),
+        "peak_memory_kb": _round(peak / 1024),
+    }
+
+def run_benchmarks(pages: list, backends: list = None, min_time: float = 1.0, selected: list = None) -> dict:
+    backends = backends or available_backends()
+    runs = workloads()
+    if selected:
+        runs = {name: run for name, run in runs.items() if name in selected}
+
+    results = {}
+    for backend in backends:
+        if backend not in available_backends():
+            print(f"Skipping backend '{backend}': not installed.")
+            continue
+        results[backend] = {name: measure(run, pages, backend, min_time) for name, run in runs.items()}
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "backends": available_backends(),
+        },
+        "corpus": [{"name": page.name, "bytes": page.size, "sha1": page.sha1} for page in pages],
+        "results": results,
+    }
+
+def compare(old: dict, new: dict, tolerance: float = 0.1) -> list:
+    """Workloads whose throughput dropped or peak memory grew by more than `tolerance`."""
+    regressions = []
+    for backend, workloads_ in new["results"].items():
+        for name, metrics in workloads_.items():
+            before = old.get("results", {}).get(backend, {}).get(name)
+            if not before:
+                continue
+            if metrics["pages_per_sec"] < before["pages_per_sec"] * (1 - tolerance):
+                regressions.append(f"{backend} {name}: {before['pages_per_sec']} -> {metrics['pages_per_sec']} pages/sec")
+            if metrics["peak_memory_kb"] > before["peak_memory_kb"] * (1 + tolerance):
+                regressions.append(f"{backend} {name}: {before['peak_memory_kb']} -> {metrics['peak_memory_kb']} KB peak")
+    return regressions
+
+def write_results(report: dict, path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark page parsing across HTML parser backends.")
+    parser.add_argument("--corpus", nargs="+", help="Glob patterns of saved pages (default: repo fixtures).")
+    parser.add_argument("--backends", nargs="+", choices=html_parser.BACKENDS, help="Backends to measure (default: all installed).")
+    parser.add_argument("--workloads", nargs="+", help="Only run these workloads.")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to spend per workload and backend.")
+    parser.add_argument("--mmap", action="store_true", help="Memory-map corpus files instead of reading them.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the JSON results.")
+    parser.add_argument("--compare", help="Earlier results file to check for regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative slowdown before reporting a regression.")
+    args = parser.parse_args(argv)
+
+    # Load the baseline first, since it may be the file about to be overwritten
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    pages = load_corpus(args.corpus, args.mmap)
+    if not pages:
+        print("No pages found for the corpus patterns.")
+        return 1
+    try:
+        report = run_benchmarks(pages, args.backends, args.min_time, args.workloads)
+    finally:
+        for page in pages:
+            page.close()
+
+    write_results(report, args.output)
+    for backend, workloads_ in report["results"].items():
+        for name, metrics in sorted(workloads_.items()):
+            print(f"{backend:12} {name:28} {metrics['pages_per_sec']:>10} pages/s {metrics['mb_per_sec']:>8} MB/s {metrics['peak_memory_kb']:>8} KB peak")
+    print(f"Results written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(baseline, report, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
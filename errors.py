@@ -25,3 +25,15 @@ class NoResultsFoundError(ScraperError):
     """Exception raised when no results are found in the HTML."""
     def __init__(self, platform: str, recommended_action: str = "Verify the input HTML contains business listings."):
         super().__init__(platform, "No results found in HTML", recommended_action=recommended_action)
+
+class PlatformTimeoutError(ScraperError):
+    """Exception raised when a platform does not finish before its deadline."""
+    def __init__(self, platform: str, timeout: float, recommended_action: str = "The platform is slow or throttling requests. Retry later or raise its deadline."):
+        super().__init__(platform, f"Timed out after {timeout:g} seconds", recommended_action=recommended_action)
+
+class CircuitOpenError(ScraperError):
+    """Exception raised when a platform is skipped because its circuit breaker is open."""
+    def __init__(self, platform: str, retry_after: float, recommended_action: str = None):
+        recommended_action = recommended_action or f"The platform failed repeatedly and is paused. It will be retried automatically in {retry_after:.0f} seconds."
+        super().__init__(platform, "Circuit breaker open after repeated failures", recommended_action=recommended_action)
+        self.retry_after = retry_after
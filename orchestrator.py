@@ -1,42 +1,335 @@
+import math
+import time
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Executor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from scrapers.base import AsyncBaseScraper
 from scrapers.registry import scraper_registry
-from errors import ScraperError
+from errors import ScraperError, PlatformTimeoutError, CircuitOpenError
+from utils.circuit_breaker import circuit_breakers
 
 class ScrapeOrchestrator:
-    def run(self, query: str) -> dict:
+    # Use a controlled list of platforms to run
+    PLATFORMS = ["google_search", "google_maps", "facebook", "linkedin", "instagram"]
+
+    # How often the concurrent runner re-checks deadlines while a platform is still queued
+    _POLL_INTERVAL = 0.05
+
+    def __init__(self, concurrent: bool = True, max_workers: int = None, platform_timeout: float = 30.0, platform_timeouts: dict = None, run_timeout: float = None, max_in_flight: int = 16):
+        """
+        Args:
+            concurrent: Run all platforms at once instead of one after another.
+            max_workers: Number of platforms scraped in parallel. Defaults to one worker per platform.
+            platform_timeout: Deadline in seconds for each platform, counted from when it starts.
+            platform_timeouts: Optional per-platform overrides of `platform_timeout`.
+            run_timeout: Deadline in seconds for a whole concurrent run; platforms still queued
+                or running then time out. Defaults to the longest platform deadline once per
+                batch of `max_workers` platforms.
+            max_in_flight: Platform scrapes running at once on the async path, across all
+                runs in an event loop. A timed-out scrape keeps its slot until its thread
+                finishes, so abandoned scrapes can't take over the executor.
+        """
+        self.concurrent = concurrent
+        self.max_workers = max_workers or len(self.PLATFORMS)
+        self.platform_timeout = platform_timeout
+        self.platform_timeouts = platform_timeouts or {}
+        self.run_timeout = run_timeout
+        self.max_in_flight = max_in_flight
+        self._in_flight = weakref.WeakKeyDictionary()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def run(self, query: str, concurrent: bool = None) -> dict:
+        if concurrent is None:
+            concurrent = self.concurrent
+
+        return self._collect(query, self._iter_outcomes(query, self.PLATFORMS, concurrent))
+
+    async def arun(self, query: str, executor=None) -> dict:
+        """
+        Async variant of `run` for use inside an event loop. Blocking scrapers are run on
+        `executor` (a pool of the orchestrator's own if None), so the loop stays responsive.
+        Platform deadlines count from when a scraper starts running, not from when it
+        was queued behind other runs' platforms (see `max_in_flight`).
+        """
+        outcomes = await asyncio.gather(*(self._ascrape_platform(platform, query, executor) for platform in self.PLATFORMS))
+        return self._collect(query, zip(self.PLATFORMS, outcomes))
+
+    def stream(self, query: str, concurrent: bool = None):
+        """
+        Streaming variant of `run`. Yields events as each platform finishes instead of
+        building the whole result first:
+
+            {"event": "lead", "platform": ..., "data": {...}}       one per result
+            {"event": "platform", "platform": ..., "count": ..., "pagination": ...}
+            {"event": "error", "platform": ..., "reason": ..., ...}
+            {"event": "done", "query": ..., "platforms": [...], "errors": [...]}
+        """
+        if concurrent is None:
+            concurrent = self.concurrent
+
+        succeeded, failed = [], []
+        for platform, outcome in self._iter_outcomes(query, self.PLATFORMS, concurrent):
+            yield from self._outcome_events(platform, outcome, succeeded, failed)
+        yield {"event": "done", "query": query, "platforms": succeeded, "errors": failed}
+
+    async def astream(self, query: str, executor=None):
+        """Async variant of `stream`; blocking scrapers are run on `executor` like in `arun`."""
+        tasks = [asyncio.ensure_future(self._ascrape_platform(platform, query, executor)) for platform in self.PLATFORMS]
+        platforms = dict(zip(tasks, self.PLATFORMS))
+        succeeded, failed = [], []
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for event in self._outcome_events(platforms[task], task.result(), succeeded, failed):
+                        yield event
+        finally:
+            # The consumer may stop early (e.g. the client disconnected)
+            for task in tasks:
+                task.cancel()
+        yield {"event": "done", "query": query, "platforms": succeeded, "errors": failed}
+
+    def _outcome_events(self, platform: str, outcome, succeeded: list, failed: list):
+        if isinstance(outcome, ScraperError):
+            failed.append(platform)
+            yield {"event": "error", **outcome.to_dict()}
+            return
+
+        platform_results, platform_pagination = outcome
+        succeeded.append(platform)
+        for result in platform_results:
+            yield {"event": "lead", "platform": platform, "data": result}
+        yield {"event": "platform", "platform": platform, "count": len(platform_results), "pagination": bool(platform_pagination)}
+
+    def _collect(self, query: str, outcomes) -> dict:
         results = {}
         pagination = {}
-        errors = []
+        errors = {}
 
-        # Use a controlled list of platforms to run
-        platforms_to_run = ["google_search", "google_maps", "facebook", "linkedin", "instagram"]
-
-        for platform in platforms_to_run:
-            scraper = scraper_registry.get_scraper(platform)
-            try:
-                platform_results, platform_pagination = scraper.scrape(query)
-                results[platform] = platform_results
-                if platform_pagination:
-                    pagination[platform] = True
-                else:
-                    pagination[platform] = False
-            except ScraperError as e:
-                errors.append(e.to_dict())
-            except Exception as e:
-                # Wrap unexpected errors in a ScraperError for consistent reporting
-                error_details = f"An unexpected error occurred: {type(e).__name__} - {e}"
-                unexpected_error = ScraperError(
-                    platform=platform,
-                    reason=error_details,
-                    recommended_action="Manual review required. The scraper's underlying library may have failed."
-                )
-                errors.append(unexpected_error.to_dict())
-                print(f"An unexpected error occurred for platform '{platform}': {e}")
+        for platform, outcome in outcomes:
+            if isinstance(outcome, ScraperError):
+                errors[platform] = outcome.to_dict()
+                continue
+            platform_results, platform_pagination = outcome
+            results[platform] = platform_results
+            if platform_pagination:
+                pagination[platform] = True
+            else:
+                pagination[platform] = False
 
+        # Report in platform order regardless of which platform finished first
         return {
             "query": query,
-            "platforms": results,
-            "pagination": pagination,
-            "errors": errors
+            "platforms": {p: results[p] for p in self.PLATFORMS if p in results},
+            "pagination": {p: pagination[p] for p in self.PLATFORMS if p in pagination},
+            "errors": [errors[p] for p in self.PLATFORMS if p in errors]
         }
 
+    def timeout_for(self, platform: str) -> float:
+        return self.platform_timeouts.get(platform, self.platform_timeout)
+
+    def run_timeout_for(self, platforms: list) -> float:
+        if self.run_timeout is not None:
+            return self.run_timeout
+        # Timed-out platforms keep their worker, so later batches may wait that long to start
+        return math.ceil(len(platforms) / self.max_workers) * max(self.timeout_for(platform) for platform in platforms)
+
+    def _iter_outcomes(self, query: str, platforms: list, concurrent: bool):
+        """
+        Yields (platform, outcome) pairs as platforms finish. The outcome is either the
+        scraper's (results, pagination) tuple or a ScraperError describing the failure.
+        """
+        if not concurrent:
+            for platform in platforms:
+                yield platform, self._record(platform, self._scrape_platform(platform, query))
+            return
+
+        started_at = {}
+
+        def task(platform):
+            started_at[platform] = time.monotonic()
+            return self._scrape_platform(platform, query)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scrape")
+        try:
+            futures = {executor.submit(task, platform): platform for platform in platforms}
+            pending = set(futures)
+            run_timeout = self.run_timeout_for(platforms)
+            run_deadline = time.monotonic() + run_timeout
+            while pending:
+                now = time.monotonic()
+                if now >= run_deadline:
+                    # Platforms stuck behind abandoned workers would otherwise never start
+                    for future in sorted(pending, key=lambda future: platforms.index(futures[future])):
+                        platform = futures[future]
+                        if future.done():
+                            yield platform, self._record(platform, future.result())
+                            continue
+                        future.cancel()
+                        print(f"Platform '{platform}' did not finish within the run's {run_timeout} seconds.")
+                        yield platform, self._record(platform, PlatformTimeoutError(platform, run_timeout))
+                    break
+
+                next_deadline = run_deadline - now
+                for future in list(pending):
+                    platform = futures[future]
+                    if future.done() or platform not in started_at:
+                        continue
+                    remaining = started_at[platform] + self.timeout_for(platform) - now
+                    if remaining <= 0:
+                        # The worker thread cannot be interrupted; it is abandoned and its result dropped.
+                        pending.discard(future)
+                        print(f"Platform '{platform}' timed out after {self.timeout_for(platform)} seconds.")
+                        yield platform, self._record(platform, PlatformTimeoutError(platform, self.timeout_for(platform)))
+                    elif remaining < next_deadline:
+                        next_deadline = remaining
+
+                if not pending:
+                    break
+
+                if any(futures[f] not in started_at for f in pending):
+                    # Queued platforms have no deadline of their own yet; check back once they start
+                    next_deadline = min(next_deadline, self._POLL_INTERVAL)
+
+                done, pending = wait(pending, timeout=next_deadline, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield futures[future], self._record(futures[future], future.result())
+        finally:
+            # Never block the caller on abandoned (timed-out) platforms
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _scrape_platform(self, platform: str, query: str):
+        breaker = circuit_breakers.get(platform)
+        if not breaker.allow():
+            return CircuitOpenError(platform, breaker.retry_after())
+        try:
+            scraper = scraper_registry.get_scraper(platform)
+            return scraper.scrape(query)
+        except ScraperError as e:
+            return e
+        except Exception as e:
+            return self._unexpected_error(platform, e)
+
+    async def _ascrape_platform(self, platform: str, query: str, executor):
+        timeout = self.timeout_for(platform)
+        breaker = circuit_breakers.get(platform)
+        if not breaker.allow():
+            return CircuitOpenError(platform, breaker.retry_after())
+
+        loop = asyncio.get_running_loop()
+        slots = self._in_flight.get(loop)
+        if slots is None:
+            slots = self._in_flight.setdefault(loop, asyncio.Semaphore(self.max_in_flight))
+        await slots.acquire()
+        started = asyncio.Event()
+        tracked = _TrackedExecutor(executor or self._default_executor(), loop, started, slots.release)
+        try:
+            scraper = scraper_registry.get_scraper(platform)
+            task = asyncio.ensure_future(scraper.ascrape(query, tracked))
+        except Exception as e:
+            tracked.done()
+            return self._record(platform, self._unexpected_error(platform, e))
+        task.add_done_callback(lambda _: tracked.done())
+        if isinstance(scraper, AsyncBaseScraper):
+            # Native async scrapers run as soon as they are awaited
+            started.set()
+
+        try:
+            await self._started(task, started)
+            outcome = await asyncio.wait_for(task, timeout)
+        except asyncio.TimeoutError:
+            print(f"Platform '{platform}' timed out after {timeout} seconds.")
+            outcome = PlatformTimeoutError(platform, timeout)
+        except ScraperError as e:
+            outcome = e
+        except Exception as e:
+            outcome = self._unexpected_error(platform, e)
+        return self._record(platform, outcome)
+
+    @staticmethod
+    async def _started(task: asyncio.Future, started: asyncio.Event):
+        """Waits until the scraper's first executor job starts running, or it finishes without one."""
+        started_waiter = asyncio.ensure_future(started.wait())
+        try:
+            await asyncio.wait({task, started_waiter}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            started_waiter.cancel()
+
+    def _default_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="scrape-async")
+            return self._executor
+
+    def _record(self, platform: str, outcome):
+        """Feeds an outcome to the platform's circuit breaker and passes it through."""
+        if isinstance(outcome, CircuitOpenError):
+            return outcome
+        if isinstance(outcome, ScraperError):
+            circuit_breakers.get(platform).record_failure()
+        else:
+            circuit_breakers.get(platform).record_success()
+        return outcome
+
+    def _unexpected_error(self, platform: str, e: Exception) -> ScraperError:
+        # Wrap unexpected errors in a ScraperError for consistent reporting
+        error_details = f"An unexpected error occurred: {type(e).__name__} - {e}"
+        print(f"An unexpected error occurred for platform '{platform}': {e}")
+        return ScraperError(
+            platform=platform,
+            reason=error_details,
+            recommended_action="Manual review required. The scraper's underlying library may have failed."
+        )
+
+class _TrackedExecutor(Executor):
+    """
+    Runs one platform's blocking work on `executor` for the async path. Sets `started`
+    when the first job starts running, and calls `release` once the platform's task and
+    every job it submitted are done, even if the task was abandoned after a timeout.
+    """
+
+    def __init__(self, executor: Executor, loop: asyncio.AbstractEventLoop, started: asyncio.Event, release):
+        self._executor = executor
+        self._loop = loop
+        self._started = started
+        self._release = release
+        # The platform's task, plus each job submitted and not yet finished
+        self._pending = 1
+        self._lock = threading.Lock()
+
+    def submit(self, fn, /, *args, **kwargs):
+        def run():
+            self._call_in_loop(self._started.set)
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._executor.submit(run)
+        except BaseException:
+            self.done()
+            raise
+        future.add_done_callback(lambda _: self.done())
+        return future
+
+    def done(self):
+        with self._lock:
+            self._pending -= 1
+            finished = self._pending == 0
+        if finished:
+            self._call_in_loop(self._release)
+
+    def _call_in_loop(self, callback):
+        try:
+            self._loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            # The loop has closed, so nothing is waiting on it anymore
+            pass
+
 scrape_orchestrator = ScrapeOrchestrator()
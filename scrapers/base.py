@@ -1,8 +1,11 @@
+import asyncio
 from abc import ABC, abstractmethod
-from bs4 import BeautifulSoup
+from utils.html_parser import HtmlDocument
 
 class BaseScraper(ABC):
     platform: str
+    # Selectors for the only elements `_parse_profile_page` reads; see `utils.html_parser.parse_html`
+    parse_only: tuple = None
 
     @abstractmethod
     def scrape(self, query: str) -> tuple[list[dict], dict | None]:
@@ -12,16 +15,39 @@ class BaseScraper(ABC):
         """
         pass
 
+    async def ascrape(self, query: str, executor=None) -> tuple[list[dict], dict | None]:
+        """
+        Async entry point used by the orchestrator's async path. The default runs the
+        blocking `scrape` on the given executor so the event loop is never blocked.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.scrape, query)
+
     @abstractmethod
-    def _parse_search_results(self, soup: BeautifulSoup) -> list[str]:
+    def _parse_search_results(self, soup: HtmlDocument) -> list[str]:
         """
         Parses a search results page to extract URLs to individual profile pages.
         """
         pass
 
     @abstractmethod
-    def _parse_profile_page(self, soup: BeautifulSoup, source_url: str) -> dict:
+    def _parse_profile_page(self, soup: HtmlDocument, source_url: str) -> dict:
         """
         Parses an individual profile page to extract the required business data.
+        Accepts anything `utils.html_parser.parse_html` does, including a BeautifulSoup.
         """
         pass
+
+
+class AsyncBaseScraper(BaseScraper):
+    """
+    Base class for scrapers built on non-blocking I/O. Subclasses implement `ascrape`;
+    `scrape` is provided for synchronous callers and must not be called from a running loop.
+    """
+
+    @abstractmethod
+    async def ascrape(self, query: str, executor=None) -> tuple[list[dict], dict | None]:
+        pass
+
+    def scrape(self, query: str) -> tuple[list[dict], dict | None]:
+        return asyncio.run(self.ascrape(query))
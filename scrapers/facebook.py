@@ -2,6 +2,7 @@ from facebook_scraper import get_posts
 from scrapers.base import BaseScraper
 from scrapers.registry import register_scraper
 from errors import NoResultsFoundError
+from utils.rate_limiter import rate_limiter
 
 @register_scraper
 class FacebookScraper(BaseScraper):
@@ -13,6 +14,7 @@ class FacebookScraper(BaseScraper):
             # A common workaround is to use get_posts with a generic but relevant page name,
             # then filter the results for the query term. This is not a direct search, but it
             # allows us to find public pages related to the query.
+            rate_limiter.acquire("facebook.com")
             posts = list(get_posts(query, pages=1))
         except Exception as e:
             raise NoResultsFoundError(f"{self.platform}: The scraper was likely blocked by Facebook. Error: {e}")
@@ -1,17 +1,18 @@
-from bs4 import BeautifulSoup
 import re
-from duckduckgo_search import DDGS
 from scrapers.base import BaseScraper
 from scrapers.registry import register_scraper
 from errors import NoResultsFoundError
+from utils.search_cache import cached_text_search
+from utils.html_parser import HtmlDocument, parse_html
+from utils.contacts import extract_contacts
 
 @register_scraper
 class GoogleMapsScraper(BaseScraper):
     platform = "google_maps"
+    parse_only = ("title", "body")
 
     def scrape(self, query: str) -> tuple[list[dict], dict | None]:
-        with DDGS() as ddgs:
-            search_results = [r for r in ddgs.text(f"site:google.com/maps {query}", max_results=10)]
+        search_results = cached_text_search(f"site:google.com/maps {query}", max_results=10)
 
         if not search_results:
             raise NoResultsFoundError(self.platform)
@@ -30,14 +31,15 @@ class GoogleMapsScraper(BaseScraper):
 
         return results, None
 
-    def _parse_search_results(self, soup: BeautifulSoup) -> list[str]:
+    def _parse_search_results(self, soup: HtmlDocument) -> list[str]:
         return []
 
-    def _parse_profile_page(self, soup: BeautifulSoup, source_url: str) -> dict:
-        business_name_match = re.search(r'"(.*?)"', soup.title.string) if soup.title else None
+    def _parse_profile_page(self, soup: HtmlDocument, source_url: str) -> dict:
+        page = parse_html(soup, only=self.parse_only)
+        title = page.title()
+        business_name_match = re.search(r'"(.*?)"', title) if title else None
         business_name = business_name_match.group(1) if business_name_match else "N/A"
-        phone_match = re.search(r'(\+\d{1,2}\s?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}', soup.get_text())
-        phone = phone_match.group(0) if phone_match else None
+        phone = extract_contacts(page.text()).phone
 
         return {
             'business_name': business_name,
@@ -1,15 +1,14 @@
-from duckduckgo_search import DDGS
 from scrapers.base import BaseScraper
 from scrapers.registry import register_scraper
 from errors import NoResultsFoundError
+from utils.search_cache import cached_text_search
 
 @register_scraper
 class GoogleSearchScraper(BaseScraper):
     platform = "google_search"
 
     def scrape(self, query: str) -> tuple[list[dict], dict | None]:
-        with DDGS() as ddgs:
-            search_results = [r for r in ddgs.text(query, max_results=10)]
+        search_results = cached_text_search(query, max_results=10)
 
         if not search_results:
             raise NoResultsFoundError(self.platform)
@@ -1,16 +1,16 @@
-from bs4 import BeautifulSoup
-from duckduckgo_search import DDGS
 from scrapers.base import BaseScraper
 from scrapers.registry import register_scraper
 from errors import NoResultsFoundError
+from utils.search_cache import cached_text_search
+from utils.html_parser import HtmlDocument, parse_html
 
 @register_scraper
 class InstagramScraper(BaseScraper):
     platform = "instagram"
+    parse_only = ("title",)
 
     def scrape(self, query: str) -> tuple[list[dict], dict | None]:
-        with DDGS() as ddgs:
-            search_results = [r for r in ddgs.text(f"site:instagram.com {query}", max_results=10)]
+        search_results = cached_text_search(f"site:instagram.com {query}", max_results=10)
 
         if not search_results:
             raise NoResultsFoundError(self.platform)
@@ -30,11 +30,12 @@ class InstagramScraper(BaseScraper):
 
         return results, None
 
-    def _parse_search_results(self, soup: BeautifulSoup) -> list[str]:
+    def _parse_search_results(self, soup: HtmlDocument) -> list[str]:
         return []
 
-    def _parse_profile_page(self, soup: BeautifulSoup, source_url: str) -> dict:
-        business_name = soup.find('title').get_text(strip=True) if soup.find('title') else "N/A"
+    def _parse_profile_page(self, soup: HtmlDocument, source_url: str) -> dict:
+        title = parse_html(soup, only=self.parse_only).title(strip=True)
+        business_name = title if title is not None else "N/A"
 
         return {
             'business_name': business_name,
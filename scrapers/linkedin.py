@@ -1,18 +1,17 @@
-from duckduckgo_search import DDGS
-from bs4 import BeautifulSoup
 from scrapers.base import BaseScraper
 from scrapers.registry import register_scraper
 from errors import NoResultsFoundError
+from utils.search_cache import cached_text_search
 from utils.http_client import http_client
+from utils.html_parser import HtmlDocument
 
 @register_scraper
 class LinkedInScraper(BaseScraper):
     platform = "linkedin"
 
     def scrape(self, query: str) -> tuple[list[dict], dict | None]:
-        with DDGS() as ddgs:
-            # Use DuckDuckGo to find company profile pages on LinkedIn
-            search_results = [r for r in ddgs.text(f"site:linkedin.com/company {query}", max_results=5)]
+        # Use DuckDuckGo to find company profile pages on LinkedIn
+        search_results = cached_text_search(f"site:linkedin.com/company {query}", max_results=5)
 
         if not search_results:
             raise NoResultsFoundError(self.platform)
@@ -31,11 +30,11 @@ class LinkedInScraper(BaseScraper):
 
         return results, None
 
-    def _parse_search_results(self, soup: BeautifulSoup) -> list[str]:
+    def _parse_search_results(self, soup: HtmlDocument) -> list[str]:
         # No longer used
         return []
 
-    def _parse_profile_page(self, soup: BeautifulSoup, source_url: str) -> dict:
+    def _parse_profile_page(self, soup: HtmlDocument, source_url: str) -> dict:
         # Parsing the live profile page is unreliable, so we extract from search results instead.
         # This function can be kept for future enhancements if direct fetching becomes possible.
         return {}
@@ -3,7 +3,43 @@
 # Configuration settings for the agent.
 
 # --- Global constants ---
-EXCEL_FILENAME = "leads_output.xlsx"
+EXCEL_FILENAME = "leads_output.xlsx" # Export of the lead store, generated on download
+LEAD_STORE_PATH = "leads.sqlite3"      # System of record for saved leads
+EXPORT_CACHE_DIR = "exports"            # Downloads of the lead store, by content digest
+
+# --- Background jobs ---
+JOBS_DB_PATH = "jobs.sqlite3"
+JOB_WORKERS = 2
+MAX_QUEUED_JOBS = 50
+JOB_HEARTBEAT_INTERVAL = 10   # Seconds; jobs of a server that misses three heartbeats are failed
+JOB_TTL = 7 * 24 * 3600       # Seconds finished jobs and their results are kept
+
+# --- Selenium WebDriver pool ---
+WEBDRIVER_POOL_SIZE = 2
+WEBDRIVER_MAX_USES = 50       # Recycle a driver after this many leases
+WEBDRIVER_LEASE_TIMEOUT = 120 # Seconds to wait for a free driver
+WEBDRIVER_PREWARM = 1         # Drivers started when the API boots
+WEBDRIVER_LEAN_PROFILE = True # Skip images, fonts and media and don't wait for subresources
+
+# --- Google Maps (Selenium) ---
+GOOGLE_MAPS_MAX_PARALLEL_TABS = 4 # Place pages loaded at the same time
+
+# --- Shared HTTP client (applied by the agent and its API; the backend keeps utils.http_client's defaults) ---
+HTTP_POOL_CONNECTIONS = 20    # Per-host connection pools kept
+HTTP_POOL_MAXSIZE = 20        # Connections kept open per host
+HTTP_TIMEOUT = 10             # Seconds per request
+HTTP_KEEP_ALIVE = True        # Reuse connections between requests
+HTTP_KEEP_ALIVE_EXPIRY = 30.0 # Seconds an idle connection is kept (httpx transports only)
+HTTP2 = False                 # Use HTTP/2 where servers support it (httpx[http2])
+
+# --- HTML parsing ---
+HTML_PARSER_BACKEND = None # "html.parser", "lxml" or "selectolax"; None picks the fastest installed
+
+# --- LinkedIn (public pages) ---
+LINKEDIN_PAGE_MAX_BYTES = 1024 * 1024 # Company pages are cut off after this many bytes
+
+# --- Deduplication ---
+FUZZY_DEDUP_THRESHOLD = None # Company-name similarity (0-1) above which leads are merged; None matches exact keys only
 
 # --- Scraper configurations ---
 # For now, this is just a placeholder.
@@ -1,6 +1,8 @@
 import os
 import sys
 import glob
+import copy
+import inspect
 import importlib
 from typing import List, Dict, Any
 
@@ -12,8 +14,33 @@ from src.modules.intent_parser import IntentParser
 from src.modules.keyword_expander import KeywordExpander
 from src.modules.scorer import Scorer
 from src.modules.deduplicator import Deduplicator
-from src.agent.storage.excel_writer import ExcelWriter
+from src.agent.storage.lead_store import lead_store, save_leads
+from src.agent.config import FUZZY_DEDUP_THRESHOLD, EXCEL_FILENAME, HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_TIMEOUT, HTTP_KEEP_ALIVE, HTTP_KEEP_ALIVE_EXPIRY, HTTP2
 from src.agent.sources.base_source import BaseSource
+from utils.search_cache import normalize_query
+from utils.single_flight import single_flight
+from utils.circuit_breaker import circuit_breakers
+from utils.http_client import NETWORK_ERRORS, http_client
+from errors import ScraperError, CircuitOpenError
+
+http_client.configure(
+    pool_connections=HTTP_POOL_CONNECTIONS,
+    pool_maxsize=HTTP_POOL_MAXSIZE,
+    timeout=HTTP_TIMEOUT,
+    keep_alive=HTTP_KEEP_ALIVE,
+    keep_alive_expiry=HTTP_KEEP_ALIVE_EXPIRY,
+    http2=HTTP2,
+)
+
+# Scraper class -> (ScrapeOrchestrator platform, KeywordExpander platform). The first names
+# the circuit breaker shared with the orchestrator, the second the expanded queries used.
+SCRAPER_PLATFORMS = {
+    'GoogleScraper': ('google_search', 'google'),
+    'GoogleMapsScraper': ('google_maps', 'google'),
+    'FacebookPublicScraper': ('facebook', 'facebook'),
+    'LinkedInPublicScraper': ('linkedin', 'linkedin'),
+    'InstagramScraper': ('instagram', 'instagram'),
+}
 
 def discover_scrapers() -> List[type[BaseSource]]:
     """Dynamically discovers all scraper classes in the sources directory."""
@@ -28,6 +55,37 @@ def discover_scrapers() -> List[type[BaseSource]]:
                 scrapers.append(attribute)
     return scrapers
 
+def _takes_query(scraper_class: type[BaseSource]) -> bool:
+    """Whether the scraper can be built from a search query (some take page ids or usernames instead)."""
+    return 'query' in inspect.signature(scraper_class).parameters
+
+def _platform_keys(scraper_class: type[BaseSource]) -> tuple:
+    """The (breaker, query) platform keys of a scraper; see `SCRAPER_PLATFORMS`."""
+    scraper_name = scraper_class.__name__
+    if scraper_name in SCRAPER_PLATFORMS:
+        return SCRAPER_PLATFORMS[scraper_name]
+    platform_name = scraper_name.replace('Scraper', '').lower()
+    return platform_name, platform_name
+
+def _run_scraper(scraper_class: type[BaseSource], platform_name: str, query: str) -> List[Lead]:
+    scraper_instance = scraper_class(query=query)
+    # Breakers are shared with ScrapeOrchestrator, so a platform blocked there is skipped here too
+    breaker = circuit_breakers.get(platform_name)
+    if not breaker.allow():
+        raise CircuitOpenError(platform_name, breaker.retry_after())
+    try:
+        if hasattr(scraper_instance, '__enter__'):
+            with scraper_instance as scraper:
+                leads = scraper.scrape()
+        else:
+            leads = scraper_instance.scrape()
+    except (ScraperError, *NETWORK_ERRORS):
+        # Only failures of the platform count; a bug in our own code says nothing about it
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return leads
+
 def generate_leads(query: str, selected_scraper_names: List[str] = None, confidence_threshold: float = 0.0) -> Dict[str, Any]:
     """
     Generates leads based on a query, selected scrapers, and confidence score.
@@ -61,33 +119,27 @@ def generate_leads(query: str, selected_scraper_names: List[str] = None, confide
 
     for scraper_class in scraper_classes:
         scraper_name = scraper_class.__name__
-        platform_name = scraper_name.replace('Scraper', '').lower()
-
-        # Map scraper names to platform keys used in KeywordExpander
-        if 'linkedin' in platform_name:
-            platform_name = 'linkedin'
-        elif 'google' in platform_name:
-            platform_name = 'google'
-        elif 'facebook' in platform_name:
-            platform_name = 'facebook'
-        elif 'instagram' in platform_name:
-            platform_name = 'instagram'
+        if not _takes_query(scraper_class):
+            print(f"   - SKIPPING scraper {scraper_name}: it can't be built from a search query")
+            continue
+        platform_name, query_platform = _platform_keys(scraper_class)
 
-        queries = platform_queries.get(platform_name, [query]) # Fallback to original query
+        queries = platform_queries.get(query_platform, [query]) # Fallback to original query
 
         print(f"   - Running scraper: {scraper_name} for platform '{platform_name}'")
 
         for q in queries:
             try:
-                scraper_instance = scraper_class(query=q)
-                if hasattr(scraper_instance, '__enter__'):
-                    with scraper_instance as scraper:
-                        leads = scraper.scrape()
-                else:
-                    leads = scraper_instance.scrape()
+                # Identical sub-queries from concurrent runs share one scrape; each run gets its own
+                # copies since scoring and merging mutate leads.
+                leads = single_flight.do((scraper_name, normalize_query(q)), _run_scraper, scraper_class, platform_name, q)
+                leads = [copy.copy(lead) for lead in leads]
                 all_leads.extend(leads)
                 if leads:
                     print(f"      -> Found {len(leads)} leads from query: '{q[:60]}...'")
+            except CircuitOpenError as e:
+                print(f"   - SKIPPING scraper {scraper_name}: {e.recommended_action}")
+                break
             except Exception as e:
                 print(f"   - ERROR running scraper {scraper_name} with query '{q}': {e}")
 
@@ -102,14 +154,14 @@ def generate_leads(query: str, selected_scraper_names: List[str] = None, confide
 
     # 5. Deduplicate
     print("5. Deduplicating leads...")
-    deduplicator = Deduplicator()
+    deduplicator = Deduplicator(fuzzy_threshold=FUZZY_DEDUP_THRESHOLD)
     deduplicated_leads = deduplicator.deduplicate(all_leads)
     print(f"   - Deduplicated to {len(deduplicated_leads)} leads.")
 
     # 6. Filter by confidence score
     if confidence_threshold > 0.0:
         print(f"6. Filtering leads with confidence >= {confidence_threshold}...")
-        final_leads = [lead for lead in deduplicated_leads if getattr(lead, 'confidence_score', 0.0) >= confidence_threshold]
+        final_leads = [lead for lead in deduplicated_leads if (lead.confidence_score or 0.0) >= confidence_threshold]
         print(f"   - Filtered down to {len(final_leads)} leads.")
     else:
         final_leads = deduplicated_leads
@@ -135,11 +187,10 @@ def main():
     for query in queries:
         result = generate_leads(query, selected_scraper_names=scraper_names)
 
-        # Save to Excel
-        print("7. Saving to Excel...")
-        excel_writer = ExcelWriter(filename="leads_output.xlsx")
-        excel_writer.save(result["leads"])
-        print("   - Saved to leads_output.xlsx")
+        # Save to the lead store
+        print("7. Saving to the lead store...")
+        added = save_leads(result["leads"])
+        print(f"   - Saved {added} new leads")
 
         # Print summary report
         print("\n--- Summary Report ---")
@@ -149,5 +200,9 @@ def main():
         print(f"Unique Leads Found: {len(result['leads'])}")
         print("--- End of Report ---\n")
 
+    # Export once all queries have run
+    exported = lead_store.export_excel(EXCEL_FILENAME)
+    print(f"Exported {exported} leads to {EXCEL_FILENAME}")
+
 if __name__ == "__main__":
     main()
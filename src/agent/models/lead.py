@@ -1,9 +1,24 @@
+import time
 from dataclasses import dataclass, field
+from datetime import datetime
 from typing import Optional
 
-@dataclass
+# (second, ISO timestamp) of the last lead created; leads made in the same second share it
+_last_timestamp = (None, "")
+
+def current_timestamp() -> str:
+    """The local time as an ISO timestamp to the second, formatted once per second."""
+    global _last_timestamp
+    second = int(time.time())
+    cached_second, timestamp = _last_timestamp
+    if second != cached_second:
+        timestamp = datetime.fromtimestamp(second).isoformat()
+        _last_timestamp = (second, timestamp)
+    return timestamp
+
+@dataclass(slots=True)
 class Lead:
-    """Data model for a lead."""
+    """Data model for a lead. Slotted, so a lead carries no per-instance `__dict__`."""
     name: str
     company: str
     city: Optional[str] = None
@@ -14,4 +29,5 @@ class Lead:
     source: Optional[str] = None
     linkedin_profile: Optional[str] = None
     notes: Optional[str] = None
-    timestamp: str = field(default_factory=lambda: __import__('datetime').datetime.now().isoformat())
+    timestamp: str = field(default_factory=current_timestamp)
+    confidence_score: Optional[float] = None
@@ -0,0 +1,102 @@
+import sys
+from dataclasses import MISSING, fields
+from typing import Dict, Iterable, Iterator, List, Optional
+from .lead import Lead
+
+class LeadBatch:
+    """
+    Leads held column by column: one list per `Lead` field, indexed by position. A batch
+    costs a list slot per field per lead rather than an object per lead, and scoring
+    (`Scorer.score_batch`), deduplication (`Deduplicator.deduplicate_batch`) and saving
+    (`save_leads`) work on the columns directly. Sources are interned, so the few
+    distinct source names are stored once however many leads share them.
+
+    Lead objects are only built when asked for, by `lead` or `leads`.
+    """
+
+    FIELDS = tuple(f.name for f in fields(Lead))
+    _DEFAULTS = {f.name: f.default for f in fields(Lead) if f.default is not MISSING}
+    _DEFAULT_FACTORIES = {f.name: f.default_factory for f in fields(Lead) if f.default_factory is not MISSING}
+
+    def __init__(self, columns: Optional[Dict[str, list]] = None):
+        """
+        Args:
+            columns: Field name -> values, all the same length. Missing fields are
+                filled with their defaults.
+        """
+        columns = columns or {}
+        size = len(next(iter(columns.values()))) if columns else 0
+        if any(len(values) != size for values in columns.values()):
+            raise ValueError("All columns of a LeadBatch must have the same length.")
+        unknown = set(columns) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown Lead fields: {', '.join(sorted(unknown))}.")
+
+        self.columns: Dict[str, list] = {}
+        for name in self.FIELDS:
+            if name in columns:
+                self.columns[name] = list(columns[name])
+            else:
+                self.columns[name] = [self._default(name) for _ in range(size)]
+        self.columns["source"] = [_intern(source) for source in self.columns["source"]]
+
+    @classmethod
+    def from_leads(cls, leads: Iterable[Lead]) -> "LeadBatch":
+        batch = cls()
+        batch.extend(leads)
+        return batch
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "LeadBatch":
+        """Builds a batch from dicts keyed by Lead field names (e.g. stored leads); other keys are ignored."""
+        batch = cls()
+        columns = [(batch.columns[name], name) for name in cls.FIELDS]
+        for record in records:
+            for column, name in columns:
+                column.append(record[name] if name in record else batch._default(name))
+        batch.columns["source"] = [_intern(source) for source in batch.columns["source"]]
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.columns["name"])
+
+    def column(self, name: str) -> list:
+        """The values of one field, in lead order. The list is the batch's own, not a copy."""
+        return self.columns[name]
+
+    def append(self, lead: Lead):
+        for name, column in self.columns.items():
+            value = getattr(lead, name)
+            column.append(_intern(value) if name == "source" else value)
+
+    def extend(self, leads: Iterable[Lead]):
+        for lead in leads:
+            self.append(lead)
+
+    def take(self, indices: Iterable[int]) -> "LeadBatch":
+        """A new batch with the leads at `indices`, in that order."""
+        indices = list(indices)
+        batch = LeadBatch()
+        batch.columns = {name: [column[i] for i in indices] for name, column in self.columns.items()}
+        return batch
+
+    def lead(self, index: int) -> Lead:
+        return Lead(**{name: column[index] for name, column in self.columns.items()})
+
+    def leads(self) -> List[Lead]:
+        return [Lead(*row) for row in zip(*self.columns.values())]
+
+    def records(self) -> Iterator[dict]:
+        """Each lead as a dict, as `dataclasses.asdict` would give for a Lead."""
+        for row in zip(*self.columns.values()):
+            yield dict(zip(self.FIELDS, row))
+
+    def _default(self, name: str):
+        if name in self._DEFAULT_FACTORIES:
+            return self._DEFAULT_FACTORIES[name]()
+        if name in self._DEFAULTS:
+            return self._DEFAULTS[name]
+        raise ValueError(f"Lead field '{name}' is required.")
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
@@ -1,9 +1,10 @@
-import re
 import logging
 from typing import List, Optional
 from facebook_scraper import get_posts, get_profile, get_group_info
 from src.agent.models.lead import Lead
 from src.agent.sources.base_source import BaseSource
+from utils.rate_limiter import rate_limiter
+from utils.contacts import extract_contacts_batch
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -37,6 +38,7 @@ class FacebookPublicScraper(BaseSource):
         try:
             # 1. Scrape the main profile or group info
             info = None
+            rate_limiter.acquire("facebook.com")
             if self.target_type == 'page':
                 info = get_profile(self.target_id)
                 name = info.get('Name', self.target_id)
@@ -55,9 +57,9 @@ class FacebookPublicScraper(BaseSource):
             lead = Lead(name=name, company=name, website=website, notes=notes, source='Facebook')
 
             # 2. Scrape posts for contact info
-            all_emails = set()
-            all_phones = set()
+            post_texts = []
 
+            rate_limiter.acquire("facebook.com")
             if self.target_type == 'group':
                 post_iterator = get_posts(group=self.target_id, pages=self.pages_to_scrape)
             else:  # page
@@ -72,11 +74,14 @@ class FacebookPublicScraper(BaseSource):
                 if self.keywords and not any(key in post_text_lower for key in self.keywords):
                     continue
 
-                emails = re.findall(r'[\w\.-]+@[\w\.-]+', post_text)
-                all_emails.update(emails)
+                post_texts.append(post_text)
 
-                phones = re.findall(r'(\d{3}[-\.\s]??\d{3}[-\.\s]??\d{4}|\(\d{3}\)\s*\d{3}[-\.\s]??\d{4}|\d{3}[-\.\s]??\d{4})', post_text)
-                all_phones.update(phones)
+            all_emails = set()
+            all_phones = set()
+            # Posts often give local numbers without an area code
+            for contacts in extract_contacts_batch(post_texts, local_phones=True):
+                all_emails.update(contacts.emails)
+                all_phones.update(contacts.phones)
 
             # Deterministic contact assignment
             if all_emails:
@@ -1,15 +1,10 @@
-import time
-import random
 import logging
 from typing import List
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 import sys
 import os
 
@@ -18,33 +13,44 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 
 from src.agent.models.lead import Lead
 from src.agent.sources.base_source import BaseSource
+from src.agent.sources.webdriver_pool import WebDriverPool, webdriver_pool, block_heavy_resources
+from src.agent.config import GOOGLE_MAPS_MAX_PARALLEL_TABS
+from utils.rate_limiter import rate_limiter
 
 class GoogleMapsScraper(BaseSource):
     """
     A class to scrape Google Maps for business information.
     """
-    def __init__(self, query: str, num_pages: int = 1):
+    def __init__(self, query: str, num_pages: int = 1, pool: WebDriverPool = None, max_parallel_tabs: int = GOOGLE_MAPS_MAX_PARALLEL_TABS):
         """
-        Initializes the scraper and sets up the Selenium WebDriver.
+        Initializes the scraper. A WebDriver is leased from the shared pool when the
+        scraper is entered (or when `scrape` is called outside a `with` block).
         """
         self.query = query
         self.num_pages = num_pages
-        options = webdriver.ChromeOptions()
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        self.driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
+        self.pool = pool or webdriver_pool
+        self.max_parallel_tabs = max(1, max_parallel_tabs)
+        self.driver = None
 
     def __enter__(self):
+        self.driver = self.pool.acquire()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.driver.quit()
+        # Page-load timeouts say nothing about the driver itself; other WebDriver errors might
+        healthy = not (exc_type and issubclass(exc_type, WebDriverException) and not issubclass(exc_type, TimeoutException))
+        self.pool.release(self.driver, healthy=healthy)
+        self.driver = None
 
     def scrape(self) -> List[Lead]:
         """
         Scrapes Google Maps for a given query.
         """
+        if self.driver is None:
+            with self:
+                return self.scrape()
+
+        rate_limiter.acquire("google.com")
         self.driver.get("https://www.google.com/maps")
         WebDriverWait(self.driver, 10).until(
             EC.presence_of_element_located((By.ID, "searchboxinput"))
@@ -67,26 +73,15 @@ class GoogleMapsScraper(BaseSource):
         for i in range(self.num_pages):
             links = [el.get_attribute('href') for el in feed.find_elements(By.CSS_SELECTOR, "a[href*='/maps/place/']")]
 
-            for link in links:
-                original_window = self.driver.current_window_handle
-                self.driver.execute_script("window.open(arguments[0]);", link)
-                WebDriverWait(self.driver, 10).until(EC.number_of_windows_to_be(2))
-
-                for window_handle in self.driver.window_handles:
-                    if window_handle != original_window:
-                        self.driver.switch_to.window(window_handle)
-                        break
-
-                lead_details = self._scrape_place_details()
-                if lead_details:
-                    results.append(Lead(**lead_details))
-
-                self.driver.close()
-                self.driver.switch_to.window(original_window)
-                time.sleep(random.uniform(1, 2))
+            # Place pages load side by side in several tabs while the first one is extracted
+            for batch_start in range(0, len(links), self.max_parallel_tabs):
+                batch = links[batch_start:batch_start + self.max_parallel_tabs]
+                rate_limiter.acquire("google.com", tokens=len(batch))
+                results.extend(self._scrape_place_batch(batch))
 
             if i < self.num_pages - 1:
                 try:
+                    rate_limiter.acquire("google.com")
                     next_button = WebDriverWait(self.driver, 5).until(
                         EC.element_to_be_clickable((By.CSS_SELECTOR, "button[aria-label='Next page']"))
                     )
@@ -94,12 +89,41 @@ class GoogleMapsScraper(BaseSource):
                     WebDriverWait(self.driver, 10).until(
                         EC.url_changes(self.driver.current_url)
                     )
-                    time.sleep(random.uniform(1, 3))
                 except TimeoutException:
                     break
 
         return results
 
+    def _scrape_place_batch(self, links: List[str]) -> List[Lead]:
+        """
+        Opens each link in its own tab, lets the tabs load concurrently, then extracts
+        the details from each tab in turn and closes it.
+        """
+        original_window = self.driver.current_window_handle
+        existing_handles = set(self.driver.window_handles)
+
+        for _ in links:
+            self.driver.execute_script("window.open('about:blank');")
+        WebDriverWait(self.driver, 10).until(EC.number_of_windows_to_be(len(existing_handles) + len(links)))
+        new_handles = [handle for handle in self.driver.window_handles if handle not in existing_handles]
+
+        # Navigation is started with a script so it does not wait for the page to load
+        for handle, link in zip(new_handles, links):
+            self.driver.switch_to.window(handle)
+            block_heavy_resources(self.driver)
+            self.driver.execute_script("window.location.href = arguments[0];", link)
+
+        leads = []
+        for handle in new_handles:
+            self.driver.switch_to.window(handle)
+            lead_details = self._scrape_place_details()
+            if lead_details:
+                leads.append(Lead(**lead_details))
+            self.driver.close()
+
+        self.driver.switch_to.window(original_window)
+        return leads
+
     def _scrape_place_details(self):
         """
         Scrapes business details from the current Google Maps place page.
@@ -1,6 +1,3 @@
-import requests
-from bs4 import BeautifulSoup
-import time
 import random
 from typing import List, Dict, Any
 import sys
@@ -11,12 +8,18 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 
 from src.agent.models.lead import Lead
 from src.agent.sources.base_source import BaseSource
+from utils.http_client import http_client
+from utils.html_parser import parse_html
+from src.agent.config import HTML_PARSER_BACKEND
 
 class GoogleScraper(BaseSource):
     """
     A scraper for fetching lead data from Google search results.
     """
 
+    # Only the organic result blocks are parsed
+    parse_only = ('div.g',)
+
     def __init__(self, query: str, num_pages: int = 1):
         self.query = query
         self.num_pages = num_pages
@@ -41,38 +44,38 @@ class GoogleScraper(BaseSource):
             ]
             headers = {'User-Agent': random.choice(user_agents)}
 
-            try:
-                response = requests.get(url, headers=headers)
-                response.raise_for_status()  # Raise an exception for bad status codes
-
-                soup = BeautifulSoup(response.text, 'html.parser')
-
-                for g in soup.find_all('div', class_='g'):
-                    rc = g.find('div', class_='yuRUbf')
-                    if rc:
-                        link_tag = rc.find('a')
-                        title_tag = rc.find('h3')
-
-                        if link_tag and title_tag:
-                            url = link_tag['href']
-                            title = title_tag.get_text()
-
-                            snippet_tag = g.find('div', class_='VwiC3b')
-                            snippet = snippet_tag.get_text() if snippet_tag else ""
-
-                            lead = Lead(
-                                name=title,
-                                company=title, # Placeholder, can be improved with more advanced parsing
-                                website=url,
-                                notes=snippet,
-                                source='Google'
-                            )
-                            results.append(lead)
-
-                time.sleep(random.uniform(1, 3))
-
-            except requests.exceptions.RequestException as e:
-                print(f"An error occurred: {e}")
+            response = http_client.get(url, headers=headers)
+            if response is None:
                 break
 
+            results.extend(self._parse_results(response.text))
+
         return results
+
+    def _parse_results(self, html: str, backend: str = None) -> List[Lead]:
+        """
+        Extracts a Lead from each organic result on a search results page, parsed with
+        `backend` (the configured HTML parser backend by default).
+        """
+        leads = []
+        page = parse_html(html, backend or HTML_PARSER_BACKEND, only=self.parse_only)
+        for g in page.select('div.g'):
+            rc = g.select_one('div.yuRUbf')
+            if rc:
+                link_tag = rc.select_one('a')
+                title_tag = rc.select_one('h3')
+
+                if link_tag and title_tag and link_tag.attr('href') is not None:
+                    title = title_tag.text()
+
+                    snippet_tag = g.select_one('div.VwiC3b')
+                    snippet = snippet_tag.text() if snippet_tag else ""
+
+                    leads.append(Lead(
+                        name=title,
+                        company=title, # Placeholder, can be improved with more advanced parsing
+                        website=link_tag.attr('href'),
+                        notes=snippet,
+                        source='Google'
+                    ))
+        return leads
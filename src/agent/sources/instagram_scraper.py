@@ -1,10 +1,10 @@
 import instaloader
 import logging
-import re
-import time
 from typing import List, Optional, Set
 from src.agent.models.lead import Lead
 from src.agent.sources.base_source import BaseSource
+from utils.rate_limiter import rate_limiter
+from utils.contacts import extract_contacts
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -28,28 +28,20 @@ class InstagramScraper(BaseSource):
         for hashtag in self.hashtags_to_scrape:
             logging.info(f"Scraping hashtag: #{hashtag}")
             try:
+                rate_limiter.acquire("instagram.com")
                 posts = instaloader.Hashtag.from_name(self.loader.context, hashtag).get_posts()
                 count = 0
                 for post in posts:
                     if count >= self.max_profiles_per_hashtag:
                         break
+                    # Post iteration fetches further result pages lazily, so pace it like any other request
+                    rate_limiter.acquire("instagram.com")
                     discovered_usernames.add(post.owner_username)
                     count += 1
-                    time.sleep(1) # Rate limiting
             except Exception as e:
                 logging.error(f"Could not scrape hashtag #{hashtag}: {e}")
         return discovered_usernames
 
-    def _parse_email(self, text: str) -> Optional[str]:
-        """Extracts the first email found in a string."""
-        match = re.search(r'[\w\.-]+@[\w\.-]+', text)
-        return match.group(0).rstrip('.') if match else None
-
-    def _parse_website(self, text: str) -> Optional[str]:
-        """Extracts the first URL found in a string."""
-        match = re.search(r'(https?://[^\s]+)', text)
-        return match.group(0) if match else None
-
     def scrape(self) -> List[Lead]:
         """
         Scrapes lead data from Instagram profiles.
@@ -73,12 +65,14 @@ class InstagramScraper(BaseSource):
         for username in target_usernames:
             logging.info(f"Scraping profile: {username}")
             try:
+                rate_limiter.acquire("instagram.com")
                 profile = instaloader.Profile.from_username(self.loader.context, username)
 
                 # Data Extraction
                 bio = profile.biography
-                email = self._parse_email(bio)
-                website = profile.external_url or self._parse_website(bio)
+                contacts = extract_contacts(bio)
+                email = contacts.email
+                website = profile.external_url or contacts.url
                 business_category = profile.business_category_name
 
                 # Construct notes
@@ -94,13 +88,11 @@ class InstagramScraper(BaseSource):
                 )
                 all_leads.append(lead)
 
-                # Rate limiting between profile scrapes
-                time.sleep(2)
-
             except instaloader.exceptions.ProfileNotFound:
                 logging.warning(f"Profile not found: {username}")
             except Exception as e:
                 logging.error(f"An error occurred while scraping profile '{username}': {e}")
-                time.sleep(10) # Longer sleep on error
+                # Back off from Instagram as a whole, not just this profile
+                rate_limiter.penalize("instagram.com", 10)
 
         return all_leads
@@ -1,7 +1,4 @@
 import json
-import requests
-from bs4 import BeautifulSoup
-from duckduckgo_search import DDGS
 from typing import List
 import sys
 import os
@@ -11,12 +8,36 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 
 from src.agent.models.lead import Lead
 from src.agent.sources.base_source import BaseSource
+from utils.search_cache import cached_text_search
+from utils.http_client import http_client
+from utils.html_parser import parse_html
+from src.agent.config import LINKEDIN_PAGE_MAX_BYTES, HTML_PARSER_BACKEND
+
+class _LdJsonClosed:
+    """`fetch_streaming` predicate met once the page's first LD+JSON block has been closed."""
+
+    def __init__(self):
+        self.block_start = -1
+
+    def __call__(self, body: bytes, start: int) -> bool:
+        if self.block_start == -1:
+            self.block_start = body.find(b'application/ld+json', start)
+            if self.block_start == -1:
+                return False
+        return body.find(b'</script>', max(start, self.block_start)) != -1
 
 class LinkedInPublicScraper(BaseSource):
     """
     A scraper for fetching lead data from public LinkedIn company pages.
     """
 
+    # Only these elements of a company page are parsed
+    parse_only = (
+        'script[type="application/ld+json"]',
+        'h1.top-card-layout__title',
+        'section[data-test-id="about-us__description"]',
+    )
+
     def __init__(self, query: str, max_results: int = 20):
         self.query = query
         self.max_results = max_results
@@ -50,8 +71,7 @@ class LinkedInPublicScraper(BaseSource):
         """
         Searches Google for LinkedIn pages matching the query.
         """
-        with DDGS() as ddgs:
-            return list(ddgs.text(f"site:linkedin.com {self.query}", max_results=self.max_results))
+        return cached_text_search(f"site:linkedin.com {self.query}", max_results=self.max_results)
 
     def _is_company_url(self, url: str) -> bool:
         """
@@ -63,23 +83,30 @@ class LinkedInPublicScraper(BaseSource):
         """
         Scrapes a LinkedIn company page for public information.
         """
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-        except requests.RequestException as e:
-            print(f"Error fetching URL {url}: {e}")
+        # The LD+JSON block sits in the page head, so the rest of the page is usually not needed
+        page = http_client.fetch_streaming(url, max_bytes=LINKEDIN_PAGE_MAX_BYTES, stop_when=_LdJsonClosed())
+        if page is None:
             return None
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        data = self._parse_company_page(page.text)
+        if not (data.get('name') and data.get('description')) and not page.complete:
+            # The fallbacks below the LD+JSON block need the whole page
+            page = http_client.fetch_streaming(url, max_bytes=LINKEDIN_PAGE_MAX_BYTES)
+            data = self._parse_company_page(page.text) if page else data
+        return data
+
+    def _parse_company_page(self, html: str, backend: str = None) -> dict:
+        """
+        Extracts the company name, description and URL from a company page, parsed with
+        `backend` (the configured HTML parser backend by default).
+        """
+        page = parse_html(html, backend or HTML_PARSER_BACKEND, only=self.parse_only)
         data = {}
 
-        script_tag = soup.find('script', {'type': 'application/ld+json'})
+        script_tag = page.select_one('script[type="application/ld+json"]')
         if script_tag:
             try:
-                json_data = json.loads(script_tag.string)
+                json_data = json.loads(script_tag.text())
                 org_data = next((item for item in json_data.get('@graph', []) if item.get('@type') == 'Organization'), None)
                 if org_data:
                     data['name'] = org_data.get('name')
@@ -89,13 +116,13 @@ class LinkedInPublicScraper(BaseSource):
                 pass
 
         if not data.get('name'):
-            name_tag = soup.find('h1', class_='top-card-layout__title')
+            name_tag = page.select_one('h1.top-card-layout__title')
             if name_tag:
-                data['name'] = name_tag.get_text(strip=True)
+                data['name'] = name_tag.text(strip=True)
 
         if not data.get('description'):
-            description_section = soup.find('section', {'data-test-id': 'about-us__description'})
+            description_section = page.select_one('section[data-test-id="about-us__description"]')
             if description_section:
-                data['description'] = description_section.get_text(strip=True)
+                data['description'] = description_section.text(strip=True)
 
         return data
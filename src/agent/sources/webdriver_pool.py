@@ -0,0 +1,214 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.common.exceptions import WebDriverException, TimeoutException
+from webdriver_manager.chrome import ChromeDriverManager
+import sys
+import os
+
+# Add src to python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.agent.config import WEBDRIVER_POOL_SIZE, WEBDRIVER_MAX_USES, WEBDRIVER_LEASE_TIMEOUT, WEBDRIVER_LEAN_PROFILE
+
+# Fonts, media and images never carry the data we extract
+BLOCKED_URL_PATTERNS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m4v", "*.mp3", "*.ogg", "*.wav",
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+]
+
+def lean_chrome_options(lean: bool = WEBDRIVER_LEAN_PROFILE) -> webdriver.ChromeOptions:
+    """Headless Chrome options; the lean profile disables images and returns from page loads at DOMContentLoaded."""
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    if lean:
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--mute-audio")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+    return options
+
+def block_heavy_resources(driver, lean: bool = WEBDRIVER_LEAN_PROFILE):
+    """
+    Blocks fonts, media and images in the current tab. Chrome applies this per tab, so it
+    has to be called for every tab before it navigates.
+    """
+    if not lean:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except (WebDriverException, AttributeError) as e:
+        logging.debug(f"Could not enable resource blocking: {e}")
+
+class WebDriverPool:
+    """
+    A bounded pool of headless Chrome drivers shared across queries and requests.
+
+    Drivers are leased and returned rather than started per query. A leased driver is
+    health-checked first, and a driver is recycled (quit and replaced on demand) after
+    `max_uses` leases or whenever it is returned as unhealthy.
+    """
+
+    def __init__(self, max_size: int = WEBDRIVER_POOL_SIZE, max_uses: int = WEBDRIVER_MAX_USES, lease_timeout: float = WEBDRIVER_LEASE_TIMEOUT, driver_factory=None):
+        """
+        Args:
+            max_size: Maximum number of live drivers.
+            max_uses: Number of leases after which a driver is quit and replaced.
+            lease_timeout: Seconds to wait for a free driver before giving up.
+            driver_factory: Callable creating a new driver. Defaults to headless Chrome.
+        """
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.lease_timeout = lease_timeout
+        self._driver_factory = driver_factory or self._create_chrome_driver
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._uses = {}
+        self._live = 0
+        self._closed = False
+        self._driver_path = None
+
+    @contextmanager
+    def lease(self):
+        """Leases a driver for the duration of a `with` block."""
+        driver = self.acquire()
+        healthy = True
+        try:
+            yield driver
+        except TimeoutException:
+            raise
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            self.release(driver, healthy=healthy)
+
+    def acquire(self, timeout: float = None):
+        deadline = time.monotonic() + (self.lease_timeout if timeout is None else timeout)
+        while True:
+            with self._condition:
+                if self._closed:
+                    raise RuntimeError("WebDriverPool is closed.")
+                driver = None
+                if self._idle:
+                    driver = self._idle.popleft()
+                elif self._live < self.max_size:
+                    # Reserve the slot now; the driver is started outside the lock
+                    self._live += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No WebDriver became available within {self.lease_timeout} seconds.")
+                    self._condition.wait(remaining)
+                    continue
+
+            if driver is None:
+                try:
+                    driver = self._driver_factory()
+                except Exception:
+                    with self._condition:
+                        self._live -= 1
+                        self._condition.notify()
+                    raise
+                with self._condition:
+                    self._uses[id(driver)] = 0
+                return driver
+
+            if self._is_healthy(driver):
+                return driver
+            logging.warning("Discarding unhealthy WebDriver from the pool.")
+            self._discard(driver)
+
+    def release(self, driver, healthy: bool = True):
+        with self._condition:
+            uses = self._uses.get(id(driver), 0) + 1
+            self._uses[id(driver)] = uses
+
+        if healthy and not self._closed and uses < self.max_uses:
+            try:
+                self._reset(driver)
+            except WebDriverException:
+                healthy = False
+
+        if not healthy or self._closed or uses >= self.max_uses:
+            self._discard(driver)
+            return
+
+        with self._condition:
+            self._idle.append(driver)
+            self._condition.notify()
+
+    def prewarm(self, count: int = None):
+        """Starts up to `count` drivers (the pool size by default) so the first queries don't pay for startup."""
+        count = self.max_size if count is None else min(count, self.max_size)
+        drivers = []
+        try:
+            for _ in range(count):
+                drivers.append(self.acquire(timeout=0))
+        except TimeoutError:
+            pass
+        finally:
+            for driver in drivers:
+                self.release(driver)
+        logging.info(f"Pre-warmed {len(drivers)} WebDriver(s).")
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+        for driver in idle:
+            self._discard(driver)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {"live": self._live, "idle": len(self._idle), "max_size": self.max_size}
+
+    def _is_healthy(self, driver) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+
+    def _reset(self, driver):
+        # Leave the driver with a single blank window for the next lease
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.get("about:blank")
+
+    def _discard(self, driver):
+        with self._condition:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"Error while quitting WebDriver: {e}")
+        with self._condition:
+            self._live -= 1
+            self._condition.notify()
+
+    def _create_chrome_driver(self):
+        # Resolve the chromedriver binary once instead of on every driver start
+        if self._driver_path is None:
+            self._driver_path = ChromeDriverManager().install()
+        driver = webdriver.Chrome(service=ChromeService(self._driver_path), options=lean_chrome_options())
+        block_heavy_resources(driver)
+        return driver
+
+webdriver_pool = WebDriverPool()
@@ -0,0 +1,34 @@
+import hashlib
+from dataclasses import asdict
+from typing import List, Optional, Union
+from utils.lead_store import LeadStore
+from utils.export_cache import ExportCache
+from src.agent.config import EXPORT_CACHE_DIR, LEAD_STORE_PATH
+from src.agent.models.lead import Lead
+from src.agent.models.lead_batch import LeadBatch
+from src.modules.url_canonicalizer import domain_key
+
+lead_store = LeadStore(LEAD_STORE_PATH)
+export_cache = ExportCache(EXPORT_CACHE_DIR)
+
+def lead_key(website: Optional[str], company: Optional[str], city: Optional[str]) -> int:
+    """
+    The 64-bit key a saved lead is deduplicated on: its website's `domain_key` if it has
+    a usable website, otherwise a hash of its company and city.
+    """
+    key = domain_key(website) if isinstance(website, str) else None
+    if key is not None:
+        return key
+    text = f"company_city\x1f{company or ''}_{city or ''}"
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+def save_leads(leads: Union[List[Lead], LeadBatch], store: LeadStore = None) -> int:
+    """
+    Appends leads to the lead store, where a lead already stored is replaced by its
+    newest version. Duplicates are identified by `lead_key`: by the website's domain if
+    present, otherwise by company and city. Returns how many new leads were added.
+    """
+    store = store or lead_store
+    records = list(leads.records()) if isinstance(leads, LeadBatch) else [asdict(lead) for lead in leads]
+    keys = [lead_key(record.get('website'), record.get('company'), record.get('city')) for record in records]
+    return store.append(records, keys=keys)
@@ -1,6 +1,8 @@
 import sys
 import os
 import logging
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
@@ -11,12 +13,46 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 
 from src.agent.main import discover_scrapers
 from src.api.scraper_service import run_scrapers_service
-from src.agent.config import EXCEL_FILENAME
+from src.agent.config import EXCEL_FILENAME, JOBS_DB_PATH, JOB_HEARTBEAT_INTERVAL, JOB_TTL, JOB_WORKERS, MAX_QUEUED_JOBS, WEBDRIVER_PREWARM
+from src.agent.sources.webdriver_pool import webdriver_pool
+from src.agent.storage.lead_store import export_cache, lead_store
+from utils.jobs import JobManager, JobManagerClosedError, JobQueueFullError
+from utils.export import EXPORT_FORMATS
+from utils.export_cache import export_response
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-app = FastAPI()
+def _prewarm_webdrivers():
+    try:
+        webdriver_pool.prewarm(WEBDRIVER_PREWARM)
+    except Exception as e:
+        logging.warning(f"Could not pre-warm WebDriver pool: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start Chrome in the background so a slow or missing browser does not delay startup
+    threading.Thread(target=_prewarm_webdrivers, name="webdriver-prewarm", daemon=True).start()
+    yield
+    job_manager.close()
+    webdriver_pool.close()
+
+app = FastAPI(lifespan=lifespan)
+
+def _run_job(params: Dict[str, Any]) -> Dict[str, Any]:
+    response_data = run_scrapers_service(**params)
+    if response_data.get("status") == "error":
+        raise RuntimeError(response_data.get("error_details") or response_data.get("message"))
+    return response_data
+
+job_manager = JobManager(
+    db_path=JOBS_DB_PATH,
+    max_workers=JOB_WORKERS,
+    max_queued=MAX_QUEUED_JOBS,
+    heartbeat_interval=JOB_HEARTBEAT_INTERVAL,
+    job_ttl=JOB_TTL,
+)
+job_manager.register("run", _run_job)
 
 # --- Pydantic Models ---
 class RunRequest(BaseModel):
@@ -73,13 +109,74 @@ def run_scraper_endpoint(request: RunRequest) -> JSONResponse:
 
     return JSONResponse(content=response_data, status_code=status_code)
 
+@app.post("/api/jobs", status_code=202)
+def submit_job(request: RunRequest) -> JSONResponse:
+    """
+    Queues a lead generation run and returns immediately with the job's id and status.
+    Poll GET /api/jobs/{job_id} and fetch GET /api/jobs/{job_id}/result once it has succeeded.
+    """
+    try:
+        job = job_manager.submit("run", {
+            "query": request.query,
+            "selected_scrapers": request.selected_scrapers,
+            "confidence_threshold": request.confidence_threshold,
+        })
+    except JobQueueFullError as e:
+        return JSONResponse(status_code=429, content={"status": "error", "message": str(e)})
+    except JobManagerClosedError as e:
+        return JSONResponse(status_code=503, content={"status": "error", "message": str(e)})
+    return JSONResponse(status_code=202, content=job)
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str) -> JSONResponse:
+    """Returns the status of a queued job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Job not found."})
+    return JSONResponse(content=job)
+
+@app.get("/api/jobs/{job_id}/result")
+def get_job_result(job_id: str) -> JSONResponse:
+    """Returns the result of a succeeded job, in the same shape as POST /api/run."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Job not found."})
+    if job["status"] != job_manager.SUCCEEDED:
+        return JSONResponse(
+            status_code=409,
+            content={"status": "error", "message": f"Job is {job['status']}; no result available.", "error_details": job["error"]}
+        )
+    return JSONResponse(content=job_manager.result(job_id))
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str) -> JSONResponse:
+    """Cancels a job. A job that is already running finishes, but its result is discarded."""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Job not found."})
+    return JSONResponse(content=job)
+
 @app.get("/api/download")
-def download_excel():
+def download_excel(request: Request, format: str = "xlsx"):
     """
-    Serves the generated Excel file for download.
-    Provides a safe way to download, checking for file existence.
+    Downloads an export of the lead store in `format`: xlsx (the default), csv, ndjson,
+    csv.gz or ndjson.gz. An export is generated once per distinct set of leads and
+    format, and carries an ETag, so polling clients revalidate with If-None-Match and
+    get a 304 until new leads are saved. A workbook saved before leads were kept in
+    the store is served as is while the store is empty.
     """
-    if not os.path.exists(EXCEL_FILENAME):
+    if format not in EXPORT_FORMATS:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "error", "message": f"Unknown format. Supported formats: {', '.join(EXPORT_FORMATS)}."}
+        )
+
+    digest = lead_store.digest()
+    if digest is not None:
+        filename = f"{os.path.splitext(EXCEL_FILENAME)[0]}.{format}"
+        return export_response(request.headers, export_cache, digest, format, filename, lead_store.stream_export)
+
+    if format != "xlsx" or not os.path.exists(EXCEL_FILENAME):
         return JSONResponse(
             status_code=404,
             content={"status": "error", "message": "File not found. Please run a scraper job first."}
@@ -88,5 +185,5 @@ def download_excel():
     return FileResponse(
         path=EXCEL_FILENAME,
         filename=EXCEL_FILENAME,
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        media_type=EXPORT_FORMATS["xlsx"]
     )
@@ -9,8 +9,9 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from src.agent.main import generate_leads
-from src.agent.storage.excel_writer import ExcelWriter
-from src.agent.config import EXCEL_FILENAME
+from src.agent.storage.lead_store import save_leads
+from utils.search_cache import normalize_query
+from utils.single_flight import single_flight
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -21,8 +22,15 @@ def run_scrapers_service(query: str, selected_scrapers: List[str], confidence_th
     - Handles scraper execution
     - Logs execution time
     - Manages errors and empty results
-    - Ensures safe creation of the Excel file
+    - Stores new leads in the lead store
+
+    Equivalent requests that arrive while one is already running attach to it
+    and receive the same response instead of scraping again.
     """
+    key = ("run", normalize_query(query), tuple(sorted(selected_scrapers or [])), float(confidence_threshold))
+    return single_flight.do(key, _run_scrapers_service, query, selected_scrapers, confidence_threshold)
+
+def _run_scrapers_service(query: str, selected_scrapers: List[str], confidence_threshold: float) -> Dict[str, Any]:
     start_time = time.time()
     logging.info(f"Starting scraper service for query: '{query}'")
 
@@ -44,13 +52,12 @@ def run_scrapers_service(query: str, selected_scrapers: List[str], confidence_th
                 "data": {"leads": []}
             }
 
-        # 3. Save to Excel safely
+        # 3. Save to the lead store safely
         try:
-            excel_writer = ExcelWriter(filename=EXCEL_FILENAME)
-            excel_writer.save(leads)
-            logging.info(f"Successfully saved leads to {EXCEL_FILENAME}")
+            added = save_leads(leads)
+            logging.info(f"Successfully saved {added} new leads to the lead store")
         except Exception as e:
-            logging.error(f"Failed to save leads to Excel: {e}")
+            logging.error(f"Failed to save leads to the lead store: {e}")
             # Decide if this should be a critical failure or just a warning
             # For now, we'll log the error and continue to return the leads data
             pass # Or raise a specific internal error
@@ -1,87 +1,174 @@
 import copy
-from typing import List, Dict, Any, Optional, Set
+import sys
+import os
+from typing import List, Dict, Any, Optional, Sequence, Set
+
+# Add src to python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 from agent.models.lead import Lead
+from modules.fuzzy_matcher import FuzzyMatcher
+from modules.url_canonicalizer import DomainIndex
+
+# Fields where the first non-null value in a group wins
+_FIRST_VALUE_FIELDS = ('name', 'company', 'city', 'title', 'email', 'phone', 'website', 'notes')
 
 class Deduplicator:
     """A class to deduplicate and merge a list of Lead objects."""
 
+    def __init__(self, fuzzy_threshold: Optional[float] = None):
+        """
+        `fuzzy_threshold` turns on near-duplicate matching of company names (see
+        `FuzzyMatcher`); names at least this similar, from 0 to 1, are merged as well.
+        """
+        self.fuzzy_matcher = FuzzyMatcher(fuzzy_threshold) if fuzzy_threshold is not None else None
+
     def deduplicate(self, leads: List[Lead]) -> List[Lead]:
         """
-        Deduplicates a list of leads based on website, or a combination of
+        Deduplicates a list of leads based on website domain, or a combination of
         business name and city as a fallback. Merges duplicate entries,
         handling transitive relationships.
         """
         if not leads:
             return []
 
+        groups = self._group_indices(
+            [lead.website for lead in leads],
+            [lead.company for lead in leads],
+            [lead.city for lead in leads],
+        )
+        return [self._merge_group([leads[i] for i in group]) for group in groups]
+
+    def deduplicate_batch(self, batch):
+        """
+        `deduplicate` for a `LeadBatch`: duplicates are found and merged column by column,
+        without building Lead objects, and the merged leads come back as a new batch of
+        the same type, in the same order `deduplicate` would return them.
+        """
+        groups = self._group_indices(batch.column("website"), batch.column("company"), batch.column("city"))
+        columns = {name: [] for name in batch.columns}
+        for group in groups:
+            for name, value in self._merge_rows(batch.columns, group).items():
+                columns[name].append(value)
+        return type(batch)(columns)
+
+    def _group_indices(self, websites: Sequence[Optional[str]], companies: Sequence[Optional[str]], cities: Sequence[Optional[str]]) -> List[List[int]]:
+        """
+        Positions of duplicate leads, grouped, given the leads' websites, companies and
+        cities. Groups are in the order of their first lead, and so are their members.
+        """
         # Union-Find data structure
-        parent = list(range(len(leads)))
+        parent = list(range(len(companies)))
         def find(i):
-            if parent[i] == i:
-                return i
-            parent[i] = find(parent[i])
-            return parent[i]
+            # Iterative with path halving, so long chains can't hit the recursion limit
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
         def union(i, j):
             root_i = find(i)
             root_j = find(j)
             if root_i != root_j:
                 parent[root_j] = root_i
 
-        # Map keys (websites, company/city tuples) to lead indices
+        # Map keys (website domains, company/city tuples) to lead indices
+        domain_to_index = DomainIndex()
         key_to_index: Dict[Any, int] = {}
 
-        for i, lead in enumerate(leads):
-            # Check for website key
-            if lead.website:
-                if lead.website in key_to_index:
-                    union(i, key_to_index[lead.website])
-                else:
-                    key_to_index[lead.website] = i
+        for i, (website, company, city) in enumerate(zip(websites, companies, cities)):
+            # Check for website key; URL variants of the same site share a domain key
+            if website:
+                first = domain_to_index.setdefault(website, i)
+                if first != i:
+                    union(i, first)
 
             # Check for company/city key
-            company_city = (lead.company, lead.city)
+            company_city = (company, city)
             if company_city in key_to_index:
                 union(i, key_to_index[company_city])
             else:
                 key_to_index[company_city] = i
 
+        # Near-duplicate company names join the same groups
+        if self.fuzzy_matcher is not None:
+            for i, j in self.fuzzy_matcher.match_columns(companies, cities):
+                union(i, j)
+
         # Group leads by their root parent
-        merged_leads_groups: Dict[int, List[Lead]] = {}
-        for i, lead in enumerate(leads):
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(parent)):
             root = find(i)
-            if root not in merged_leads_groups:
-                merged_leads_groups[root] = []
-            merged_leads_groups[root].append(lead)
-
-        # Merge the leads within each group
-        final_leads: List[Lead] = []
-        for group in merged_leads_groups.values():
-            if not group:
-                continue
+            if root in groups:
+                groups[root].append(i)
+            else:
+                groups[root] = [i]
+        return list(groups.values())
 
-            merged_lead = copy.deepcopy(group[0])
-            for i in range(1, len(group)):
-                merged_lead = self._merge_leads(merged_lead, group[i])
-            final_leads.append(merged_lead)
+    def _merge_group(self, group: List[Lead]) -> Lead:
+        """
+        Merges a group of duplicate leads into one new Lead in a single pass. The first
+        lead's values are kept and its missing fields are filled from the later leads in
+        order; 'source' and 'linkedin_profile' become the sorted, unique union of every
+        lead's comma-separated values.
+        """
+        merged_lead = copy.copy(group[0])
+        if len(group) == 1:
+            return merged_lead
+
+        sources: Set[str] = set()
+        linkedin_profiles: Set[str] = set()
+        missing = [field for field in _FIRST_VALUE_FIELDS if getattr(merged_lead, field) is None]
+        for lead in group:
+            self._add_comma_separated_values(sources, lead.source)
+            self._add_comma_separated_values(linkedin_profiles, lead.linkedin_profile)
+            if missing:
+                for field in list(missing):
+                    value = getattr(lead, field)
+                    if value is not None:
+                        setattr(merged_lead, field, value)
+                        missing.remove(field)
+
+        merged_lead.source = self._join_values(sources)
+        merged_lead.linkedin_profile = self._join_values(linkedin_profiles)
+        return merged_lead
 
-        return final_leads
+    def _merge_rows(self, columns: Dict[str, list], group: List[int]) -> Dict[str, Any]:
+        """`_merge_group` for leads held as columns: the merged lead's field values."""
+        first = group[0]
+        merged = {name: column[first] for name, column in columns.items()}
+        if len(group) == 1:
+            return merged
+
+        sources: Set[str] = set()
+        linkedin_profiles: Set[str] = set()
+        for i in group:
+            self._add_comma_separated_values(sources, columns['source'][i])
+            self._add_comma_separated_values(linkedin_profiles, columns['linkedin_profile'][i])
+        for field in _FIRST_VALUE_FIELDS:
+            if merged[field] is None:
+                merged[field] = next((columns[field][i] for i in group if columns[field][i] is not None), None)
+
+        merged['source'] = self._join_values(sources)
+        merged['linkedin_profile'] = self._join_values(linkedin_profiles)
+        return merged
+
+    def _add_comma_separated_values(self, values: Set[str], field: Optional[str]):
+        if field:
+            values.update(s.strip() for s in field.split(','))
+
+    def _join_values(self, values: Set[str]) -> Optional[str]:
+        values.discard('')
+        return ", ".join(sorted(values)) if values else None
 
     def _merge_comma_separated_fields(self, field1: Optional[str], field2: Optional[str]) -> Optional[str]:
         """
         Merges two comma-separated string fields into a single sorted,
         comma-separated string with unique values.
         """
-        if not field1 and not field2:
-            return None
-
-        set1 = set(s.strip() for s in field1.split(',')) if field1 else set()
-        set2 = set(s.strip() for s in field2.split(',')) if field2 else set()
-
-        set1.discard('')
-        set2.discard('')
-
-        merged_set = sorted(list(set1.union(set2)))
-        return ", ".join(merged_set) if merged_set else None
+        values: Set[str] = set()
+        self._add_comma_separated_values(values, field1)
+        self._add_comma_separated_values(values, field2)
+        return self._join_values(values)
 
     def _merge_leads(self, lead1: Lead, lead2: Lead) -> Lead:
         """
@@ -89,15 +176,4 @@ class Deduplicator:
         Appends unique values for 'source' and 'linkedin_profile'.
         Returns a new merged Lead object.
         """
-        merged_lead = copy.deepcopy(lead1)
-
-        # Merge 'source' and 'linkedin_profile'
-        merged_lead.source = self._merge_comma_separated_fields(lead1.source, lead2.source)
-        merged_lead.linkedin_profile = self._merge_comma_separated_fields(lead1.linkedin_profile, lead2.linkedin_profile)
-
-        # Merge other fields, prioritizing existing data over None
-        for field in ['name', 'company', 'city', 'title', 'email', 'phone', 'website', 'notes']:
-            if getattr(merged_lead, field) is None and getattr(lead2, field) is not None:
-                setattr(merged_lead, field, getattr(lead2, field))
-
-        return merged_lead
+        return self._merge_group([lead1, lead2])
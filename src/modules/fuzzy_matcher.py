@@ -0,0 +1,138 @@
+import hashlib
+import random
+import re
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+class FuzzyMatcher:
+    """
+    Finds leads whose company names are near-duplicates, e.g. "Hilton London Ltd" and
+    "Hilton London", without comparing every pair.
+
+    Names are normalized (lowercased, punctuation and legal suffixes dropped) and split
+    into character trigrams. Each name gets a MinHash signature, and locality-sensitive
+    hashing over bands of that signature puts similar names into shared buckets. Only
+    leads sharing a bucket are compared, by the exact Jaccard similarity of their
+    trigrams, so the work grows with the number of leads rather than the number of pairs.
+    """
+
+    NUM_PERM = 64
+    SHINGLE_SIZE = 3
+    # Bands are sized for a threshold this much lower than requested, trading a few
+    # extra exact comparisons for fewer missed matches
+    RECALL_MARGIN = 0.1
+    LEGAL_SUFFIXES = {
+        "ltd", "limited", "llc", "llp", "inc", "incorporated", "corp", "corporation",
+        "co", "company", "plc", "gmbh", "pvt", "pty", "sa", "ag", "bv", "the",
+    }
+
+    _NON_WORD = re.compile(r"[\W_]+")
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = NUM_PERM, seed: int = 1):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"Fuzzy match threshold must be in (0, 1], got {threshold}.")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = self._band_layout(num_perm, max(threshold - self.RECALL_MARGIN, 0.01))
+        # One random 64-bit mask per hash function; XOR with a mask permutes the hash space
+        rng = random.Random(seed)
+        self._masks = [rng.getrandbits(64) for _ in range(num_perm)]
+        self._shingle_hashes: Dict[str, int] = {}
+
+    def normalize(self, name: Optional[str]) -> str:
+        """Lowercases `name`, drops punctuation and legal suffixes, and collapses whitespace."""
+        if not name:
+            return ""
+        tokens = self._NON_WORD.sub(" ", name.lower()).split()
+        return " ".join(token for token in tokens if token not in self.LEGAL_SUFFIXES)
+
+    def similarity(self, name1: Optional[str], name2: Optional[str]) -> float:
+        """Jaccard similarity of the two names' trigrams, after normalization."""
+        shingles1 = self._shingles(self.normalize(name1))
+        shingles2 = self._shingles(self.normalize(name2))
+        return self._jaccard(shingles1, shingles2)
+
+    def matches(self, leads: list) -> Iterator[Tuple[int, int]]:
+        """
+        Yields index pairs of leads whose company names are at least `threshold` similar
+        and whose cities don't conflict (a missing city matches any city). Pairs are
+        enough to rebuild the clusters; not every matching pair is yielded.
+        """
+        return self.match_columns([lead.company for lead in leads], [lead.city for lead in leads])
+
+    def match_columns(self, companies: Sequence[Optional[str]], cities: Sequence[Optional[str]]) -> Iterator[Tuple[int, int]]:
+        """`matches` for leads given as their company and city columns."""
+        # Leads with the same normalized name and city are matches outright; only one
+        # representative of each goes through LSH
+        representatives: Dict[Tuple[str, str], int] = {}
+        for i, (company, city) in enumerate(zip(companies, cities)):
+            name = self.normalize(company)
+            if not name:
+                continue
+            key = (name, (city or "").strip().lower())
+            if key in representatives:
+                yield representatives[key], i
+            else:
+                representatives[key] = i
+
+        shingles: Dict[int, Set[str]] = {}
+        buckets: Dict[Tuple[int, int], List[int]] = {}
+        for (name, _), i in representatives.items():
+            shingles[i] = self._shingles(name)
+            signature = self._signature(shingles[i])
+            for band in range(self.bands):
+                band_key = (band, hash(tuple(signature[band * self.rows:(band + 1) * self.rows])))
+                buckets.setdefault(band_key, []).append(i)
+
+        compared: Set[Tuple[int, int]] = set()
+        for members in buckets.values():
+            for a in range(len(members)):
+                for b in range(a + 1, len(members)):
+                    pair = (members[a], members[b])
+                    if pair in compared:
+                        continue
+                    compared.add(pair)
+                    i, j = pair
+                    if self._cities_conflict(cities[i], cities[j]):
+                        continue
+                    if self._jaccard(shingles[i], shingles[j]) >= self.threshold:
+                        yield pair
+
+    def _shingles(self, name: str) -> Set[str]:
+        if len(name) <= self.SHINGLE_SIZE:
+            return {name} if name else set()
+        return {name[k:k + self.SHINGLE_SIZE] for k in range(len(name) - self.SHINGLE_SIZE + 1)}
+
+    def _signature(self, shingles: Set[str]) -> List[int]:
+        hashes = [self._shingle_hash(shingle) for shingle in shingles]
+        return [min(map(mask.__xor__, hashes)) for mask in self._masks]
+
+    def _shingle_hash(self, shingle: str) -> int:
+        # Stable 64-bit hashes, so buckets don't depend on PYTHONHASHSEED; trigrams repeat
+        # across names, so each is hashed once
+        value = self._shingle_hashes.get(shingle)
+        if value is None:
+            value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+            self._shingle_hashes[shingle] = value
+        return value
+
+    @staticmethod
+    def _jaccard(shingles1: Set[str], shingles2: Set[str]) -> float:
+        if not shingles1 or not shingles2:
+            return 0.0
+        intersection = len(shingles1 & shingles2)
+        return intersection / (len(shingles1) + len(shingles2) - intersection)
+
+    @staticmethod
+    def _cities_conflict(city1: Optional[str], city2: Optional[str]) -> bool:
+        if not city1 or not city2:
+            return False
+        return city1.strip().lower() != city2.strip().lower()
+
+    @staticmethod
+    def _band_layout(num_perm: int, threshold: float) -> Tuple[int, int]:
+        """
+        Picks bands x rows = num_perm so that names about `threshold` similar become
+        candidates: the S-curve 1 - (1 - s^rows)^bands rises around (1/bands)^(1/rows).
+        """
+        layouts = [(bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+        return min(layouts, key=lambda layout: abs((1 / layout[0]) ** (1 / layout[1]) - threshold))
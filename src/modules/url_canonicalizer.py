@@ -0,0 +1,158 @@
+import hashlib
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Query parameters that identify a click or campaign, not a page
+TRACKING_PARAMS = {
+    "gclid", "gbraid", "wbraid", "dclid", "fbclid", "msclkid", "yclid", "igshid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "ref_src", "srsltid",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+# Link wrappers that redirect to the URL in one of their parameters, keyed by site name
+# (the registered domain without its suffix, so google.com and google.co.uk both match)
+# and then by path
+REDIRECT_WRAPPERS = {
+    "google": {"/url": ("q", "url")},
+    "facebook": {"/l.php": ("u",)},
+    "instagram": {"": ("u",)},
+    "linkedin": {"/redir/redirect": ("url",)},
+    "duckduckgo": {"/l": ("uddg",)},
+    "youtube": {"/redirect": ("q",)},
+}
+
+# Sites hosting many businesses' pages; their websites are told apart by path, not domain
+SHARED_HOSTS = {
+    "facebook.com", "instagram.com", "linkedin.com", "twitter.com", "x.com", "tiktok.com",
+    "youtube.com", "google.com", "goo.gl", "yelp.com", "linktr.ee", "wixsite.com",
+}
+
+# Hosting platforms giving each customer a subdomain, from the private section of the
+# Public Suffix List: acme.myshopify.com and other.myshopify.com are different businesses
+MULTI_TENANT_SUFFIXES = {
+    "myshopify.com", "github.io", "gitlab.io", "netlify.app", "vercel.app", "pages.dev",
+    "herokuapp.com", "web.app", "firebaseapp.com", "appspot.com", "azurewebsites.net",
+    "cloudfront.net", "blogspot.com", "wordpress.com", "business.site", "square.site",
+    "squarespace.com", "weebly.com", "webflow.io", "carrd.co", "godaddysites.com",
+    "tumblr.com", "substack.com", "glitch.me", "onrender.com", "fly.dev", "repl.co",
+    "s3.amazonaws.com",
+}
+
+# Second-level labels under which country domains register names, as in acme.co.uk
+_SECOND_LEVEL_LABELS = {"co", "com", "net", "org", "gov", "ac", "edu", "ltd", "plc", "me"}
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_MAX_UNWRAPS = 3
+
+def canonicalize_url(url: Optional[str]) -> Optional[str]:
+    """
+    Returns a canonical form of `url`, or None if it isn't a website address. Redirect
+    wrappers such as Google's `/url?q=` links are resolved, the host is lowercased and
+    loses its `www.`, and tracking parameters, fragments, default ports and trailing
+    slashes are dropped. A missing scheme becomes `http`.
+    """
+    parts = _canonical_parts(url)
+    if parts is None:
+        return None
+    scheme, host, port, path, query = parts
+    return f"{scheme}://{host}{port}{path}" + (f"?{query}" if query else "")
+
+def registered_domain(host: str) -> str:
+    """
+    The name a business registers, e.g. `acme.co.uk` for `shop.acme.co.uk`, or
+    `acme.myshopify.com` for a site on a `MULTI_TENANT_SUFFIXES` platform.
+    """
+    labels = host.split(".")
+    for size in (3, 2):
+        if len(labels) > size and ".".join(labels[-size:]) in MULTI_TENANT_SUFFIXES:
+            return ".".join(labels[-size - 1:])
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_LABELS:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+@lru_cache(maxsize=65536)
+def domain_key(url: Optional[str]) -> Optional[int]:
+    """
+    A 64-bit hash identifying the business behind `url`: its registered domain, or for
+    shared hosts like facebook.com, the canonical page address. None for empty or
+    invalid URLs. Websites with the same key are the same business's site.
+    """
+    parts = _canonical_parts(url)
+    if parts is None:
+        return None
+    _, host, _, path, query = parts
+    domain = registered_domain(host)
+    key = f"{host}{path}?{query}" if domain in SHARED_HOSTS else domain
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+class DomainIndex:
+    """
+    Maps websites to values by `domain_key`, so `https://www.acme.com/`, `http://acme.com`
+    and `acme.com/?utm_source=x` share one entry. Only the 64-bit hashes are kept, not the
+    URLs.
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, Any] = {}
+
+    def setdefault(self, url: Optional[str], value: Any) -> Any:
+        """Returns the value already stored for `url`'s domain, storing `value` if there is none."""
+        key = domain_key(url)
+        if key is None:
+            return value
+        return self._entries.setdefault(key, value)
+
+    def get(self, url: Optional[str], default: Any = None) -> Any:
+        key = domain_key(url)
+        return self._entries.get(key, default) if key is not None else default
+
+    def __contains__(self, url: Optional[str]) -> bool:
+        key = domain_key(url)
+        return key is not None and key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def _canonical_parts(url: Optional[str]) -> Optional[Tuple[str, str, str, str, str]]:
+    if not isinstance(url, str) or not url.strip():
+        return None
+    url = url.strip()
+    for _ in range(_MAX_UNWRAPS + 1):
+        if "://" not in url and not url.startswith("//"):
+            url = "http://" + url
+        try:
+            split = urlsplit(url)
+            port = split.port
+        except ValueError:
+            return None
+        host = (split.hostname or "").rstrip(".")
+        if host.startswith("www."):
+            host = host[4:]
+        if not host or ("." not in host and host != "localhost"):
+            return None
+        path = split.path.rstrip("/")
+        params = parse_qsl(split.query, keep_blank_values=True) if split.query else []
+        # Every wrapper carries its target in a parameter
+        target = _redirect_target(host, path, params) if params else None
+        if target is None:
+            break
+        url = target
+
+    scheme = split.scheme.lower() or "http"
+    port = f":{port}" if port and port != _DEFAULT_PORTS.get(scheme) else ""
+    query = urlencode([(name, value) for name, value in params if not _is_tracking(name)]) if params else ""
+    return scheme, host, port, path, query
+
+def _redirect_target(host: str, path: str, params: list) -> Optional[str]:
+    site = registered_domain(host).split(".", 1)[0]
+    names = REDIRECT_WRAPPERS.get(site, {}).get(path)
+    if not names:
+        return None
+    for name, value in params:
+        if name in names and value.startswith(("http://", "https://")):
+            return value
+    return None
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
@@ -1,8 +1,53 @@
 import pytest
 import os
+import time
+
+from utils.search_cache import SearchCache
+from utils.http_cache import HttpCache
+from utils.http_client import http_client
+from utils.lead_store import LeadStore
+from utils.rate_limiter import rate_limiter
+from utils.circuit_breaker import circuit_breakers
+from scrapers.base import BaseScraper
+from orchestrator import ScrapeOrchestrator
 
 SAMPLES_DIR = os.path.join(os.path.dirname(__file__), "samples")
 
+@pytest.fixture(autouse=True)
+def fresh_rate_limits():
+    """Starts every test with full burst allowances so pacing from earlier tests doesn't slow it down."""
+    rate_limiter.reset()
+    yield
+    rate_limiter.reset()
+
+@pytest.fixture(autouse=True)
+def closed_circuit_breakers():
+    """Failures simulated by one test must not open a platform's circuit for the next."""
+    circuit_breakers.reset()
+    yield
+    circuit_breakers.reset()
+
+@pytest.fixture(autouse=True)
+def isolated_search_cache(tmp_path, monkeypatch):
+    """Gives every test an empty search cache so mocked search results never leak between tests."""
+    cache = SearchCache(db_path=str(tmp_path / "search_cache.sqlite3"))
+    monkeypatch.setattr("utils.search_cache.search_cache", cache)
+    return cache
+
+@pytest.fixture(autouse=True)
+def isolated_http_cache(tmp_path, monkeypatch):
+    """Same as `isolated_search_cache`, for the shared HTTP client's response cache."""
+    cache = HttpCache(db_path=str(tmp_path / "http_cache.sqlite3"))
+    monkeypatch.setattr(http_client, "cache", cache)
+    return cache
+
+@pytest.fixture(autouse=True)
+def isolated_lead_store(tmp_path, monkeypatch):
+    """Keeps leads saved by one test out of the agent's lead store and out of the next test."""
+    store = LeadStore(db_path=str(tmp_path / "leads.sqlite3"))
+    monkeypatch.setattr("src.agent.storage.lead_store.lead_store", store)
+    return store
+
 @pytest.fixture(scope="session")
 def samples_dir():
     if not os.path.exists(SAMPLES_DIR):
@@ -36,3 +81,27 @@ def samples_dir():
             """)
 
     return SAMPLES_DIR
+
+class FakeScraper(BaseScraper):
+    def __init__(self, platform, delay=0.0, error=None):
+        self.platform = platform
+        self.delay = delay
+        self.error = error
+
+    def scrape(self, query):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [{'business_name': f"{self.platform} result", 'platform': self.platform}], None
+
+    def _parse_search_results(self, soup):
+        return []
+
+    def _parse_profile_page(self, soup, source_url):
+        return {}
+
+@pytest.fixture
+def fake_registry(mocker):
+    scrapers = {platform: FakeScraper(platform) for platform in ScrapeOrchestrator.PLATFORMS}
+    mocker.patch('orchestrator.scraper_registry.get_scraper', side_effect=lambda platform: scrapers[platform])
+    return scrapers
@@ -0,0 +1,48 @@
+import asyncio
+import os
+from backend.services.scraper import ScraperService
+
+AGGREGATED = {
+    "query": "test",
+    "platforms": {"google_search": [{'business_name': 'Test Business', 'platform': 'google_search', 'source_url': 'https://example.com'}]},
+    "pagination": {"google_search": False},
+    "errors": [],
+}
+
+def test_run_scraper_async_exports_off_the_loop(mocker, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    async def fake_arun(query, executor=None):
+        return {**AGGREGATED, "platforms": dict(AGGREGATED["platforms"])}
+
+    mocker.patch('backend.services.scraper.scrape_orchestrator.arun', side_effect=fake_arun)
+    service = ScraperService(max_workers=2)
+
+    async def main():
+        return await asyncio.gather(*(service.run_scraper_async(f"test {i}") for i in range(3)))
+
+    results = asyncio.run(main())
+    filenames = {result['filename'] for result in results}
+    # Concurrent runs must not overwrite each other's export
+    assert len(filenames) == 3
+    for filename in filenames:
+        # Excel files are only generated when downloaded
+        assert not os.path.exists(os.path.join(tmp_path, service.get_excel_path(filename)))
+        assert os.path.exists(os.path.join(tmp_path, service.download_response(filename, {}).path))
+
+def test_identical_concurrent_requests_are_coalesced(mocker, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    async def fake_arun(query, executor=None):
+        await asyncio.sleep(0.1)
+        return {**AGGREGATED, "platforms": dict(AGGREGATED["platforms"])}
+
+    arun = mocker.patch('backend.services.scraper.scrape_orchestrator.arun', side_effect=fake_arun)
+    service = ScraperService(max_workers=2)
+
+    async def main():
+        return await asyncio.gather(*(service.run_scraper_async(query) for query in ["Hotels in London", "hotels  in london", "hotels in london"]))
+
+    results = asyncio.run(main())
+    assert arun.call_count == 1
+    assert len({result['filename'] for result in results}) == 1
@@ -0,0 +1,46 @@
+import json
+import utils.html_parser
+from benchmarks.parsers import load_corpus, run_benchmarks, compare, main, workloads, DEFAULT_CORPUS
+
+def test_benchmark_report_covers_every_workload(samples_dir):
+    pages = load_corpus(DEFAULT_CORPUS, use_mmap=True)
+    try:
+        report = run_benchmarks(pages, ["html.parser"], min_time=0)
+    finally:
+        for page in pages:
+            page.close()
+
+    assert {"google_search_results.html", "tests/samples/google_maps_profile.html"} <= {page["name"] for page in report["corpus"]}
+    workloads = report["results"]["html.parser"]
+    assert {"scrapers.google_maps", "sources.google", "sources.linkedin_public", "contacts"} <= set(workloads)
+    assert all(metrics["pages_per_sec"] > 0 and metrics["mb_per_sec"] > 0 for metrics in workloads.values())
+
+def test_compare_flags_slowdowns_and_memory_growth():
+    old = {"results": {"lxml": {"contacts": {"pages_per_sec": 1000.0, "mb_per_sec": 5.0, "peak_memory_kb": 10.0}}}}
+    new = {"results": {"lxml": {"contacts": {"pages_per_sec": 800.0, "mb_per_sec": 4.0, "peak_memory_kb": 20.0}, "new": {"pages_per_sec": 1.0, "mb_per_sec": 1.0, "peak_memory_kb": 1.0}}}}
+
+    assert len(compare(old, new, tolerance=0.1)) == 2
+    assert compare(old, old) == []
+
+def test_cli_writes_diffable_json(tmp_path, samples_dir):
+    output = tmp_path / "parsers.json"
+
+    status = main(["--backends", "html.parser", "--workloads", "contacts", "--min-time", "0", "--output", str(output)])
+
+    assert status == 0
+    report = json.loads(output.read_text())
+    assert list(report["results"]["html.parser"]) == ["contacts"]
+    assert output.read_text() == json.dumps(report, indent=2, sort_keys=True) + "\n"
+
+def test_every_workload_parses_with_the_backend_it_is_given(samples_dir, mocker):
+    pages = load_corpus(DEFAULT_CORPUS)
+    parse = mocker.spy(utils.html_parser, "parse_html")
+    for module in ("benchmarks.parsers", "src.agent.sources.google_scraper", "src.agent.sources.linkedin_public_scraper"):
+        mocker.patch(f"{module}.parse_html", parse)
+
+    for name, run in workloads().items():
+        parse.reset_mock()
+        run(pages[0].html(), "lxml")
+        assert parse.call_count, name
+        assert {call.args[1] for call in parse.call_args_list} == {"lxml"}, name
+    assert utils.html_parser.DEFAULT_BACKEND is None
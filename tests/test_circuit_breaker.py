@@ -0,0 +1,82 @@
+import time
+from errors import NoResultsFoundError
+from orchestrator import ScrapeOrchestrator
+from utils.circuit_breaker import CircuitBreaker, circuit_breakers
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("facebook", failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.retry_after() > 0
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("facebook", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+def test_orchestrator_fails_fast_once_open(fake_registry):
+    fake_registry['facebook'].error = NoResultsFoundError('facebook')
+    orchestrator = ScrapeOrchestrator()
+    for _ in range(circuit_breakers.failure_threshold):
+        orchestrator.run("test")
+
+    fake_registry['facebook'].delay = 5.0
+    start = time.monotonic()
+    result = orchestrator.run("test")
+    assert time.monotonic() - start < 1.0
+    facebook_error = result['errors'][0]
+    assert facebook_error['platform'] == 'facebook'
+    assert "Circuit breaker open" in facebook_error['reason']
+    assert "retried automatically" in facebook_error['recommended_action']
+    assert circuit_breakers.get('google_search').state == CircuitBreaker.CLOSED
+
+def test_generate_leads_only_counts_platform_failures(mocker):
+    from src.agent.main import generate_leads
+    from src.agent.sources.base_source import BaseSource
+
+    class GoogleMapsScraper(BaseSource):
+        def __init__(self, query):
+            self.query = query
+
+        def scrape(self):
+            raise NoResultsFoundError('google_maps')
+
+    class BrokenScraper(BaseSource):
+        def __init__(self, query):
+            self.query = query
+
+        def scrape(self):
+            raise KeyError('bug in our parsing code')
+
+    class FacebookPublicScraper(BaseSource):
+        def __init__(self, target_id):
+            self.target_id = target_id
+
+        def scrape(self):
+            raise AssertionError("can't be built from a query")
+
+    mocker.patch("src.agent.main.discover_scrapers", return_value=[GoogleMapsScraper, BrokenScraper, FacebookPublicScraper])
+    for _ in range(circuit_breakers.failure_threshold):
+        generate_leads("Hotels in London")
+
+    assert circuit_breakers.get('google_maps').state == CircuitBreaker.OPEN
+    assert circuit_breakers.get('google').state == CircuitBreaker.CLOSED
+    assert circuit_breakers.get('broken').state == CircuitBreaker.CLOSED
+    assert circuit_breakers.get('facebook').state == CircuitBreaker.CLOSED
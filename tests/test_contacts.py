@@ -0,0 +1,61 @@
+from utils.contacts import extract_contacts, extract_contacts_batch
+from src.agent.sources.facebook_public_scraper import FacebookPublicScraper
+
+def test_single_pass_finds_every_kind():
+    contacts = extract_contacts(
+        "Mail Info@Acme.COM or call (555) 123-4567. Shop: https://Acme.COM/Store?ref=bio). "
+        "Also www.Acme-Shop.com/sale, +1 555 987 6543 and sales@acme.com."
+    )
+
+    assert contacts.emails == ["info@acme.com", "sales@acme.com"]
+    assert contacts.phones == ["(555) 123-4567", "+1 555 987 6543"]
+    assert contacts.urls == ["https://acme.com/Store?ref=bio", "www.acme-shop.com/sale"]
+    assert (contacts.email, contacts.phone, contacts.url) == ("info@acme.com", "(555) 123-4567", "https://acme.com/Store?ref=bio")
+
+def test_duplicates_are_removed_within_a_text():
+    contacts = extract_contacts("555-123-4567, 555.123.4567, (555) 123-4567, A@B.io a@b.io")
+
+    assert contacts.phones == ["555-123-4567"]
+    assert contacts.emails == ["a@b.io"]
+
+def test_addresses_inside_urls_and_non_contacts_are_ignored():
+    contacts = extract_contacts("See https://x.io/?mail=a@b.com&id=5551234567, order #12345678901, user@localhost")
+
+    assert contacts.urls == ["https://x.io/?mail=a@b.com&id=5551234567"]
+    assert contacts.emails == []
+    assert contacts.phones == []
+
+def test_phones_need_an_area_code_unless_local_numbers_are_asked_for():
+    text = "Rooms from 1250000 GBP, listing 448-2210, postcode 123 4567"
+
+    assert extract_contacts(text).phones == []
+    assert extract_contacts("Call 555 123 4567 or 448-2210").phones == ["555 123 4567"]
+    assert extract_contacts(text, local_phones=True).phones == ["1250000", "448-2210", "123 4567"]
+    assert extract_contacts_batch(["Call 448-2210", text], local_phones=True)[0].phones == ["448-2210"]
+
+def test_batch_keeps_results_per_text():
+    results = extract_contacts_batch(["a@b.com 555-123-4567", "", None, "a@b.com", "https://a.io"])
+
+    assert [(c.emails, c.phones, c.urls) for c in results] == [
+        (["a@b.com"], ["555-123-4567"], []),
+        ([], [], []),
+        ([], [], []),
+        (["a@b.com"], [], []),
+        ([], [], ["https://a.io"]),
+    ]
+    assert extract_contacts_batch([]) == []
+
+def test_facebook_scraper_scans_matching_posts(mocker):
+    mocker.patch("src.agent.sources.facebook_public_scraper.get_profile", return_value={"Name": "Acme", "About": "Plumbers"})
+    mocker.patch("src.agent.sources.facebook_public_scraper.get_posts", return_value=iter([
+        {"text": "Hiring! Email jobs@acme.com"},
+        {"text": "Plumbing offer: call 555-123-4567 or write offers@acme.com"},
+        {"text": "Plumbing again: 555.123.4567"},
+        {"text": ""},
+    ]))
+
+    leads = FacebookPublicScraper("acme", keywords=["plumbing"]).scrape()
+
+    assert len(leads) == 1
+    assert leads[0].email == "offers@acme.com"
+    assert leads[0].phone == "555-123-4567"
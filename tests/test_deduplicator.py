@@ -0,0 +1,93 @@
+import json
+import pytest
+from src.modules.deduplicator import Deduplicator
+from src.modules.fuzzy_matcher import FuzzyMatcher
+from src.agent.models.lead import Lead
+from benchmarks.dedup import synthetic_leads, main
+
+def test_transitive_duplicates_merge_into_one_lead():
+    leads = [
+        Lead(name="Ann", company="Acme", city="London", website="https://acme.example", source="google"),
+        Lead(name="Bob", company="Acme Ltd", email="bob@acme.example", website="https://acme.example", source="linkedin, google", linkedin_profile="https://linkedin.com/in/bob"),
+        Lead(name="Cy", company="Acme Ltd", city=None, phone="555-123-4567", source="facebook", linkedin_profile="https://linkedin.com/in/cy, "),
+        Lead(name="Dee", company="Other", city="Leeds", source="google"),
+    ]
+
+    merged = Deduplicator().deduplicate(leads)
+
+    assert len(merged) == 2
+    acme = merged[0]
+    assert (acme.name, acme.company, acme.city, acme.email, acme.phone) == ("Ann", "Acme", "London", "bob@acme.example", "555-123-4567")
+    assert acme.source == "facebook, google, linkedin"
+    assert acme.linkedin_profile == "https://linkedin.com/in/bob, https://linkedin.com/in/cy"
+    assert merged[1].source == "google"
+
+def test_merging_leaves_the_input_leads_untouched():
+    first = Lead(name="Ann", company="Acme", website="https://acme.example", source="google")
+    first.confidence_score = 0.7
+    second = Lead(name="Bob", company="Acme", email="bob@acme.example", website="https://acme.example", source="linkedin")
+
+    merged = Deduplicator().deduplicate([first, second])
+
+    assert merged[0] is not first
+    assert merged[0].confidence_score == 0.7
+    assert (merged[0].email, merged[0].source) == ("bob@acme.example", "google, linkedin")
+    assert (first.email, first.source) == (None, "google")
+
+def test_long_duplicate_chains_do_not_recurse():
+    # Each lead shares its website with the previous one and company/city with the next
+    leads = [Lead(name=str(i), company=f"C{i // 2}", city="X", website=f"https://w{(i + 1) // 2}.example") for i in range(20000)]
+
+    assert len(Deduplicator().deduplicate(leads)) == 1
+
+def test_benchmark_stays_within_budget(tmp_path):
+    output = tmp_path / "dedup.json"
+
+    status = main(["--leads", "20000", "--max-seconds", "10", "--output", str(output)])
+
+    assert status == 0
+    report = json.loads(output.read_text())
+    assert report["leads"] == 20000
+    assert 0 < report["unique_leads"] < 20000
+    assert len(synthetic_leads(100, seed=1)) == 100
+
+def test_fuzzy_matching_merges_near_duplicate_company_names():
+    leads = [
+        Lead(name="Front desk", company="Hilton London Ltd", source="linkedin"),
+        Lead(name="Hilton London", company="Hilton London", city="London", phone="020 7946 0000", source="google_maps"),
+        Lead(name="Hilton Leeds", company="Hilton Leeds", city="Leeds", source="google_maps"),
+        Lead(name="Hilton", company="Hilton London", city="Paris", source="google"),
+    ]
+    leads_elsewhere = [leads[3], Lead(name="Hilton London", company="Hilton London Limited", city="London")]
+
+    assert len(Deduplicator().deduplicate(leads)) == 4
+
+    merged = Deduplicator(fuzzy_threshold=0.8).deduplicate(leads)
+
+    assert [lead.company for lead in merged] == ["Hilton London Ltd", "Hilton Leeds"]
+    assert (merged[0].city, merged[0].phone) == ("London", "020 7946 0000")
+    assert merged[0].source == "google, google_maps, linkedin"
+    # Same name, different cities: separate businesses
+    assert len(Deduplicator(fuzzy_threshold=0.8).deduplicate(leads_elsewhere)) == 2
+
+def test_fuzzy_threshold_controls_what_counts_as_a_match():
+    leads = [Lead(name="a", company="Acme Plumbing Services"), Lead(name="b", company="Acme Plumbing Service")]
+    matcher = FuzzyMatcher(0.5)
+
+    assert 0.8 < matcher.similarity("Acme Plumbing Services", "ACME plumbing service, Inc.") < 1.0
+    assert list(matcher.matches(leads)) == [(0, 1)]
+    assert list(FuzzyMatcher(0.99).matches(leads)) == []
+    with pytest.raises(ValueError):
+        Deduplicator(fuzzy_threshold=1.5)
+
+def test_fuzzy_matching_only_compares_candidates_from_shared_buckets():
+    leads = synthetic_leads(3000, seed=2)
+    matcher = FuzzyMatcher(0.9)
+    compared = []
+    original_jaccard = matcher._jaccard
+    matcher._jaccard = lambda a, b: compared.append(1) or original_jaccard(a, b)
+
+    list(matcher.matches(leads))
+
+    # Far fewer than the ~4.5M comparisons of checking every pair
+    assert len(compared) < 30000
@@ -0,0 +1,85 @@
+import asyncio
+import gzip
+import os
+from utils.lead_store import LeadStore
+from utils.export_cache import ExportCache, export_response
+
+def _serve(response, headers: dict) -> tuple:
+    """Runs a response as an ASGI app and returns its status, headers and body."""
+    messages = []
+    requested = []
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(name.encode(), value.encode()) for name, value in headers.items()]}
+
+    async def receive():
+        # The request body, then nothing until the response is done (no disconnect)
+        if requested:
+            await asyncio.Event().wait()
+        requested.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(response(scope, receive, send))
+    start = messages[0]
+    return start["status"], {name.decode(): value.decode() for name, value in start["headers"]}, b"".join(message.get("body", b"") for message in messages[1:])
+
+def _download(store, cache, fmt="csv", calls=None, **headers):
+    headers = {name.replace("_", "-"): value for name, value in headers.items()}
+
+    def generate(variant):
+        if calls is not None:
+            calls.append(variant)
+        return store.stream_export(variant)
+
+    return _serve(export_response(headers, cache, store.digest(), fmt, f"leads.{fmt}", generate), headers)
+
+def test_exports_are_generated_once_per_lead_set(tmp_path):
+    store = LeadStore(str(tmp_path / "leads.sqlite3"))
+    cache = ExportCache(str(tmp_path / "exports"))
+    store.append([{"name": "Ann", "company": "Acme"}])
+    calls = []
+
+    status, headers, body = _download(store, cache, calls=calls)
+    assert (status, body) == (200, b"name,company\r\nAnn,Acme\r\n")
+    assert headers["content-disposition"] == 'attachment; filename="leads.csv"'
+    assert _download(store, cache, calls=calls)[2] == body
+    status, revalidated, body_304 = _download(store, cache, calls=calls, if_none_match=f'W/"other", {headers["etag"]}')
+    assert (status, body_304) == (304, b"")
+    assert revalidated["etag"] == headers["etag"]
+    assert calls == ["csv"]
+
+    store.append([{"name": "Bob"}])
+    status, changed, _ = _download(store, cache, calls=calls, if_none_match=headers["etag"])
+    assert status == 200 and changed["etag"] != headers["etag"]
+    assert calls == ["csv", "csv"]
+
+def test_ranges_and_precompressed_variants(tmp_path):
+    store = LeadStore(str(tmp_path / "leads.sqlite3"))
+    cache = ExportCache(str(tmp_path / "exports"))
+    store.append([{"name": f"Contact {i}"} for i in range(100)])
+    _, plain_headers, plain = _download(store, cache)
+
+    status, headers, body = _download(store, cache, range="bytes=5-14")
+    assert (status, body) == (206, plain[5:15])
+    assert headers["content-range"] == f"bytes 5-14/{len(plain)}"
+
+    status, headers, body = _download(store, cache, accept_encoding="br, gzip")
+    assert headers["content-encoding"] == "gzip"
+    assert headers["etag"] != plain_headers["etag"]
+    assert gzip.decompress(body) == plain
+    assert "content-encoding" not in _download(store, cache, accept_encoding="gzip;q=0")[1]
+    assert "content-encoding" not in _download(store, cache, fmt="xlsx", accept_encoding="gzip")[1]
+
+def test_least_recently_served_exports_are_evicted(tmp_path):
+    cache = ExportCache(str(tmp_path / "exports"), max_files=2)
+
+    first = cache.get("a" * 64, "csv", lambda: [b"first"])
+    second = cache.get("b" * 64, "csv", lambda: [b"second"])
+    os.utime(second, ns=(0, 0))
+    assert cache.get("a" * 64, "csv", lambda: [b"regenerated"]) == first
+    third = cache.get("c" * 64, "csv", lambda: [b"third"])
+
+    assert sorted(os.listdir(tmp_path / "exports")) == sorted(os.path.basename(path) for path in [first, third])
+    with open(first, "rb") as f:
+        assert f.read() == b"first"
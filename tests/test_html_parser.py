@@ -0,0 +1,149 @@
+import os
+import pytest
+from bs4 import BeautifulSoup
+from utils.html_parser import parse_html, available_backends, resolve_backend
+from scrapers.google_maps import GoogleMapsScraper
+from scrapers.instagram import InstagramScraper
+import src.agent.sources.google_scraper as google_scraper_module
+import src.agent.sources.linkedin_public_scraper as linkedin_scraper_module
+from src.agent.sources.google_scraper import GoogleScraper
+from src.agent.sources.linkedin_public_scraper import LinkedInPublicScraper
+
+SEARCH_PAGE = """
+<html><head><title>Results</title><script>var g = "<div class='g'>";</script></head><body>
+  <div class="g">
+    <div class="yuRUbf"><a href="https://acme.example"><h3>Acme &amp; Sons</h3></a></div>
+    <div class="VwiC3b">Plumbing in <em>London</em>, since 1990.</div>
+  </div>
+  <div class="g extra"><div class="yuRUbf"><a href="https://beta.example"><h3>Beta Ltd</h3></a></div></div>
+  <div class="g"><div class="yuRUbf"><h3>No link</h3></div></div>
+</body></html>
+"""
+
+COMPANY_PAGE = """
+<html><head><script type="application/ld+json">
+{"@graph": [{"@type": "Organization", "name": "Acme", "description": "Pipes & more", "url": "https://acme.example"}]}
+</script></head><body><h1 class="top-card-layout__title"> Acme <span>Ltd</span> </h1></body></html>
+"""
+
+FALLBACK_PAGE = """
+<html><body><h1 class="top-card-layout__title"> Acme <span>Ltd</span> </h1>
+<section data-test-id="about-us__description"><p> We fix pipes. </p></section></body></html>
+"""
+
+BACKENDS = available_backends()
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_google_results_are_identical_on_every_backend(backend, monkeypatch):
+    monkeypatch.setattr(google_scraper_module, "HTML_PARSER_BACKEND", backend)
+
+    leads = GoogleScraper("plumbers")._parse_results(SEARCH_PAGE)
+
+    assert [(lead.name, lead.website, lead.notes) for lead in leads] == [
+        ("Acme & Sons", "https://acme.example", "Plumbing in London, since 1990."),
+        ("Beta Ltd", "https://beta.example", ""),
+    ]
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("html, expected", [
+    (COMPANY_PAGE, {"name": "Acme", "description": "Pipes & more", "url": "https://acme.example"}),
+    (FALLBACK_PAGE, {"name": "AcmeLtd", "description": "We fix pipes."}),
+])
+def test_linkedin_company_page_is_identical_on_every_backend(backend, html, expected, monkeypatch):
+    monkeypatch.setattr(linkedin_scraper_module, "HTML_PARSER_BACKEND", backend)
+
+    assert LinkedInPublicScraper("acme")._parse_company_page(html) == expected
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_profile_pages_are_identical_on_every_backend(backend, samples_dir):
+    with open(os.path.join(samples_dir, "google_maps_profile.html"), encoding="utf-8") as f:
+        maps_html = f.read()
+    with open(os.path.join(samples_dir, "instagram_profile.html"), encoding="utf-8") as f:
+        instagram_html = f.read()
+
+    maps = GoogleMapsScraper()._parse_profile_page(parse_html(maps_html, backend), "")
+    instagram = InstagramScraper()._parse_profile_page(parse_html(instagram_html, backend), "")
+
+    assert maps == GoogleMapsScraper()._parse_profile_page(BeautifulSoup(maps_html, "html.parser"), "")
+    assert instagram == InstagramScraper()._parse_profile_page(BeautifulSoup(instagram_html, "html.parser"), "")
+
+SAMPLE_PAGES = sorted(name for name in os.listdir(os.path.join(os.path.dirname(__file__), "samples")) if name.endswith(".html"))
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("sample", SAMPLE_PAGES)
+def test_text_matches_html_parser_on_every_backend(backend, sample, samples_dir):
+    with open(os.path.join(samples_dir, sample), encoding="utf-8") as f:
+        html = f.read()
+
+    def texts(backend):
+        page = parse_html(html, backend)
+        return (
+            page.select_one("body").text(),
+            [node.text() for node in page.select("title, body *")],
+            page.text(strip=True),
+            parse_html(html, backend, only=GoogleMapsScraper.parse_only).text(),
+        )
+
+    assert texts(backend) == texts("html.parser")
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_whitespace_between_elements_is_collapsed_like_html_parser(backend):
+    html = "<html><head><title>\"Acme\" - Google Maps</title></head><body><pre>a\n   b</pre><p>x <b>y</b>\t </p><div><span>555</span>\n        <span>123 4567</span></div></body></html>"
+
+    page = parse_html(html, backend)
+
+    assert page.select_one("div").text() == "555\n123 4567"
+    assert page.select_one("pre").text() == "a\n   b"
+    assert page.select_one("p").text() == "x y "
+    assert GoogleMapsScraper()._parse_profile_page(page, "")["phone"] == "555 123 4567"
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_text_skips_scripts_and_selects_only_descendants(backend):
+    page = parse_html('<html><head><title>T</title><style>p{}</style></head><body><div class="g a"><div class="a">x <b>y</b></div><script>z</script></div><p hidden>q</p></body></html>', backend)
+
+    outer = page.select_one("div.g")
+    assert [node.text() for node in outer.select("div.a")] == ["x y"]
+    assert outer.select_one("script").text() == "z"
+    assert page.text() == "Tx yq"
+    assert page.select_one("p").attr("hidden") == ""
+    assert page.select_one("p").attr("missing", "default") == "default"
+    assert outer.attr("class") == "g a"
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_backend("regex")
+
+def test_empty_documents_parse_on_every_backend():
+    for backend in BACKENDS:
+        page = parse_html("", backend)
+        assert page.select("div") == []
+        assert page.title() is None
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_partial_parse_keeps_only_declared_elements(backend):
+    html = '<html><head><title>T</title><script type="application/ld+json">{}</script></head><body><div class="g">a<div class="g">b</div></div>c<p>d</p></body></html>'
+
+    page = parse_html(html, backend, only=["div.g", 'script[type="application/ld+json"]'])
+
+    assert page.text() == "ab"
+    assert len(page.select("div.g")) == 2
+    assert page.select_one("script").text() == "{}"
+    assert page.title() is None
+    assert page.select("p") == []
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_partial_parse_gives_the_same_extraction(backend, samples_dir, monkeypatch):
+    monkeypatch.setattr(google_scraper_module, "HTML_PARSER_BACKEND", backend)
+    monkeypatch.setattr(linkedin_scraper_module, "HTML_PARSER_BACKEND", backend)
+    monkeypatch.setattr("utils.html_parser.DEFAULT_BACKEND", backend)
+    with open(os.path.join(samples_dir, "google_maps_profile.html"), encoding="utf-8") as f:
+        maps_html = f.read()
+
+    assert GoogleScraper.parse_only and LinkedInPublicScraper.parse_only
+    assert len(GoogleScraper("plumbers")._parse_results(SEARCH_PAGE)) == 2
+    assert LinkedInPublicScraper("acme")._parse_company_page(FALLBACK_PAGE)["description"] == "We fix pipes."
+    assert GoogleMapsScraper()._parse_profile_page(maps_html, "") == GoogleMapsScraper()._parse_profile_page(BeautifulSoup(maps_html, "html.parser"), "")
+
+def test_partial_parse_rejects_complex_selectors():
+    with pytest.raises(ValueError):
+        parse_html("<p></p>", "html.parser", only=["div > p"])
@@ -0,0 +1,144 @@
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from utils.http_cache import HttpCache, parse_cache_control
+from utils.http_client import HttpClient
+
+PAGE = b"<html><body>Acme Corp</body></html>"
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.path)
+        if server.failing:
+            return self._send(503, b"down", {})
+        if self.path == "/fresh":
+            return self._send(200, PAGE, {"Cache-Control": "max-age=60"})
+        if self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                return self._send(304, b"", {"ETag": '"v1"', "Cache-Control": "no-cache"})
+            return self._send(200, PAGE, {"ETag": '"v1"', "Cache-Control": "no-cache"})
+        if self.path == "/no-store":
+            return self._send(200, PAGE, {"Cache-Control": "no-store"})
+        if self.path == "/must-revalidate":
+            return self._send(200, PAGE, {"Cache-Control": "max-age=0, must-revalidate", "ETag": '"v1"'})
+        return self._send(404, b"missing", {})
+
+    def _send(self, status, body, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def cache_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.requests = []
+    server.failing = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def cached_client(tmp_path):
+    client = HttpClient(cache=HttpCache(db_path=str(tmp_path / "http.sqlite3")), max_retries=0)
+    yield client
+    client.close()
+
+def test_parse_cache_control():
+    assert parse_cache_control('max-age=60, No-Cache, stale-if-error="30"') == {"max-age": "60", "no-cache": True, "stale-if-error": "30"}
+
+def test_fresh_response_is_served_from_cache(cache_server, cached_client):
+    server, base_url = cache_server
+
+    first = cached_client.get(f"{base_url}/fresh")
+    second = cached_client.get(f"{base_url}/fresh")
+
+    assert first.content == second.content == PAGE
+    assert second.text == PAGE.decode()
+    assert server.requests == ["/fresh"]
+    stats = cached_client.cache.stats()["hosts"]["127.0.0.1"]
+    assert (stats["hits"], stats["misses"], stats["bytes_saved"]) == (1, 1, len(PAGE))
+    assert stats["hit_ratio"] == 0.5
+
+def test_stale_response_is_revalidated_with_etag(cache_server, cached_client):
+    server, base_url = cache_server
+
+    cached_client.get(f"{base_url}/etag")
+    revalidated = cached_client.get(f"{base_url}/etag")
+
+    assert revalidated.status_code == 200
+    assert revalidated.content == PAGE
+    assert server.requests == ["/etag", "/etag"]
+    assert cached_client.cache.stats()["hosts"]["127.0.0.1"]["revalidated"] == 1
+
+def test_stale_response_is_served_when_upstream_fails(cache_server, cached_client):
+    server, base_url = cache_server
+    cached_client.get(f"{base_url}/etag")
+
+    server.failing = True
+    response = cached_client.get(f"{base_url}/etag")
+
+    assert response.content == PAGE
+    assert cached_client.cache.stats()["hosts"]["127.0.0.1"]["stale"] == 1
+
+def test_must_revalidate_and_no_store_are_honoured(cache_server, cached_client):
+    server, base_url = cache_server
+    cached_client.get(f"{base_url}/must-revalidate")
+    cached_client.get(f"{base_url}/no-store")
+
+    server.failing = True
+    assert cached_client.get(f"{base_url}/must-revalidate") is None
+    assert cached_client.get(f"{base_url}/no-store") is None
+
+def test_async_get_uses_cache(cache_server, cached_client):
+    import asyncio
+    server, base_url = cache_server
+    cached_client.get(f"{base_url}/fresh")
+
+    response = asyncio.run(cached_client.aget(f"{base_url}/fresh"))
+
+    assert response.content == PAGE
+    assert server.requests == ["/fresh"]
+
+def test_heuristic_freshness_from_last_modified(tmp_path):
+    cache = HttpCache(db_path=str(tmp_path / "http.sqlite3"))
+    headers = {"Date": formatdate(usegmt=True), "Last-Modified": formatdate(time.time() - 10 * 3600, usegmt=True)}
+
+    assert cache.store("https://example.com/", 200, headers, PAGE, {})
+
+    entry = cache.lookup("https://example.com/", {})
+    assert entry.is_fresh()
+    assert entry.fresh_until - time.time() == pytest.approx(3600, abs=5)
+
+def test_vary_headers_must_match(tmp_path):
+    cache = HttpCache(db_path=str(tmp_path / "http.sqlite3"))
+    cache.store("https://example.com/", 200, {"Cache-Control": "max-age=60", "Vary": "User-Agent"}, PAGE, {"User-Agent": "a"})
+
+    assert cache.lookup("https://example.com/", {"User-Agent": "a"}) is not None
+    assert cache.lookup("https://example.com/", {"User-Agent": "b"}) is None
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    cache = HttpCache(db_path=str(tmp_path / "http.sqlite3"), max_bytes=len(PAGE) * 2)
+    for i in range(3):
+        cache.store(f"https://example.com/{i}", 200, {"Cache-Control": "max-age=60"}, PAGE, {})
+        time.sleep(0.01)
+
+    assert cache.lookup("https://example.com/0", {}) is None
+    assert cache.lookup("https://example.com/2", {}) is not None
+    stats = cache.stats()
+    assert stats["total_bytes"] <= len(PAGE) * 2
+    assert stats["evictions"] == 1
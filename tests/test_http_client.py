@@ -0,0 +1,191 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from utils.http_client import HttpClient
+from utils.http_cache import HttpCache
+
+COMPANY_PAGE = (
+    b'<html><head><script type="application/ld+json">{"name": "Acme"}</script></head><body>'
+    + b"<p>filler</p>" * 50000
+    + b"</body></html>"
+)
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        self.server.user_agents.append(self.headers.get("User-Agent"))
+        status = 404 if self.path.startswith("/missing") else 200
+        body = b"ok"
+        content_type = "text/plain"
+        if self.path == "/company":
+            body = COMPANY_PAGE
+            content_type = "text/html; charset=utf-8"
+        elif self.path == "/logo.png":
+            body = b"\x89PNG" + b"\x00" * 1024
+            content_type = "image/png"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.connections = set()
+    server.user_agents = []
+    # Streaming fetches hang up mid-body on purpose
+    server.handle_error = lambda request, client_address: None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def test_get_reuses_pooled_connection(local_server):
+    server, base_url = local_server
+    client = HttpClient()
+
+    for i in range(4):
+        response = client.get(f"{base_url}/page/{i}")
+        assert response.status_code == 200
+        assert response.text == "ok"
+
+    assert len(server.connections) == 1
+    client.close()
+
+def test_get_without_keep_alive_opens_new_connections(local_server):
+    server, base_url = local_server
+    client = HttpClient(keep_alive=False)
+
+    for i in range(3):
+        assert client.get(f"{base_url}/page/{i}") is not None
+
+    assert len(server.connections) == 3
+    client.close()
+
+def test_get_passes_headers_and_returns_none_on_error(local_server):
+    server, base_url = local_server
+    client = HttpClient()
+
+    assert client.get(f"{base_url}/missing", headers={"User-Agent": "custom-agent"}) is None
+    assert server.user_agents == ["custom-agent"]
+    client.close()
+
+def test_aget_fetches_without_blocking_the_loop(local_server):
+    server, base_url = local_server
+    client = HttpClient()
+
+    async def fetch_all():
+        responses = await asyncio.gather(*(client.aget(f"{base_url}/page/{i}") for i in range(3)))
+        missing = await client.aget(f"{base_url}/missing")
+        await client.aclose()
+        return responses, missing
+
+    responses, missing = asyncio.run(fetch_all())
+
+    assert [response.text for response in responses] == ["ok", "ok", "ok"]
+    assert missing is None
+    client.close()
+
+def test_async_clients_of_closed_loops_are_closed(local_server):
+    server, base_url = local_server
+    client = HttpClient()
+
+    async def fetch():
+        response = await client.aget(f"{base_url}/page")
+        return response.text, client._async_clients[asyncio.get_running_loop()]
+
+    first_text, first_client = asyncio.run(fetch())
+    second_text, second_client = asyncio.run(fetch())
+
+    assert first_text == second_text == "ok"
+    assert first_client.is_closed and not second_client.is_closed
+    assert list(client._async_clients.values()) == [second_client]
+    client.close()
+
+def test_configure_replaces_the_clients_with_the_new_settings(local_server):
+    server, base_url = local_server
+    client = HttpClient()
+
+    async def fetch():
+        await client.aget(f"{base_url}/page")
+        return client._async_clients[asyncio.get_running_loop()]
+
+    async def reconfigure_and_fetch():
+        first = await fetch()
+        client.configure(keep_alive=False, timeout=5)
+        second = await fetch()
+        await client.aclose()
+        return first, second
+
+    first, second = asyncio.run(reconfigure_and_fetch())
+    for i in range(2):
+        assert client.get(f"{base_url}/page/{i}") is not None
+
+    assert first.is_closed and second is not first
+    assert (client.keep_alive, client.timeout, client.pool_maxsize) == (False, 5, 20)
+    assert len(server.connections) == 4
+    client.close()
+
+def test_http2_falls_back_when_unavailable(mocker):
+    mocker.patch.object(HttpClient, "_http2_available", return_value=False)
+
+    client = HttpClient(http2=True)
+
+    assert client.http2 is False
+    client.close()
+
+def test_fetch_streaming_stops_when_predicate_is_met(local_server):
+    server, base_url = local_server
+    client = HttpClient()
+
+    starts = []
+
+    def script_closed(body, start):
+        starts.append(start)
+        return body.find(b"</script>", start) != -1
+
+    page = client.fetch_streaming(f"{base_url}/company", stop_when=script_closed, chunk_size=16)
+
+    assert not page.complete
+    # Each call resumes just before the bytes it hasn't seen
+    assert starts == [max(0, 16 * i - 64) for i in range(len(starts))]
+    assert len(page.content) < 4096
+    assert '{"name": "Acme"}' in page.text
+    client.close()
+
+def test_fetch_streaming_caps_bytes_and_reads_complete_pages(local_server):
+    server, base_url = local_server
+    client = HttpClient()
+
+    capped = client.fetch_streaming(f"{base_url}/company", max_bytes=10000)
+    full = client.fetch_streaming(f"{base_url}/company")
+
+    assert len(capped.content) == 10000 and not capped.complete
+    assert full.content == COMPANY_PAGE and full.complete
+    client.close()
+
+def test_fetch_streaming_rejects_other_content_types(local_server):
+    server, base_url = local_server
+    client = HttpClient()
+
+    assert client.fetch_streaming(f"{base_url}/logo.png") is None
+    assert client.fetch_streaming(f"{base_url}/logo.png", content_types=None).content.startswith(b"\x89PNG")
+    client.close()
+
+def test_fetch_streaming_only_caches_complete_bodies(local_server, tmp_path):
+    server, base_url = local_server
+    cache = HttpCache(db_path=str(tmp_path / "http.sqlite3"))
+    client = HttpClient(cache=cache)
+
+    client.fetch_streaming(f"{base_url}/company", max_bytes=1000)
+
+    assert cache.lookup(f"{base_url}/company", {}) is None
+    client.close()
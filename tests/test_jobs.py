@@ -0,0 +1,128 @@
+import sqlite3
+import threading
+import time
+import pytest
+from utils.jobs import JobManager, JobManagerClosedError, JobQueueFullError
+
+def wait_for_status(manager, job_id, statuses, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not reach {statuses}")
+
+@pytest.fixture
+def manager(tmp_path):
+    return JobManager(db_path=str(tmp_path / "jobs.sqlite3"), max_workers=1, max_queued=2)
+
+def test_job_runs_and_stores_result(manager):
+    manager.register("echo", lambda params: {"query": params["query"]})
+    job = manager.submit("echo", {"query": "hotels"})
+    assert job["status"] in (JobManager.QUEUED, JobManager.RUNNING, JobManager.SUCCEEDED)
+    wait_for_status(manager, job["job_id"], [JobManager.SUCCEEDED])
+    assert manager.result(job["job_id"]) == {"query": "hotels"}
+
+def test_failed_job_records_error(manager):
+    def fail(params):
+        raise RuntimeError("blocked")
+    manager.register("fail", fail)
+    job = manager.submit("fail", {})
+    job = wait_for_status(manager, job["job_id"], [JobManager.FAILED])
+    assert "blocked" in job["error"]
+    assert manager.result(job["job_id"]) is None
+
+def test_cancel_queued_and_running_jobs(manager):
+    release = threading.Event()
+    manager.register("block", lambda params: release.wait(5) and {"done": True})
+    running = manager.submit("block", {})
+    queued = manager.submit("block", {})
+    wait_for_status(manager, running["job_id"], [JobManager.RUNNING])
+
+    assert manager.cancel(queued["job_id"])["status"] == JobManager.CANCELLED
+    assert manager.cancel(running["job_id"])["cancel_requested"] is True
+
+    release.set()
+    wait_for_status(manager, running["job_id"], [JobManager.CANCELLED])
+    assert manager.result(running["job_id"]) is None
+
+def test_queue_is_bounded(manager):
+    release = threading.Event()
+    manager.register("block", lambda params: release.wait(5))
+    first = manager.submit("block", {})
+    wait_for_status(manager, first["job_id"], [JobManager.RUNNING])
+    manager.submit("block", {})
+    manager.submit("block", {})
+    with pytest.raises(JobQueueFullError):
+        manager.submit("block", {})
+    release.set()
+
+def test_submitting_after_close_is_refused_without_recording_the_job(manager):
+    manager.register("echo", lambda params: params)
+    manager.submit("echo", {})
+    manager.close()
+
+    with pytest.raises(JobManagerClosedError):
+        manager.submit("echo", {})
+    with sqlite3.connect(manager.db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 1
+
+def test_jobs_are_only_failed_once_their_manager_is_gone(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    first = JobManager(db_path=db_path, max_workers=1)
+    release = threading.Event()
+    first.register("block", lambda params: release.wait(5))
+    job = first.submit("block", {})
+    queued = first.submit("block", {})
+    wait_for_status(first, job["job_id"], [JobManager.RUNNING])
+
+    # Another server sharing the table leaves a live manager's jobs alone
+    other = JobManager(db_path=db_path)
+    assert other.get(job["job_id"])["status"] == JobManager.RUNNING
+    assert other.get(queued["job_id"])["status"] == JobManager.QUEUED
+
+    first.close()
+    restarted = JobManager(db_path=db_path)
+    assert restarted.get(job["job_id"])["status"] == JobManager.FAILED
+    assert restarted.get(queued["job_id"])["status"] == JobManager.FAILED
+    release.set()
+    time.sleep(0.05)
+    # The interrupted job stays failed when its worker finishes after all
+    assert restarted.get(job["job_id"])["status"] == JobManager.FAILED
+
+def test_jobs_of_a_manager_without_heartbeat_are_failed(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    first = JobManager(db_path=db_path, max_workers=1, heartbeat_interval=0.05)
+    release = threading.Event()
+    first.register("block", lambda params: release.wait(5))
+    job = first.submit("block", {})
+    wait_for_status(first, job["job_id"], [JobManager.RUNNING])
+
+    other = JobManager(db_path=db_path, heartbeat_interval=0.05)
+    time.sleep(0.3)
+    assert other.get(job["job_id"])["status"] == JobManager.RUNNING
+
+    # The process hangs: its heartbeat stops, but it never closes
+    first._stopped.set()
+    wait_for_status(other, job["job_id"], [JobManager.FAILED])
+    release.set()
+
+def test_expired_jobs_are_purged(tmp_path):
+    manager = JobManager(db_path=str(tmp_path / "jobs.sqlite3"), heartbeat_interval=0.05, job_ttl=0.2)
+    manager.register("echo", lambda params: params)
+    job = manager.submit("echo", {"query": "hotels"})
+    wait_for_status(manager, job["job_id"], [JobManager.SUCCEEDED])
+
+    deadline = time.monotonic() + 5
+    while manager.get(job["job_id"]) is not None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert manager.get(job["job_id"]) is None
+
+def test_unfinished_jobs_from_before_owners_were_recorded_are_failed(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, status TEXT NOT NULL, result TEXT, error TEXT, cancel_requested INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, started_at REAL, finished_at REAL)")
+        conn.execute("INSERT INTO jobs (id, kind, params, status, created_at) VALUES ('old', 'run', '{}', 'running', 0)")
+
+    assert JobManager(db_path=db_path).get("old")["status"] == JobManager.FAILED
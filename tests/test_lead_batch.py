@@ -0,0 +1,82 @@
+import copy
+import re
+import pytest
+from src.agent.models.lead import Lead
+from src.agent.models.lead_batch import LeadBatch
+from src.agent.sources.base_source import BaseSource
+from src.agent.storage.lead_store import save_leads
+from src.agent.main import generate_leads
+from src.modules.deduplicator import Deduplicator
+from src.modules.scorer import Scorer
+from utils.lead_store import LeadStore
+
+LEADS = [
+    Lead(name="Acme", company="Acme", city="London", website="https://www.acme.com/", source="google"),
+    Lead(name="Acme Ltd", company="Acme Ltd", email="hi@acme.com", website="acme.com/?utm_source=x", source="linkedin", linkedin_profile="https://linkedin.com/in/a"),
+    Lead(name="Hilton London Ltd", company="Hilton London Ltd", city="London", title="Hotel manager", source="facebook"),
+    Lead(name="Hilton London", company="Hilton London", city="London", phone="555", source="instagram"),
+    Lead(name="Beta", company="Beta", city="Leeds", notes="hotel in london", source="google"),
+]
+
+def test_leads_are_slotted_with_a_declared_score():
+    lead = Lead(name="Ann", company="Acme")
+
+    assert not hasattr(lead, "__dict__")
+    assert lead.confidence_score is None
+    assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d", lead.timestamp)
+    with pytest.raises(AttributeError):
+        lead.score = 1
+    scored = copy.copy(lead)
+    scored.confidence_score = 0.5
+    assert lead.confidence_score is None and scored.confidence_score == 0.5
+
+def test_batches_hold_leads_as_columns():
+    batch = LeadBatch.from_leads(LEADS)
+
+    assert len(batch) == 5
+    assert batch.column("company")[2] == "Hilton London Ltd"
+    assert batch.leads() == LEADS and batch.lead(1) == LEADS[1]
+    assert batch.take([4, 0]).column("name") == ["Beta", "Acme"]
+    assert list(LeadBatch.from_records(batch.records()).records()) == list(batch.records())
+    # Equal sources share one string
+    sources = LeadBatch.from_records([{"name": "A", "company": "A", "source": "".join(["goo", "gle"])}]).column("source") + batch.column("source")
+    assert sources[0] is sources[1]
+
+    defaults = LeadBatch({"name": ["Ann"], "company": ["Acme"]})
+    assert defaults.column("city") == [None] and defaults.column("timestamp")[0]
+    with pytest.raises(ValueError):
+        LeadBatch.from_records([{"name": "No company"}])
+    with pytest.raises(ValueError):
+        LeadBatch({"name": ["A", "B"], "company": ["A"]})
+
+@pytest.mark.parametrize("fuzzy_threshold", [None, 0.6])
+def test_batch_dedup_and_scoring_match_the_lead_versions(fuzzy_threshold):
+    deduplicator = Deduplicator(fuzzy_threshold=fuzzy_threshold)
+    keywords = {"expanded_keywords": ["hotel", "acme"]}
+    intent = {"location": "london", "industry": "hotel"}
+
+    merged = deduplicator.deduplicate_batch(LeadBatch.from_leads(LEADS))
+
+    assert merged.leads() == deduplicator.deduplicate(LEADS)
+    assert Scorer().score_batch(LeadBatch.from_leads(LEADS), keywords, intent) == [Scorer().score(lead, keywords, intent) for lead in LEADS]
+
+def test_batches_are_saved_like_lists_of_leads(tmp_path):
+    store = LeadStore(str(tmp_path / "leads.sqlite3"))
+
+    assert save_leads(LeadBatch.from_leads(LEADS), store) == 4
+    assert store.find(limit=1)[0]["confidence_score"] is None
+
+def test_confidence_threshold_keeps_well_scored_leads(mocker):
+    class FakeScraper(BaseSource):
+        def __init__(self, query):
+            self.query = query
+
+        def scrape(self):
+            return [Lead(name="Zed", company="Zed"), Lead(name="Contactable", company="Contactable", website="https://contactable.example")]
+
+    mocker.patch("src.agent.main.discover_scrapers", return_value=[FakeScraper])
+
+    result = generate_leads("Hotels in London", confidence_threshold=10)
+
+    assert [lead.name for lead in result["leads"]] == ["Contactable"]
+    assert result["leads"][0].confidence_score >= 10
@@ -0,0 +1,204 @@
+import csv
+import gzip
+import io
+import json
+import os
+import sqlite3
+import threading
+import tracemalloc
+import pandas as pd
+import pytest
+from utils.lead_store import LeadStore
+from src.agent.storage.lead_store import save_leads
+from src.agent.models.lead import Lead
+from backend.services.scraper import ScraperService
+
+def test_records_keep_their_fields_and_order(tmp_path):
+    store = LeadStore(str(tmp_path / "leads.sqlite3"))
+
+    added = store.append([{"business_name": "Acme", "platform": "google_search", "source_url": "https://acme.example"}, {"business_name": "Beta", "platform": "linkedin", "phone": None}], run_id="run-1")
+    store.append([{"business_name": "Gamma", "platform": "google_search"}], run_id="run-2")
+
+    assert added == 2
+    assert store.find(run_id="run-1") == [
+        {"business_name": "Acme", "platform": "google_search", "source_url": "https://acme.example"},
+        {"business_name": "Beta", "platform": "linkedin", "phone": None},
+    ]
+    assert [record["business_name"] for record in store.find(source="GOOGLE_SEARCH")] == ["Acme", "Gamma"]
+    assert store.count(company="acme") == 1
+    assert store.count(run_id="run-2", source="linkedin") == 0
+    assert store.find(limit=1) == store.find(run_id="run-1", limit=1)
+    with pytest.raises(ValueError):
+        store.find(phone="555")
+
+def test_filters_use_the_indexes(tmp_path):
+    store = LeadStore(str(tmp_path / "leads.sqlite3"))
+    store.append([{"company": "Acme"}])
+
+    with store._lock:
+        plan = store._connection().execute("EXPLAIN QUERY PLAN SELECT data FROM leads WHERE city = ? AND company = ?", ("x", "y")).fetchall()
+
+    assert "USING INDEX" in " ".join(row[-1] for row in plan)
+
+def test_save_leads_keeps_the_newest_version_of_each_lead(tmp_path):
+    store = LeadStore(str(tmp_path / "leads.sqlite3"))
+
+    assert save_leads([Lead(name="Ann", company="Acme", website="https://www.acme.com/"), Lead(name="Bob", company="Beta", city="Leeds")], store) == 2
+    assert save_leads([Lead(name="Ann again", company="Acme", website="http://acme.com?utm_source=x"), Lead(name="Cy", company="Gamma", city="Leeds"), Lead(name="Cy later", company="Gamma", city="Leeds")], store) == 1
+
+    # Replaced leads keep their place
+    assert [record["name"] for record in store.find()] == ["Ann again", "Bob", "Cy later"]
+    assert [record["name"] for record in store.find(city="leeds")] == ["Bob", "Cy later"]
+    assert store.count() == 3
+
+def test_excel_is_exported_from_the_store(tmp_path):
+    store = LeadStore(str(tmp_path / "leads.sqlite3"))
+    store.append([{"name": "Ann", "company": "Acme"}, {"name": "Bob", "company": "Beta", "email": "bob@beta.example"}])
+    path = str(tmp_path / "exports" / "leads.xlsx")
+
+    assert store.export_excel(path, company="nothing") == 0
+    assert not os.path.exists(path)
+    assert store.export_excel(path) == 2
+
+    exported = pd.read_excel(path)
+    assert list(exported.columns) == ["name", "company", "email"]
+    assert list(exported["name"]) == ["Ann", "Bob"]
+    assert os.listdir(tmp_path / "exports") == ["leads.xlsx"]
+
+def test_exports_stream_in_every_format(tmp_path):
+    store = LeadStore(str(tmp_path / "leads.sqlite3"))
+    store.append([{"name": "Ann", "company": "Acme"}], run_id="run-1")
+    store.append([{"name": "Bob", "email": "bob@beta.example", "company": "Beta"}, {"name": "Cy", "notes": 'say "hi", <b>'}], run_id="run-2")
+
+    assert store.fields() == ["name", "company", "email", "notes"]
+    assert store.fields(run_id="run-2") == ["name", "email", "company", "notes"]
+    assert store.fields(company="acme") == ["name", "company"]
+
+    exports = {fmt: b"".join(store.stream_export(fmt)) for fmt in ["xlsx", "csv", "ndjson", "csv.gz", "ndjson.gz"]}
+    rows = list(csv.reader(io.StringIO(exports["csv"].decode("utf-8"))))
+    assert rows == [["name", "company", "email", "notes"], ["Ann", "Acme", "", ""], ["Bob", "Beta", "bob@beta.example", ""], ["Cy", "", "", 'say "hi", <b>']]
+    assert [json.loads(line) for line in exports["ndjson"].splitlines()] == store.find()
+    assert gzip.decompress(exports["csv.gz"]) == exports["csv"]
+    assert gzip.decompress(exports["ndjson.gz"]) == exports["ndjson"]
+    assert pd.read_excel(io.BytesIO(exports["xlsx"])).fillna("").values.tolist() == rows[1:]
+    # Same records, same bytes
+    assert b"".join(store.stream_export("xlsx")) == exports["xlsx"]
+    with pytest.raises(ValueError):
+        store.stream_export("pdf")
+
+def test_export_memory_does_not_grow_with_the_store(tmp_path):
+    store = LeadStore(str(tmp_path / "leads.sqlite3"))
+    store.append([{"name": f"Contact {i}", "company": f"Company {i}", "notes": "x" * 100} for i in range(20000)])
+
+    tracemalloc.start()
+    try:
+        written = store.export(str(tmp_path / "leads.xlsx"))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert written == 20000
+    assert peak < 8 * 1024 * 1024
+    assert len(pd.read_excel(tmp_path / "leads.xlsx")) == 20000
+
+def test_digests_follow_the_content(tmp_path):
+    first = LeadStore(str(tmp_path / "first.sqlite3"))
+    second = LeadStore(str(tmp_path / "second.sqlite3"))
+    leads = [{"name": "Ann", "company": "Acme"}, {"name": "Bob", "company": "Beta"}]
+
+    assert first.digest() is None
+    first.append(leads, run_id="run-1", keys=[1, 2])
+    digest = first.digest()
+    # Batching doesn't matter, and storing a lead again unchanged doesn't change anything
+    second.append(leads[:1], run_id="run-1")
+    second.append(leads[1:], run_id="run-1")
+    first.append(leads[:1], run_id="run-1", keys=[1])
+
+    assert first.digest() == second.digest() == digest
+    assert first.digest("run-1") == digest and first.digest("run-2") is None
+    first.append([{"name": "Cy"}], run_id="run-2")
+    assert first.digest() != digest and first.digest("run-1") == digest
+
+def test_replaced_leads_update_the_digests(tmp_path):
+    store = LeadStore(str(tmp_path / "leads.sqlite3"))
+    store.append([{"name": "Ann"}, {"name": "Bob"}], run_id="run-1", keys=[1, 2])
+    store.append([{"name": "Cy"}], run_id="run-2", keys=[3])
+
+    assert store.append([{"name": "Ann again"}, {"name": "Cy again"}], run_id="run-2", keys=[1, 3]) == 0
+
+    rebuilt = LeadStore(str(tmp_path / "rebuilt.sqlite3"))
+    rebuilt.append([{"name": "Ann again"}], run_id="run-2")
+    rebuilt.append([{"name": "Bob"}], run_id="run-1")
+    rebuilt.append([{"name": "Cy again"}], run_id="run-2")
+    assert store.find() == rebuilt.find()
+    assert [store.digest(scope) for scope in (None, "run-1", "run-2")] == [rebuilt.digest(scope) for scope in (None, "run-1", "run-2")]
+    assert store.fields(run_id="run-2") == ["name"]
+
+    store.append([{"name": "Bob again"}], run_id="run-2", keys=[2])
+    assert store.digest("run-1") is None and store.count(run_id="run-1") == 0
+
+def test_replacing_a_lead_does_not_read_every_stored_lead(tmp_path):
+    def steps_to_replace_one_lead(size: int) -> int:
+        store = LeadStore(str(tmp_path / f"leads-{size}.sqlite3"))
+        store.append([{"name": f"Lead {i}", "timestamp": 0} for i in range(size)], run_id="run-1", keys=list(range(size)))
+        steps = []
+        store._conn.set_progress_handler(lambda: steps.append(1), 1)
+        store.append([{"name": "Lead 0", "timestamp": 1}], run_id="run-1", keys=[0])
+        store._conn.set_progress_handler(None, 0)
+        assert store.find(limit=1) == [{"name": "Lead 0", "timestamp": 1}]
+        return len(steps)
+
+    assert steps_to_replace_one_lead(20000) < 2 * steps_to_replace_one_lead(2000)
+
+def test_fields_and_digests_are_backfilled_for_older_stores(tmp_path):
+    path = str(tmp_path / "leads.sqlite3")
+    store = LeadStore(path)
+    store.append([{"name": "Ann", "company": "Acme"}], run_id="run-1")
+    digest = store.digest("run-1")
+    store.close()
+    with sqlite3.connect(path) as conn:
+        conn.execute("DROP TABLE lead_fields")
+        conn.execute("DROP TABLE lead_digests")
+
+    store = LeadStore(path)
+    assert store.fields(run_id="run-1") == ["name", "company"]
+    assert store.digest("run-1") == digest
+
+def test_concurrent_writers_keep_the_digest_a_function_of_content(tmp_path):
+    path = str(tmp_path / "leads.sqlite3")
+    stores = [LeadStore(path) for _ in range(4)]
+    added = []
+
+    def write(store, writer):
+        for batch in range(25):
+            added.append(store.append([{"name": f"Lead {writer}-{batch}-{i}"} for i in range(3)]))
+
+    threads = [threading.Thread(target=write, args=(store, writer)) for writer, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(added) == stores[0].count() == 300
+    rebuilt = LeadStore(str(tmp_path / "rebuilt.sqlite3"))
+    rebuilt.append(stores[0].find())
+    assert stores[0].digest() == rebuilt.digest()
+
+def test_backend_runs_are_exported_on_download(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = ScraperService(max_workers=1)
+    result = service._store_results({"platforms": {"google_search": [{"business_name": "Acme", "platform": "google_search"}], "linkedin": []}})
+
+    path = service.download_response(result["filename"], {}).path
+
+    assert path == service.exports.path(service.store.digest(result["filename"][:-len(".xlsx")]), "xlsx")
+    assert list(pd.read_excel(path)["business_name"]) == ["Acme"]
+    assert service.download_response("aggregated_output_0_unknown.xlsx", {}) is None
+    assert service._store_results({"platforms": {"linkedin": []}})["filename"] is None
+
+    run_id = result["filename"][:-len(".xlsx")]
+    with open(service.download_response(f"{run_id}.ndjson.gz", {}).path, "rb") as f:
+        assert json.loads(gzip.decompress(f.read())) == {"business_name": "Acme", "platform": "google_search"}
+    assert service.download_response(f"{run_id}.pdf", {}) is None
+    assert service.download_response(".xlsx", {}) is None
+    assert service.download_response("aggregated_output_0_unknown.csv", {}) is None
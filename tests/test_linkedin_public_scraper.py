@@ -0,0 +1,26 @@
+import os
+from utils.http_client import HttpClient, StreamedPage
+from src.agent.sources.linkedin_public_scraper import LinkedInPublicScraper
+
+def test_description_below_the_ld_json_block_is_read(samples_dir, mocker):
+    with open(os.path.join(samples_dir, "linkedin_company_page.html"), "rb") as f:
+        html = f.read()
+    fetched = []
+
+    def fetch_streaming(url, max_bytes, stop_when=None):
+        chunks = (html[i:i + 1024] for i in range(0, len(html), 1024))
+        content, complete = HttpClient._read_until(chunks, max_bytes, stop_when)
+        fetched.append(complete)
+        return StreamedPage(url, 200, {"Content-Type": "text/html; charset=utf-8"}, content, complete)
+
+    mocker.patch("src.agent.sources.linkedin_public_scraper.http_client.fetch_streaming", side_effect=fetch_streaming)
+
+    data = LinkedInPublicScraper("acme")._scrape_linkedin_company_page("https://www.linkedin.com/company/acme")
+
+    # The LD+JSON block has no description, so the page is read again in full
+    assert fetched == [False, True]
+    assert data == {
+        "name": "Acme Plumbing",
+        "description": "Emergency plumbing and heating across London since 1990.",
+        "url": "https://acme.example",
+    }
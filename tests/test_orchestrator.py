@@ -0,0 +1,152 @@
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from orchestrator import ScrapeOrchestrator
+from errors import NoResultsFoundError
+from scrapers.base import AsyncBaseScraper
+
+def test_concurrent_run_matches_sequential(fake_registry):
+    orchestrator = ScrapeOrchestrator()
+    assert orchestrator.run("test", concurrent=True) == orchestrator.run("test", concurrent=False)
+
+def test_concurrent_run_overlaps_platforms(fake_registry):
+    for scraper in fake_registry.values():
+        scraper.delay = 0.2
+    start = time.monotonic()
+    result = ScrapeOrchestrator().run("test")
+    assert time.monotonic() - start < 0.6
+    assert list(result['platforms']) == ScrapeOrchestrator.PLATFORMS
+
+def test_slow_platform_times_out_without_blocking_others(fake_registry):
+    fake_registry['facebook'].delay = 2.0
+    orchestrator = ScrapeOrchestrator(platform_timeouts={'facebook': 0.2})
+    start = time.monotonic()
+    result = orchestrator.run("test")
+    assert time.monotonic() - start < 1.0
+    assert 'facebook' not in result['platforms']
+    assert len(result['platforms']) == 4
+    assert result['errors'][0]['platform'] == 'facebook'
+    assert "Timed out" in result['errors'][0]['reason']
+
+def test_platforms_queued_behind_timed_out_ones_cannot_hang_the_run(fake_registry):
+    for platform in ['google_search', 'google_maps']:
+        fake_registry[platform].delay = 3.0
+    orchestrator = ScrapeOrchestrator(max_workers=2, platform_timeout=0.2)
+
+    start = time.monotonic()
+    result = orchestrator.run("test")
+
+    # Both workers stay busy with the abandoned platforms, so the rest never start
+    assert time.monotonic() - start < 1.5
+    assert result['platforms'] == {}
+    assert [e['platform'] for e in result['errors']] == ScrapeOrchestrator.PLATFORMS
+    assert orchestrator.run_timeout_for(ScrapeOrchestrator.PLATFORMS) == 0.2 * 3
+
+def test_errors_are_reported_per_platform(fake_registry):
+    fake_registry['linkedin'].error = NoResultsFoundError('linkedin')
+    fake_registry['instagram'].error = RuntimeError("boom")
+    result = ScrapeOrchestrator(max_workers=2).run("test")
+    assert [e['platform'] for e in result['errors']] == ['linkedin', 'instagram']
+    assert "RuntimeError" in result['errors'][1]['reason']
+
+class FakeAsyncScraper(AsyncBaseScraper):
+    platform = "google_search"
+
+    async def ascrape(self, query, executor=None):
+        await asyncio.sleep(0.2)
+        return [{'business_name': "async result", 'platform': self.platform}], None
+
+    def _parse_search_results(self, soup):
+        return []
+
+    def _parse_profile_page(self, soup, source_url):
+        return {}
+
+def test_arun_mixes_async_and_blocking_scrapers(fake_registry):
+    fake_registry['google_search'] = FakeAsyncScraper()
+    fake_registry['facebook'].delay = 0.2
+    executor = ThreadPoolExecutor(max_workers=4)
+
+    async def main():
+        # The loop must keep running other tasks while the scrapers are busy
+        ticks = 0
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        ticker_task = asyncio.create_task(ticker())
+        result = await ScrapeOrchestrator().arun("test", executor=executor)
+        ticker_task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+    assert ticks > 5
+    assert result['platforms']['google_search'][0]['business_name'] == "async result"
+    assert list(result['platforms']) == ScrapeOrchestrator.PLATFORMS
+
+def test_arun_reports_timeouts(fake_registry):
+    fake_registry['linkedin'].delay = 1.0
+    orchestrator = ScrapeOrchestrator(platform_timeouts={'linkedin': 0.1})
+    result = asyncio.run(orchestrator.arun("test"))
+    assert 'linkedin' not in result['platforms']
+    assert result['errors'][0]['platform'] == 'linkedin'
+
+def test_arun_deadlines_start_when_the_scraper_runs(fake_registry):
+    for scraper in fake_registry.values():
+        scraper.delay = 0.05
+    executor = ThreadPoolExecutor(max_workers=1)
+    # Another request's work holds the only thread for longer than any platform's deadline
+    executor.submit(time.sleep, 0.3)
+
+    result = asyncio.run(ScrapeOrchestrator(platform_timeout=0.2).arun("test", executor=executor))
+
+    assert result['errors'] == []
+    assert list(result['platforms']) == ScrapeOrchestrator.PLATFORMS
+
+def test_arun_limits_in_flight_scrapes_including_abandoned_ones(fake_registry):
+    running, most_running = [], []
+
+    class CountingScraper(type(fake_registry['facebook'])):
+        def scrape(self, query):
+            running.append(self.platform)
+            most_running.append(len(running))
+            try:
+                return super().scrape(query)
+            finally:
+                running.remove(self.platform)
+
+    for platform in ScrapeOrchestrator.PLATFORMS:
+        fake_registry[platform] = CountingScraper(platform, delay=0.15)
+    orchestrator = ScrapeOrchestrator(platform_timeout=0.05, max_in_flight=2)
+
+    async def main():
+        return await asyncio.gather(*(orchestrator.arun("test", executor=ThreadPoolExecutor(max_workers=10)) for _ in range(2)))
+
+    results = asyncio.run(main())
+
+    assert max(most_running) == 2
+    assert len(most_running) == 2 * len(ScrapeOrchestrator.PLATFORMS)
+    assert all(len(result['errors']) == len(ScrapeOrchestrator.PLATFORMS) for result in results)
+
+def test_stream_yields_fast_platforms_first(fake_registry):
+    fake_registry['google_search'].delay = 0.3
+    fake_registry['facebook'].error = NoResultsFoundError('facebook')
+    events = list(ScrapeOrchestrator().stream("test"))
+
+    platform_events = [e['platform'] for e in events if e['event'] == 'platform']
+    assert platform_events[-1] == 'google_search'
+    assert len([e for e in events if e['event'] == 'lead']) == 4
+    assert [e['platform'] for e in events if e['event'] == 'error'] == ['facebook']
+    assert events[-1]['event'] == 'done'
+    assert events[-1]['errors'] == ['facebook']
+
+def test_astream_matches_run(fake_registry):
+    async def collect():
+        return [event async for event in ScrapeOrchestrator().astream("test")]
+
+    events = asyncio.run(collect())
+    result = ScrapeOrchestrator().run("test")
+    leads = {e['platform']: [e['data']] for e in events if e['event'] == 'lead'}
+    assert leads == result['platforms']
+    assert sorted(events[-1]['platforms']) == sorted(ScrapeOrchestrator.PLATFORMS)
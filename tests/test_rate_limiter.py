@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+from utils.rate_limiter import RateLimiter
+
+def test_burst_is_free_then_paced():
+    limiter = RateLimiter(host_limits={"example.com": (10.0, 3)}, jitter=0)
+    start = time.monotonic()
+    for _ in range(3):
+        assert limiter.acquire("https://example.com/a") == 0
+    assert time.monotonic() - start < 0.05
+    assert limiter.acquire("https://example.com/b") > 0.05
+
+def test_subdomains_share_the_configured_domain():
+    limiter = RateLimiter(host_limits={"google.com": (1.0, 1)})
+    assert limiter.key_for("https://www.google.com/search?q=x") == "google.com"
+    assert limiter.key_for("maps.google.com") == "google.com"
+    assert limiter.key_for("https://acme.co.uk/contact") == "acme.co.uk"
+    assert limiter.bucket("https://www.google.com/maps") is limiter.bucket("google.com")
+
+def test_unknown_hosts_get_independent_default_buckets():
+    limiter = RateLimiter(host_limits={}, default_rate=10.0, default_burst=1, jitter=0)
+    assert limiter.acquire("a.example") == 0
+    assert limiter.acquire("b.example") == 0
+    assert limiter.acquire("a.example") > 0.05
+
+def test_concurrent_threads_share_one_budget():
+    limiter = RateLimiter(host_limits={"example.com": (20.0, 1)}, jitter=0)
+    threads = [threading.Thread(target=limiter.acquire, args=("example.com",)) for _ in range(5)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # One free token, then four more at 20/s
+    assert time.monotonic() - start >= 0.18
+
+def test_async_acquire_shares_budget_with_sync_callers():
+    limiter = RateLimiter(host_limits={"example.com": (20.0, 1)}, jitter=0)
+    limiter.acquire("example.com")
+
+    async def main():
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.acquire_async("example.com") for _ in range(2)))
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) >= 0.09
+
+def test_penalize_blocks_host():
+    limiter = RateLimiter(host_limits={"instagram.com": (100.0, 10)}, jitter=0)
+    limiter.penalize("instagram.com", 0.2)
+    assert limiter.acquire("https://www.instagram.com/p/1") >= 0.15
@@ -0,0 +1,92 @@
+import time
+from scrapers.google_search import GoogleSearchScraper
+from utils.search_cache import SearchCache, normalize_query
+
+RESULTS = [{'title': 'Test Business', 'body': 'Description', 'href': 'https://example.com'}]
+
+def test_normalize_query():
+    assert normalize_query("  Hotels   in LONDON ") == "hotels in london"
+
+def test_memory_and_disk_tiers(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    cache = SearchCache(db_path=db_path)
+    assert cache.get("hotels", 10) is None
+    cache.set("hotels", 10, RESULTS)
+    assert cache.get("Hotels ", 10) == RESULTS
+    assert cache.get("hotels", 5) is None
+
+    # A fresh instance only has the disk tier
+    reopened = SearchCache(db_path=db_path)
+    assert reopened.get("hotels", 10) == RESULTS
+    assert reopened.get("hotels", 10) == RESULTS
+    stats = reopened.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+
+def test_callers_get_their_own_copies(tmp_path):
+    cache = SearchCache(db_path=str(tmp_path / "cache.sqlite3"))
+    results = [dict(result) for result in RESULTS]
+    cache.set("hotels", 10, results)
+    results[0]["title"] = "Changed after set"
+
+    first = cache.get("hotels", 10)
+    first[0]["title"] = "Changed by a caller"
+    first.append({"title": "Extra"})
+
+    assert cache.get("hotels", 10) == RESULTS
+    assert SearchCache(db_path=str(tmp_path / "cache.sqlite3")).get("hotels", 10) == RESULTS
+
+def test_entries_expire(tmp_path):
+    cache = SearchCache(db_path=str(tmp_path / "cache.sqlite3"), ttl=0.05)
+    cache.set("hotels", 10, RESULTS)
+    time.sleep(0.1)
+    assert cache.get("hotels", 10) is None
+    assert cache.stats()["expired"] == 1
+
+def test_size_based_eviction(tmp_path):
+    cache = SearchCache(db_path=str(tmp_path / "cache.sqlite3"), max_memory_entries=1, max_disk_bytes=300)
+    for i in range(5):
+        cache.set(f"query {i}", 10, RESULTS)
+        time.sleep(0.01)
+    stats = cache.stats()
+    assert stats["disk_bytes"] <= 300
+    assert stats["evictions"] > 0
+    assert stats["memory_entries"] == 1
+    assert cache.get("query 4", 10) == RESULTS
+    assert cache.get("query 0", 10) is None
+
+def test_memory_hits_keep_entries_on_disk(tmp_path):
+    cache = SearchCache(db_path=str(tmp_path / "cache.sqlite3"), max_memory_entries=2, max_disk_bytes=400)
+    cache.set("hot", 10, RESULTS)
+    for i in range(6):
+        time.sleep(0.01)
+        # Served from memory, without a disk read
+        assert cache.get("hot", 10) == RESULTS
+        cache.set(f"query {i}", 10, RESULTS)
+
+    assert cache.stats()["evictions"] > 0 and cache.stats()["disk_hits"] == 0
+    assert SearchCache(db_path=str(tmp_path / "cache.sqlite3")).get("hot", 10) == RESULTS
+
+def test_memory_hits_reach_the_disk_after_the_touch_interval(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    cache = SearchCache(db_path=db_path, touch_interval=0.2)
+    cache.set("hotels", 10, RESULTS)
+
+    def last_access():
+        return cache._connection().execute("SELECT last_access FROM search_results").fetchone()[0]
+
+    stored = last_access()
+
+    cache.get("hotels", 10)
+    assert last_access() == stored
+    time.sleep(0.25)
+    cache.get("hotels", 10)
+    assert last_access() > stored
+
+def test_scraper_reuses_cached_search(mocker, isolated_search_cache):
+    text = mocker.patch('duckduckgo_search.DDGS.text', return_value=RESULTS)
+    scraper = GoogleSearchScraper()
+    scraper.scrape("hotels in london")
+    results, _ = scraper.scrape("Hotels  in London")
+    assert text.call_count == 1
+    assert results[0]['business_name'] == "Test Business"
+    assert isolated_search_cache.stats()["memory_hits"] == 1
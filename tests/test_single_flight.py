@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+import pytest
+from utils.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"leads": [1, 2, 3]}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("hotels", work))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 5
+    # Every caller gets its own copy
+    assert all(result == {"leads": [1, 2, 3]} for result in results)
+    assert len({id(result) for result in results}) == 5
+    assert flight.in_flight() == 0
+
+def test_errors_propagate_to_every_caller():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def work():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("blocked")
+
+    errors = []
+    def call():
+        try:
+            flight.do("hotels", work)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call)
+    follower.start()
+    leader.join()
+    follower.join()
+    assert len(errors) == 2
+
+def test_finished_calls_are_not_cached():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+
+def test_async_callers_share_one_task():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("hotels", work) for _ in range(10)))
+
+    assert asyncio.run(main()) == ["result"] * 10
+    assert len(calls) == 1
+
+def test_cancelled_async_caller_does_not_cancel_shared_work():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.1)
+        return "result"
+
+    async def main():
+        first = asyncio.ensure_future(flight.ado("hotels", work))
+        second = asyncio.ensure_future(flight.ado("hotels", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "result"
+
+def test_sync_and_async_callers_share_one_key_space():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def work():
+        calls.append("sync")
+        started.set()
+        release.wait()
+        return ["sync result"]
+
+    async def async_work():
+        calls.append("async")
+        return ["async result"]
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("hotels", work)))
+    leader.start()
+    started.wait()
+
+    async def main():
+        waiter = asyncio.ensure_future(flight.ado("hotels", async_work))
+        # The event loop stays free while the sync call is in flight
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        release.set()
+        return await waiter
+
+    assert asyncio.run(main()) == ["sync result"]
+    leader.join()
+    assert results == [["sync result"]] and calls == ["sync"]
+
+    async def async_leader():
+        task = asyncio.ensure_future(flight.ado("hotels", async_work))
+        await asyncio.sleep(0)
+        # A sync caller on the loop running the work can't wait for it, so runs its own
+        return flight.do("hotels", lambda: ["own result"]), await task
+
+    assert asyncio.run(async_leader()) == (["own result"], ["async result"])
+    assert flight.in_flight() == 0
+
+def test_async_callers_get_their_own_copies():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return {"leads": []}
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("hotels", work) for _ in range(3)))
+
+    first, second, third = asyncio.run(main())
+    first["leads"].append("mutated")
+    assert second == third == {"leads": []}
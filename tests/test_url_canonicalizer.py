@@ -0,0 +1,92 @@
+import pytest
+from src.modules.url_canonicalizer import canonicalize_url, domain_key, registered_domain, DomainIndex
+from src.modules.deduplicator import Deduplicator
+from src.agent.models.lead import Lead
+from src.agent.storage.lead_store import save_leads
+from utils.lead_store import LeadStore
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.acme.com/", "https://acme.com"),
+    ("acme.com/?utm_source=x&utm_medium=y", "http://acme.com"),
+    ("HTTPS://Shop.Acme.co.uk:443/Store/?ref=bio&gclid=1#top", "https://shop.acme.co.uk/Store?ref=bio"),
+    ("http://acme.com:8080/a//", "http://acme.com:8080/a"),
+    ("https://www.google.com/url?q=https://www.acme.com/about/%3Futm_medium%3Dx&sa=U&ved=2", "https://acme.com/about"),
+    ("https://l.facebook.com/l.php?u=https%3A%2F%2Facme.com%2F&h=AT", "https://acme.com"),
+    ("https://www.google.com/url?q=/search%3Fq%3Dacme", "https://google.com/url?q=%2Fsearch%3Fq%3Dacme"),
+    ("https://example.org/url?q=https://acme.com", "https://example.org/url?q=https%3A%2F%2Facme.com"),
+    ("N/A", None),
+    ("  ", None),
+    (None, None),
+    ("http://[::1", None),
+])
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+def test_variants_of_a_site_share_one_domain_key():
+    keys = {domain_key(url) for url in ["https://www.acme.com/", "http://acme.com", "acme.com/?utm_source=x", "https://shop.acme.com/store", "https://www.google.com/url?q=https://acme.com/"]}
+
+    assert len(keys) == 1
+    assert domain_key("https://acme.co.uk") != domain_key("https://other.co.uk")
+    assert registered_domain("shop.acme.co.uk") == "acme.co.uk"
+    assert registered_domain("acme.com") == "acme.com"
+
+@pytest.mark.parametrize("first, second", [
+    ("https://acme.myshopify.com/", "https://other.myshopify.com/"),
+    ("https://acme.github.io", "https://other.github.io"),
+    ("https://acme.netlify.app/about", "https://other.netlify.app/about"),
+    ("https://acme.blogspot.com", "https://other.blogspot.com"),
+    ("https://acme.s3.amazonaws.com", "https://other.s3.amazonaws.com"),
+])
+def test_customers_of_hosting_platforms_stay_apart(first, second):
+    assert domain_key(first) != domain_key(second)
+    assert domain_key(first) == domain_key(first.replace("://", "://www.") + "?utm_source=x")
+
+def test_hosted_businesses_are_neither_merged_nor_dropped(tmp_path):
+    leads = [
+        Lead(name="Acme", company="Acme", website="https://acme.myshopify.com/"),
+        Lead(name="Other", company="Other", website="https://other.myshopify.com/"),
+    ]
+
+    assert len(Deduplicator().deduplicate(leads)) == 2
+    assert save_leads(leads, LeadStore(str(tmp_path / "leads.sqlite3"))) == 2
+
+def test_sites_on_hosting_platforms_are_registered_domains():
+    assert registered_domain("shop.acme.myshopify.com") == "acme.myshopify.com"
+    assert registered_domain("acme.github.io") == "acme.github.io"
+    assert registered_domain("github.io") == "github.io"
+    assert domain_key("https://acme.myshopify.com/products/a") == domain_key("https://acme.myshopify.com/")
+
+def test_pages_on_shared_hosts_stay_apart():
+    assert domain_key("https://www.facebook.com/acme/?fbclid=1") == domain_key("https://facebook.com/acme")
+    assert domain_key("https://facebook.com/acme") != domain_key("https://facebook.com/other")
+
+def test_domain_index_keeps_the_first_value():
+    index = DomainIndex()
+
+    assert index.setdefault("https://www.acme.com/", 0) == 0
+    assert index.setdefault("acme.com?utm_campaign=spring", 5) == 0
+    assert index.setdefault("not a url", 7) == 7
+    assert "http://acme.com" in index and "not a url" not in index
+    assert index.get("https://beta.example") is None
+    assert len(index) == 1
+
+def test_deduplicator_merges_url_variants():
+    leads = [
+        Lead(name="Acme", company="Acme", city="London", website="https://www.acme.com/", source="google"),
+        Lead(name="Acme Ltd", company="Acme Ltd", website="acme.com/?utm_source=linkedin", source="linkedin"),
+        Lead(name="Page", company="Acme page", website="https://facebook.com/acme", source="facebook"),
+        Lead(name="Other page", company="Other page", website="https://facebook.com/other", source="facebook"),
+    ]
+
+    merged = Deduplicator().deduplicate(leads)
+
+    assert [lead.source for lead in merged] == ["google, linkedin", "facebook", "facebook"]
+    assert merged[0].website == "https://www.acme.com/"
+
+def test_saved_leads_drop_url_variants_across_saves(tmp_path):
+    store = LeadStore(str(tmp_path / "leads.sqlite3"))
+
+    save_leads([Lead(name="Acme", company="Acme", website="https://www.acme.com/"), Lead(name="Beta", company="Beta", city="Leeds")], store)
+    save_leads([Lead(name="Acme again", company="Acme", website="http://acme.com?utm_source=x"), Lead(name="Beta", company="Beta", city="Leeds", website="")], store)
+
+    assert sorted(record["name"] for record in store.find()) == ["Acme again", "Beta"]
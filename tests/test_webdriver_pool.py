@@ -0,0 +1,146 @@
+import threading
+import pytest
+from selenium.common.exceptions import WebDriverException
+from src.agent.sources.webdriver_pool import WebDriverPool
+from src.agent.sources.google_maps_scraper import GoogleMapsScraper
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current = handle
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+        self.quit_called = False
+        self.window_handles = ["main"]
+        self.switch_to = FakeSwitchTo(self)
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise WebDriverException("session deleted")
+        return 1
+
+    def close(self):
+        self.window_handles.remove(self.current)
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+@pytest.fixture
+def created():
+    return []
+
+@pytest.fixture
+def pool(created):
+    def factory():
+        driver = FakeDriver()
+        created.append(driver)
+        return driver
+    return WebDriverPool(max_size=2, max_uses=3, lease_timeout=0.2, driver_factory=factory)
+
+def test_drivers_are_reused(pool, created):
+    with pool.lease() as first:
+        pass
+    with pool.lease() as second:
+        pass
+    assert first is second
+    assert len(created) == 1
+
+def test_pool_is_bounded(pool):
+    first = pool.acquire()
+    second = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+
+    released = threading.Timer(0.05, pool.release, args=(first,))
+    released.start()
+    assert pool.acquire() is first
+    pool.release(first)
+    pool.release(second)
+
+def test_drivers_are_recycled_after_max_uses(pool, created):
+    for _ in range(3):
+        with pool.lease():
+            pass
+    assert created[0].quit_called
+    with pool.lease() as driver:
+        assert driver is created[1]
+
+def test_unhealthy_drivers_are_replaced(pool, created):
+    with pool.lease():
+        pass
+    created[0].alive = False
+    with pool.lease() as driver:
+        assert driver is created[1]
+    assert created[0].quit_called
+
+def test_extra_windows_are_closed_on_release(pool):
+    with pool.lease() as driver:
+        driver.window_handles.append("place")
+    assert driver.window_handles == ["main"]
+
+def test_prewarm_and_close(pool, created):
+    pool.prewarm()
+    assert len(created) == 2
+    assert pool.stats() == {"live": 2, "idle": 2, "max_size": 2}
+    pool.close()
+    assert all(driver.quit_called for driver in created)
+
+def test_google_maps_scraper_leases_from_pool(pool, created):
+    with GoogleMapsScraper("hotels in london", pool=pool) as scraper:
+        assert scraper.driver is created[0]
+    assert scraper.driver is None
+    assert pool.stats()["idle"] == 1
+
+class FakeTabbedDriver(FakeDriver):
+    def __init__(self):
+        super().__init__()
+        self.current = "main"
+        self.locations = {}
+        self.blocked_tabs = set()
+        self.opened = 0
+
+    @property
+    def current_window_handle(self):
+        return self.current
+
+    def execute_script(self, script, *args):
+        if script.startswith("window.open"):
+            self.opened += 1
+            self.window_handles.append(f"tab{self.opened}")
+        elif script.startswith("window.location.href"):
+            self.locations[self.current] = args[0]
+        return 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == "Network.setBlockedURLs":
+            self.blocked_tabs.add(self.current)
+
+def test_place_pages_are_loaded_in_parallel_tabs(pool, mocker):
+    driver = FakeTabbedDriver()
+    mocker.patch('src.agent.sources.google_maps_scraper.WebDriverWait')
+    scraper = GoogleMapsScraper("hotels", pool=pool, max_parallel_tabs=3)
+    scraper.driver = driver
+    navigated_before_read = []
+
+    def details():
+        navigated_before_read.append(len(driver.locations))
+        return {"name": driver.locations[driver.current], "company": driver.locations[driver.current], "source": "Google Maps"}
+
+    mocker.patch.object(scraper, '_scrape_place_details', side_effect=details)
+
+    links = ["https://maps/place/a", "https://maps/place/b", "https://maps/place/c"]
+    leads = scraper._scrape_place_batch(links)
+
+    # Every tab was navigated before the first one was read, with blocking applied first
+    assert navigated_before_read == [3, 3, 3]
+    assert [lead.name for lead in leads] == links
+    assert driver.blocked_tabs == {"tab1", "tab2", "tab3"}
+    assert driver.window_handles == ["main"]
+    assert driver.current == "main"
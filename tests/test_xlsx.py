@@ -0,0 +1,37 @@
+import io
+import math
+import pandas as pd
+from openpyxl import load_workbook
+from utils.xlsx import MAX_CELL_CHARS, stream_xlsx
+
+def read_sheets(chunks) -> dict:
+    workbook = load_workbook(io.BytesIO(b"".join(chunks)))
+    return {sheet.title: [list(row) for row in sheet.iter_rows(values_only=True)] for sheet in workbook.worksheets}
+
+def test_rows_past_the_sheet_limit_continue_on_new_sheets():
+    rows = [["name", "rank"]] + [[f"Lead {i}", i] for i in range(5)]
+
+    assert read_sheets(stream_xlsx(rows, max_rows=3)) == {
+        "Sheet1": [["name", "rank"], ["Lead 0", 0], ["Lead 1", 1]],
+        "Sheet2": [["name", "rank"], ["Lead 2", 2], ["Lead 3", 3]],
+        "Sheet3": [["name", "rank"], ["Lead 4", 4]],
+    }
+    assert read_sheets(stream_xlsx(iter(rows), header=False, max_rows=3))["Sheet2"] == [["Lead 2", 2], ["Lead 3", 3], ["Lead 4", 4]]
+    assert pd.read_excel(io.BytesIO(b"".join(stream_xlsx(rows, max_rows=3))), sheet_name=None)["Sheet3"].values.tolist() == [["Lead 4", 4]]
+
+def test_single_and_empty_sheets():
+    assert read_sheets(stream_xlsx([["name"], ["Ann"]])) == {"Sheet1": [["name"], ["Ann"]]}
+    assert read_sheets(stream_xlsx([])) == {"Sheet1": []}
+
+def test_non_finite_numbers_keep_the_workbook_valid():
+    rows = [["value"], [math.inf], [-math.inf], [math.nan], [1.5]]
+
+    assert read_sheets(stream_xlsx(rows)) == {"Sheet1": [["value"], ["inf"], ["-inf"], [None], [1.5]]}
+
+def test_strings_are_cut_at_the_cell_limit():
+    rows = [["notes"], ["x" * (MAX_CELL_CHARS + 10)], ["&" * MAX_CELL_CHARS]]
+
+    sheet = read_sheets(stream_xlsx(rows))["Sheet1"]
+
+    assert sheet[1] == ["x" * MAX_CELL_CHARS]
+    assert sheet[2] == ["&" * MAX_CELL_CHARS]
@@ -0,0 +1,100 @@
+import threading
+import time
+
+class CircuitBreaker:
+    """
+    Stops calling a platform after it fails repeatedly.
+
+    Closed: calls go through; `failure_threshold` consecutive failures open the circuit.
+    Open: calls are refused until `reset_timeout` seconds have passed.
+    Half-open: a single probe call is let through; success closes the circuit and
+    failure opens it again for another `reset_timeout`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 120.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started_at = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if now - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_started_at = now
+                return True
+            # Half-open: only one probe at a time, unless the last one never reported back
+            if self._probe_started_at is not None and now - self._probe_started_at < self.reset_timeout:
+                return False
+            self._probe_started_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_started_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probe_started_at = None
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed, or 0 if calls are allowed now."""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_after": round(self.retry_after(), 1),
+        }
+
+class CircuitBreakerRegistry:
+    """One breaker per platform, created on first use and shared by every caller."""
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 120.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, platform: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(platform)
+            if breaker is None:
+                breaker = CircuitBreaker(platform, self.failure_threshold, self.reset_timeout)
+                self._breakers[platform] = breaker
+            return breaker
+
+    def states(self) -> list[dict]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [breaker.to_dict() for breaker in breakers]
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+
+circuit_breakers = CircuitBreakerRegistry()
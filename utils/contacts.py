@@ -0,0 +1,105 @@
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+_CONTACT_PATTERN = (
+    r"(?P<url>(?:https?://|www\.)[^\s<>\"'\x00]+)"
+    r"|(?P<email>(?<![\w.+-])[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,})"
+    r"|(?P<phone>(?=[+(\d])(?<![\w+])(?:(?:\+\d{1,3}[\s.-]?)?(?:\(\d{3}\)\s*|\d{3}[\s.-]?))%s\d{3}[\s.-]?\d{4}(?!\w))"
+)
+
+# One pattern, one pass. URLs are tried first so addresses and digits inside a link
+# aren't reported separately, then emails, then phone numbers, which need an area code.
+CONTACT_PATTERN = re.compile(_CONTACT_PATTERN % "")
+
+# Also takes 7-digit local numbers, which prices, ids and postcodes look like too
+LOCAL_CONTACT_PATTERN = re.compile(_CONTACT_PATTERN % "?")
+
+# Texts are joined with a separator no pattern can match across
+_SEPARATOR = "\x00"
+_URL_TRAILING = ".,;:!?)]}'\""
+_NON_DIGITS = re.compile(r"\D")
+
+@dataclass
+class Contacts:
+    """Normalized, deduplicated contact details found in one text, in order of appearance."""
+    emails: List[str] = field(default_factory=list)
+    phones: List[str] = field(default_factory=list)
+    urls: List[str] = field(default_factory=list)
+
+    @property
+    def email(self) -> Optional[str]:
+        return self.emails[0] if self.emails else None
+
+    @property
+    def phone(self) -> Optional[str]:
+        return self.phones[0] if self.phones else None
+
+    @property
+    def url(self) -> Optional[str]:
+        return self.urls[0] if self.urls else None
+
+def extract_contacts(text: str, local_phones: bool = False) -> Contacts:
+    """Finds the emails, phone numbers and URLs in `text`."""
+    return extract_contacts_batch([text], local_phones)[0]
+
+def extract_contacts_batch(texts: Iterable[str], local_phones: bool = False) -> List[Contacts]:
+    """
+    Finds contacts in many texts at once, returning one `Contacts` per text. The texts
+    are scanned as a single joined string, which avoids per-call overhead when
+    processing thousands of posts or bios.
+
+    Emails are lowercased, URLs lose trailing punctuation and get a lowercased scheme
+    and host, and phone numbers keep their first-seen form but are deduplicated on
+    their digits. Phone numbers need an area code unless `local_phones` is set, for
+    texts where a bare 7-digit number is more likely a phone than anything else.
+    """
+    texts = [text or "" for text in texts]
+    results = [Contacts() for _ in texts]
+    if not texts:
+        return results
+
+    # Matches come in order, so the text a match belongs to only ever moves forward
+    ends = []
+    position = 0
+    for text in texts:
+        position += len(text)
+        ends.append(position)
+        position += 1
+
+    index = 0
+    seen = set()
+    pattern = LOCAL_CONTACT_PATTERN if local_phones else CONTACT_PATTERN
+    for match in pattern.finditer(_SEPARATOR.join(texts)):
+        start = match.start()
+        if start > ends[index]:
+            while start > ends[index]:
+                index += 1
+            seen = set()
+        kind = match.lastgroup
+        value = match.group()
+        if kind == "email":
+            value = value.lower()
+            key = value
+            values = results[index].emails
+        elif kind == "phone":
+            value = " ".join(value.split())
+            key = _NON_DIGITS.sub("", value)
+            values = results[index].phones
+        else:
+            value = _normalize_url(value)
+            key = value
+            values = results[index].urls
+        if (kind, key) not in seen:
+            seen.add((kind, key))
+            values.append(value)
+    return results
+
+def _normalize_url(url: str) -> str:
+    url = url.rstrip(_URL_TRAILING)
+    scheme, separator, rest = url.partition("://")
+    if not separator:
+        rest = url
+    host, slash, path = rest.partition("/")
+    host = host.lower() + slash + path
+    return f"{scheme.lower()}://{host}" if separator else host
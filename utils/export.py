@@ -0,0 +1,104 @@
+"""
+Streaming exports of lead records as XLSX, CSV or NDJSON, optionally gzipped. Every
+format is produced as an iterator of byte chunks while the records are read, so an
+export can be sent over HTTP or written to disk without building it in memory first.
+"""
+import csv
+import io
+import json
+import os
+import tempfile
+import zlib
+from typing import Iterable, Iterator, List, Optional, Tuple
+from utils.xlsx import stream_xlsx
+
+# Format -> media type. The format is also the file extension.
+EXPORT_FORMATS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "csv.gz": "application/gzip",
+    "ndjson.gz": "application/gzip",
+}
+
+# Bump when the same records would be exported as different bytes, so cached exports
+# from the old code aren't served (see `ExportCache`)
+EXPORT_VERSION = 3
+
+_CHUNK_SIZE = 256 * 1024
+
+def split_export_name(filename: str) -> Tuple[str, Optional[str]]:
+    """Splits e.g. `run.csv.gz` into (`run`, `csv.gz`); the format is None if it isn't an export format."""
+    for fmt in sorted(EXPORT_FORMATS, key=len, reverse=True):
+        if filename.endswith("." + fmt):
+            return filename[:-len(fmt) - 1], fmt
+    return filename, None
+
+def stream_export(records: Iterable[dict], columns: List[str], fmt: str) -> Iterator[bytes]:
+    """
+    Yields `records` in the export format `fmt`. XLSX and CSV files have one column per
+    name in `columns`, in that order; NDJSON lines keep each record's own fields.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Supported formats: {', '.join(EXPORT_FORMATS)}.")
+    base, _, compression = fmt.partition(".")
+    if base == "xlsx":
+        chunks = stream_xlsx(_table(records, columns))
+    elif base == "csv":
+        chunks = _csv_chunks(records, columns)
+    else:
+        chunks = _ndjson_chunks(records)
+    return _gzipped(chunks) if compression == "gz" else chunks
+
+def write_file(path: str, chunks: Iterable[bytes]):
+    """Writes `chunks` to `path`, replacing the file atomically once they are all written."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(suffix=os.path.splitext(path)[1], dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def _table(records: Iterable[dict], columns: List[str]) -> Iterator[list]:
+    """The header row, then one row of values per record."""
+    yield columns
+    for record in records:
+        yield [record.get(column) for column in columns]
+
+def _csv_chunks(records: Iterable[dict], columns: List[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for values in _table(records, columns):
+        # None and NaN are written as empty fields, as pandas does
+        writer.writerow(["" if value is None or value != value else value for value in values])
+        if buffer.tell() >= _CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+def _ndjson_chunks(records: Iterable[dict]) -> Iterator[bytes]:
+    pending, size = [], 0
+    for record in records:
+        line = json.dumps(record, default=str)
+        pending.append(line)
+        size += len(line)
+        if size >= _CHUNK_SIZE:
+            yield ("\n".join(pending) + "\n").encode("utf-8")
+            pending, size = [], 0
+    if pending:
+        yield ("\n".join(pending) + "\n").encode("utf-8")
+
+def _gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    # A gzip header with no name or timestamp, so the output only depends on the input
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
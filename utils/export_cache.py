@@ -0,0 +1,111 @@
+"""
+Content-addressed cache of lead exports, and the download response that serves them
+with validators so clients that already have an export don't download it again.
+"""
+import hashlib
+import os
+import re
+import threading
+from typing import Callable, Iterable, Mapping
+from starlette.responses import FileResponse, Response
+from utils.export import EXPORT_FORMATS, EXPORT_VERSION, write_file
+from utils.single_flight import SingleFlight
+
+# Formats that are also cached gzipped, and served that way to clients that accept gzip
+PRECOMPRESSED = {"csv": "csv.gz", "ndjson": "ndjson.gz"}
+
+_ENTRY = re.compile(r"^[0-9a-f]{64}\.")
+
+class ExportCache:
+    """
+    Export files addressed by the content digest of the leads they hold (see
+    `LeadStore.digest`) and their format. Exports are deterministic, so each distinct
+    lead set is generated once per format and then served from disk; concurrent
+    requests for an export that is still being generated wait for it. Beyond
+    `max_files`, the least recently served files are removed.
+    """
+
+    def __init__(self, directory: str, max_files: int = 64):
+        self.directory = directory
+        self.max_files = max_files
+        self._flight = SingleFlight()
+        self._evict_lock = threading.Lock()
+
+    @staticmethod
+    def key(digest: str, fmt: str) -> str:
+        return hashlib.sha256(f"{digest}:{fmt}:{EXPORT_VERSION}".encode("utf-8")).hexdigest()
+
+    def path(self, digest: str, fmt: str) -> str:
+        return os.path.join(self.directory, f"{self.key(digest, fmt)}.{fmt}")
+
+    def get(self, digest: str, fmt: str, generate: Callable[[], Iterable[bytes]]) -> str:
+        """Path of the export, writing it from the chunks of `generate()` if it isn't cached."""
+        path = self.path(digest, fmt)
+        try:
+            # Marks the file as recently served
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            return self._flight.do(path, self._generate, path, generate)
+
+    def _generate(self, path: str, generate: Callable[[], Iterable[bytes]]) -> str:
+        # Another caller may have finished generating it since the cache was checked
+        if not os.path.exists(path):
+            write_file(path, generate())
+            self._evict()
+        return path
+
+    def _evict(self):
+        with self._evict_lock:
+            entries = sorted(
+                ((entry.stat().st_mtime_ns, entry.path) for entry in os.scandir(self.directory) if _ENTRY.match(entry.name)),
+                reverse=True,
+            )
+            for _, path in entries[self.max_files:]:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+
+def export_response(request_headers: Mapping[str, str], cache: ExportCache, digest: str, fmt: str, filename: str,
+                    generate: Callable[[str], Iterable[bytes]]) -> Response:
+    """
+    Download response for the export of the leads with `digest` in `fmt`, generated on
+    first request from the chunks of `generate(fmt)`. The ETag is the export's content
+    address, so a client revalidating with If-None-Match gets a 304 without the export
+    being generated or read, and Range requests resume against the same bytes. Clients
+    that accept gzip get CSV and NDJSON from a precompressed copy.
+
+    Blocks while the export is generated, so async callers should run it in an executor.
+    """
+    variant = fmt
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if fmt in PRECOMPRESSED and _accepts_gzip(request_headers.get("accept-encoding", "")):
+        variant = PRECOMPRESSED[fmt]
+    headers["ETag"] = f'"{ExportCache.key(digest, variant)}"'
+    if _etag_matches(request_headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    path = cache.get(digest, variant, lambda: generate(variant))
+    if variant != fmt:
+        headers["Content-Encoding"] = "gzip"
+    return FileResponse(path, media_type=EXPORT_FORMATS[fmt], filename=filename, headers=headers)
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            quality = params.strip().lower()
+            try:
+                return not quality.startswith("q=") or float(quality[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
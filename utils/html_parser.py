@@ -0,0 +1,357 @@
+import logging
+import re
+from abc import ABC, abstractmethod
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+# lxml and selectolax are optional; html.parser always works
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+    _LXML_TEXT = etree.XPath("descendant-or-self::text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::template)]")
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+BACKENDS = ("html.parser", "lxml", "selectolax")
+
+# None picks the fastest installed backend
+DEFAULT_BACKEND = None
+
+# Their contents are code, not page text
+_NON_TEXT_TAGS = {"script", "style", "template"}
+
+# Whitespace is kept as written inside these; elsewhere html.parser (through
+# BeautifulSoup) turns every whitespace-only string into a single newline or space
+_PREFORMATTED_TAGS = {"pre", "textarea"}
+_ASCII_SPACES = " \n\t\x0c\r"
+
+def available_backends() -> list[str]:
+    available = ["html.parser"]
+    if lxml is not None:
+        available.append("lxml")
+    if LexborHTMLParser is not None:
+        available.append("selectolax")
+    return available
+
+def resolve_backend(backend: str = None) -> str:
+    backend = backend or DEFAULT_BACKEND
+    if backend is None:
+        return available_backends()[-1]
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {backend}. Choose one of {', '.join(BACKENDS)}.")
+    if backend not in available_backends():
+        logging.warning(f"HTML parser backend '{backend}' is not installed; using html.parser.")
+        return "html.parser"
+    return backend
+
+def parse_html(html, backend: str = None, only=None) -> "HtmlDocument":
+    """
+    Parses `html` (str or bytes) into an `HtmlDocument`. Extraction code written against
+    the document's CSS-selector API gives the same results on every backend. An existing
+    `BeautifulSoup` or `HtmlDocument` is wrapped or returned as is.
+
+    `only` limits the document to the elements matching a list of simple selectors
+    (`tag`, `.class`, `#id`, `[attr]`, `[attr="value"]` and combinations) and their
+    subtrees; everything else, including its text, is left out. html.parser then never
+    builds the rest of the tree, which is where most of its time goes.
+    """
+    if isinstance(html, HtmlDocument):
+        return html
+    if isinstance(html, BeautifulSoup):
+        return HtmlDocument(_SoupNode(html), "html.parser")
+
+    selectors = [_SimpleSelector(selector) for selector in only] if only else None
+    backend = resolve_backend(backend)
+    if backend == "selectolax":
+        tree = LexborHTMLParser(html)
+        if tree.root is None:
+            return HtmlDocument(None, backend)
+        if selectors:
+            return HtmlDocument(_LexborFragment(tree.root, only), backend)
+        return HtmlDocument(_LexborNode(tree.root), backend)
+    if backend == "lxml":
+        try:
+            root = lxml.html.document_fromstring(html)
+        except Exception:
+            # lxml refuses empty documents and some encodings declared in str input
+            return parse_html(html, "html.parser", only)
+        if selectors:
+            root = _lxml_fragment(root, only)
+        return HtmlDocument(_LxmlNode(root), backend)
+    if selectors:
+        return HtmlDocument(_SoupNode(BeautifulSoup(html, "html.parser", parse_only=_SelectorStrainer(selectors))), backend)
+    return HtmlDocument(_SoupNode(BeautifulSoup(html, "html.parser")), backend)
+
+_SIMPLE_SELECTOR = re.compile(r'^(?P<tag>[A-Za-z][\w-]*)?(?P<rest>(?:\.[\w-]+|#[\w-]+|\[[\w-]+(?:=(?:"[^"]*"|\'[^\']*\'|[^\]"\']*))?\])*)$')
+_SELECTOR_PART = re.compile(r'\.(?P<cls>[\w-]+)|#(?P<id>[\w-]+)|\[(?P<attr>[\w-]+)(?:=(?P<value>"[^"]*"|\'[^\']*\'|[^\]"\']*))?\]')
+
+class _SimpleSelector:
+    """A compound selector that can be tested against a tag before the tag is built."""
+
+    def __init__(self, selector: str):
+        match = _SIMPLE_SELECTOR.match(selector.strip())
+        if not match or not selector.strip():
+            raise ValueError(f"Unsupported selector for partial parsing: {selector!r}")
+        self.tag = match.group("tag").lower() if match.group("tag") else None
+        self.classes = []
+        self.attrs = {}
+        for part in _SELECTOR_PART.finditer(match.group("rest")):
+            if part.group("cls"):
+                self.classes.append(part.group("cls"))
+            elif part.group("id"):
+                self.attrs["id"] = part.group("id")
+            else:
+                value = part.group("value")
+                self.attrs[part.group("attr").lower()] = value.strip("\"'") if value is not None else None
+
+    def matches(self, name: str, attrs: dict) -> bool:
+        if self.tag and name != self.tag:
+            return False
+        if self.classes:
+            classes = attrs.get("class") or ""
+            classes = classes.split() if isinstance(classes, str) else classes
+            if not all(cls in classes for cls in self.classes):
+                return False
+        for attr, value in self.attrs.items():
+            if attr not in attrs or (value is not None and attrs[attr] != value):
+                return False
+        return True
+
+class _SelectorStrainer(SoupStrainer):
+    """Lets BeautifulSoup create only the tags matching one of the selectors, plus their contents."""
+
+    def __init__(self, selectors: list):
+        super().__init__()
+        self.selectors = selectors
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self._matches(name, attrs)
+
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        # BeautifulSoup before 4.13
+        return self._matches(markup_name, markup_attrs)
+
+    def _matches(self, name, attrs) -> bool:
+        attrs = dict(attrs or {})
+        return any(selector.matches(name, attrs) for selector in self.selectors)
+
+def _outermost(nodes, parent_of, key):
+    # Drops matches nested inside another match; their content is already included
+    seen = set()
+    outermost = []
+    for node in nodes:
+        ancestor = parent_of(node)
+        while ancestor is not None and key(ancestor) not in seen:
+            ancestor = parent_of(ancestor)
+        seen.add(key(node))
+        if ancestor is None:
+            outermost.append(node)
+    return outermost
+
+def _collapse_whitespace(string: str) -> str:
+    # BeautifulSoup's rule for whitespace-only strings outside preformatted tags
+    return "\n" if "\n" in string else " "
+
+def _join(strings, strip: bool) -> str:
+    # Same semantics as BeautifulSoup's get_text(strip=...)
+    if strip:
+        return "".join(s.strip() for s in strings if s.strip())
+    return "".join(strings)
+
+class HtmlNode(ABC):
+    """An element in a parsed document. Subclasses adapt one parser backend."""
+
+    tag: str
+
+    @abstractmethod
+    def select(self, selector: str) -> list["HtmlNode"]:
+        ...
+
+    def select_one(self, selector: str) -> "HtmlNode | None":
+        matches = self.select(selector)
+        return matches[0] if matches else None
+
+    @abstractmethod
+    def attr(self, name: str, default: str = None) -> str | None:
+        ...
+
+    def text(self, strip: bool = False) -> str:
+        """
+        Text of the element and its descendants, leaving out script and style contents.
+        Every backend gives the text html.parser gives: whitespace-only strings outside
+        `pre` and `textarea` become a single newline (or a space if they had none).
+        """
+        return _join(self._strings(), strip)
+
+    @abstractmethod
+    def _strings(self):
+        """The element's text strings, in document order, with whitespace as html.parser leaves it."""
+
+class HtmlDocument:
+    """A parsed page with CSS-selector based lookups, independent of the parser backend."""
+
+    def __init__(self, root: HtmlNode | None, backend: str):
+        self.root = root
+        self.backend = backend
+
+    def select(self, selector: str) -> list[HtmlNode]:
+        return self.root.select(selector) if self.root is not None else []
+
+    def select_one(self, selector: str) -> HtmlNode | None:
+        return self.root.select_one(selector) if self.root is not None else None
+
+    def title(self, strip: bool = False) -> str | None:
+        title = self.select_one("title")
+        return title.text(strip) if title is not None else None
+
+    def text(self, strip: bool = False) -> str:
+        """
+        Text of the whole page; see `HtmlNode.text`. Whitespace between the html, head
+        and body tags themselves can differ by backend, since HTML5 parsers move or drop
+        it; the text of `body` and of every element in it doesn't.
+        """
+        return self.root.text(strip) if self.root is not None else ""
+
+class _SoupNode(HtmlNode):
+    def __init__(self, tag: Tag):
+        self._tag = tag
+        self.tag = tag.name
+
+    def select(self, selector):
+        return [_SoupNode(tag) for tag in self._tag.select(selector)]
+
+    def select_one(self, selector):
+        tag = self._tag.select_one(selector)
+        return _SoupNode(tag) if tag is not None else None
+
+    def attr(self, name, default=None):
+        value = self._tag.get(name, default)
+        # BeautifulSoup splits multi-valued attributes such as class
+        return " ".join(value) if isinstance(value, list) else value
+
+    def text(self, strip=False):
+        return self._tag.get_text(strip=strip)
+
+    def _strings(self):
+        return self._tag.strings
+
+_compiled_selectors = {}
+
+def _css_selector(selector: str):
+    compiled = _compiled_selectors.get(selector)
+    if compiled is None:
+        compiled = _compiled_selectors.setdefault(selector, CSSSelector(selector))
+    return compiled
+
+class _LxmlNode(HtmlNode):
+    def __init__(self, element):
+        self._element = element
+        self.tag = element.tag
+
+    def select(self, selector):
+        compiled = _css_selector(selector)
+        # Like BeautifulSoup, only descendants match, never the element itself
+        return [_LxmlNode(element) for element in compiled(self._element) if element is not self._element]
+
+    def attr(self, name, default=None):
+        return self._element.get(name, default)
+
+    def _strings(self):
+        if self.tag in _NON_TEXT_TAGS:
+            yield self._element.text_content()
+            return
+        for string in _LXML_TEXT(self._element):
+            if string.strip(_ASCII_SPACES) or self._preformatted(string):
+                yield string
+            else:
+                yield _collapse_whitespace(string)
+
+    @staticmethod
+    def _preformatted(string) -> bool:
+        # A tail belongs to the element that contains its (preceding sibling) parent
+        element = string.getparent()
+        if string.is_tail:
+            element = element.getparent()
+        while element is not None:
+            if element.tag in _PREFORMATTED_TAGS:
+                return True
+            element = element.getparent()
+        return False
+
+def _lxml_fragment(root, only):
+    # Move the matched subtrees under a fresh root; the rest of the tree is dropped
+    matches = _css_selector(", ".join(only))(root)
+    fragment = lxml.html.Element("html")
+    for element in _outermost(matches, lambda element: element.getparent(), id):
+        element.tail = None
+        fragment.append(element)
+    return fragment
+
+class _LexborNode(HtmlNode):
+    def __init__(self, node):
+        self._node = node
+        self.tag = node.tag
+
+    def select(self, selector):
+        # Like BeautifulSoup, only descendants match, never the node itself
+        return [_LexborNode(node) for node in self._node.css(selector) if node.mem_id != self._node.mem_id]
+
+    def select_one(self, selector):
+        node = self._node.css_first(selector)
+        if node is not None and node.mem_id == self._node.mem_id:
+            return HtmlNode.select_one(self, selector)
+        return _LexborNode(node) if node is not None else None
+
+    def attr(self, name, default=None):
+        attributes = self._node.attributes
+        if name not in attributes:
+            return default
+        # Valueless attributes come back as None, where the other backends give ""
+        return attributes[name] or ""
+
+    def _strings(self):
+        if self.tag in _NON_TEXT_TAGS:
+            yield self._node.text(deep=True)
+            return
+        for node in self._node.traverse(include_text=True):
+            if node.tag == "-text" and node.parent is not None and node.parent.tag not in _NON_TEXT_TAGS:
+                string = node.text_content
+                if string.strip(_ASCII_SPACES) or self._preformatted(node):
+                    yield string
+                else:
+                    yield _collapse_whitespace(string)
+
+    @staticmethod
+    def _preformatted(node) -> bool:
+        parent = node.parent
+        while parent is not None:
+            if parent.tag in _PREFORMATTED_TAGS:
+                return True
+            parent = parent.parent
+        return False
+
+class _LexborFragment(HtmlNode):
+    """The subtrees of a lexbor document matching `only`, treated as one document."""
+
+    tag = None
+
+    def __init__(self, root, only):
+        matches = root.css(", ".join(only))
+        self._nodes = _outermost(matches, lambda node: node.parent, lambda node: node.mem_id)
+
+    def select(self, selector):
+        # The matched subtrees are top-level here, so they can match themselves
+        return [_LexborNode(match) for node in self._nodes for match in node.css(selector)]
+
+    def attr(self, name, default=None):
+        return default
+
+    def _strings(self):
+        for node in self._nodes:
+            if node.tag not in _NON_TEXT_TAGS:
+                yield from _LexborNode(node)._strings()
@@ -0,0 +1,279 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime, formatdate
+from urllib.parse import urlsplit
+
+# Heuristic freshness for responses that only carry Last-Modified (RFC 7234, 4.2.2)
+HEURISTIC_FRACTION = 0.1
+HEURISTIC_MAX_AGE = 24 * 3600
+
+# Bodies are stored decoded, so headers describing the wire encoding are dropped
+_UNSTORED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+_OUTCOME_COUNTERS = {"hit": "hits", "revalidated": "revalidated", "stale": "stale", "miss": "misses"}
+
+def parse_cache_control(value: str) -> dict:
+    """Parses a Cache-Control header into {directive: value}; valueless directives map to True."""
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') if argument else True
+    return directives
+
+def _http_date(value: str) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+def _seconds(value) -> float | None:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+class CacheEntry:
+    """A stored response plus the freshness information needed to serve or revalidate it."""
+
+    def __init__(self, url: str, status: int, headers: dict, body: bytes, stored_at: float, fresh_until: float, stale_until: float, vary: dict):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.vary = vary
+
+    @property
+    def etag(self) -> str | None:
+        return _header(self.headers, "ETag")
+
+    @property
+    def last_modified(self) -> str | None:
+        return _header(self.headers, "Last-Modified")
+
+    def is_fresh(self, now: float = None) -> bool:
+        return (time.time() if now is None else now) < self.fresh_until
+
+    def usable_on_error(self, now: float = None) -> bool:
+        return (time.time() if now is None else now) < self.stale_until
+
+    def conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+def _header(headers: dict, name: str) -> str | None:
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+def _storable(headers) -> dict:
+    return {name: value for name, value in dict(headers).items() if name.lower() not in _UNSTORED_HEADERS}
+
+class HttpCache:
+    """
+    A private HTTP response cache on local disk (SQLite), following RFC 7234 for GET requests.
+
+    Freshness comes from `Cache-Control: max-age`, then `Expires`, then a heuristic based on
+    `Last-Modified`. Stale entries with an `ETag` or `Last-Modified` are revalidated with a
+    conditional request, and stale entries are served when the upstream fails, for up to
+    `stale_if_error` seconds (or the response's own `stale-if-error`) unless it says
+    `must-revalidate`. The total body size is capped; least recently used entries go first.
+    """
+
+    def __init__(self, db_path: str = ".cache/http_cache.sqlite3", max_bytes: int = 256 * 1024 * 1024, max_entry_bytes: int = 8 * 1024 * 1024, stale_if_error: float = 7 * 24 * 3600):
+        """
+        Args:
+            db_path: Location of the SQLite database.
+            max_bytes: Total size of stored bodies before the LRU entries are evicted.
+            max_entry_bytes: Bodies larger than this are never stored.
+            stale_if_error: Default seconds past expiry a response may be served when the upstream errors.
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.stale_if_error = stale_if_error
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total_bytes = 0
+        self._evictions = 0
+        self._host_stats = {}
+
+    def lookup(self, url: str, request_headers: dict) -> CacheEntry | None:
+        """Returns the stored entry for `url` if its Vary headers match the request, fresh or not."""
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT status, headers, body, stored_at, fresh_until, stale_until, vary FROM http_responses WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            status, headers, body, stored_at, fresh_until, stale_until, vary = row
+            vary = json.loads(vary)
+            if any(_header(request_headers, name) != value for name, value in vary.items()):
+                return None
+            conn.execute("UPDATE http_responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            conn.commit()
+            return CacheEntry(url, status, json.loads(headers), body, stored_at, fresh_until, stale_until, vary)
+
+    def store(self, url: str, status: int, headers: dict, body: bytes, request_headers: dict) -> bool:
+        """Stores a 200 response if its headers allow it. Returns whether it was stored."""
+        if status != 200 or len(body) > self.max_entry_bytes:
+            return False
+        headers = _storable(headers)
+        cache_control = parse_cache_control(_header(headers, "Cache-Control"))
+        vary_names = [name.strip() for name in (_header(headers, "Vary") or "").split(",") if name.strip()]
+        if "no-store" in cache_control or "*" in vary_names:
+            return False
+
+        now = time.time()
+        fresh_until, stale_until = self._expiry(headers, cache_control, now)
+        if fresh_until <= now and not (_header(headers, "ETag") or _header(headers, "Last-Modified")):
+            # Neither fresh nor revalidatable, so it could only ever be served on errors
+            return False
+
+        vary = {name.lower(): _header(request_headers, name) for name in vary_names}
+        with self._lock:
+            conn = self._connection()
+            previous = conn.execute("SELECT size FROM http_responses WHERE url = ?", (url,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO http_responses (url, host, status, headers, body, stored_at, fresh_until, stale_until, vary, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, self.host_for(url), status, json.dumps(headers), body, now, fresh_until, stale_until, json.dumps(vary), len(body), now)
+            )
+            self._total_bytes += len(body) - (previous[0] if previous else 0)
+            self._evict(conn)
+            conn.commit()
+        return True
+
+    def refresh(self, entry: CacheEntry, response_headers: dict) -> CacheEntry:
+        """Applies a 304 Not Modified: merges the new headers in and restarts the freshness clock."""
+        headers = dict(entry.headers)
+        for name, value in _storable(response_headers).items():
+            for existing in [key for key in headers if key.lower() == name.lower()]:
+                del headers[existing]
+            headers[name] = value
+        if _header(headers, "Date") is None or _header(response_headers, "Date") is None:
+            headers["Date"] = formatdate(usegmt=True)
+
+        now = time.time()
+        fresh_until, stale_until = self._expiry(headers, parse_cache_control(_header(headers, "Cache-Control")), now)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE http_responses SET headers = ?, stored_at = ?, fresh_until = ?, stale_until = ?, last_access = ? WHERE url = ?",
+                (json.dumps(headers), now, fresh_until, stale_until, now, entry.url)
+            )
+            conn.commit()
+        return CacheEntry(entry.url, entry.status, headers, entry.body, now, fresh_until, stale_until, entry.vary)
+
+    def record(self, url: str, outcome: str, bytes_saved: int = 0):
+        """Counts a lookup outcome for the URL's host: "hit", "revalidated", "stale" or "miss"."""
+        with self._lock:
+            stats = self._host_stats.setdefault(self.host_for(url), {"hits": 0, "revalidated": 0, "stale": 0, "misses": 0, "bytes_saved": 0})
+            stats[_OUTCOME_COUNTERS[outcome]] += 1
+            stats["bytes_saved"] += bytes_saved
+
+    def stats(self) -> dict:
+        with self._lock:
+            hosts = {}
+            for host, stats in self._host_stats.items():
+                stats = dict(stats)
+                served = stats["hits"] + stats["revalidated"] + stats["stale"]
+                lookups = served + stats["misses"]
+                stats["hit_ratio"] = round(served / lookups, 4) if lookups else 0.0
+                hosts[host] = stats
+            return {"hosts": hosts, "total_bytes": self._total_bytes, "evictions": self._evictions}
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM http_responses")
+            conn.commit()
+            self._total_bytes = 0
+            self._host_stats.clear()
+
+    @staticmethod
+    def host_for(url: str) -> str:
+        host = (urlsplit(url).hostname or "").lower()
+        return host[4:] if host.startswith("www.") else host
+
+    def _expiry(self, headers: dict, cache_control: dict, now: float) -> tuple[float, float]:
+        date = _http_date(_header(headers, "Date")) or now
+        age = _seconds(_header(headers, "Age")) or 0.0
+
+        if "no-cache" in cache_control:
+            lifetime = 0.0
+        elif _seconds(cache_control.get("max-age")) is not None:
+            lifetime = _seconds(cache_control["max-age"])
+        elif _header(headers, "Expires") is not None:
+            expires = _http_date(_header(headers, "Expires"))
+            lifetime = max(0.0, expires - date) if expires else 0.0
+        elif _http_date(_header(headers, "Last-Modified")):
+            lifetime = min(HEURISTIC_MAX_AGE, max(0.0, date - _http_date(_header(headers, "Last-Modified"))) * HEURISTIC_FRACTION)
+        else:
+            lifetime = 0.0
+
+        fresh_until = now + max(0.0, lifetime - age)
+        if "must-revalidate" in cache_control:
+            return fresh_until, fresh_until
+        stale_window = _seconds(cache_control.get("stale-if-error"))
+        return fresh_until, fresh_until + (self.stale_if_error if stale_window is None else stale_window)
+
+    def _evict(self, conn: sqlite3.Connection):
+        while self._total_bytes > self.max_bytes:
+            rows = conn.execute("SELECT url, size FROM http_responses ORDER BY last_access LIMIT 64").fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for url, size in rows:
+                conn.execute("DELETE FROM http_responses WHERE url = ?", (url,))
+                self._total_bytes -= size
+                self._evictions += 1
+                if self._total_bytes <= self.max_bytes:
+                    return
+
+    def _connection(self) -> sqlite3.Connection:
+        # Callers must hold self._lock
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS http_responses (
+                    url TEXT PRIMARY KEY,
+                    host TEXT NOT NULL,
+                    status INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    stored_at REAL NOT NULL,
+                    fresh_until REAL NOT NULL,
+                    stale_until REAL NOT NULL,
+                    vary TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS http_responses_last_access ON http_responses (last_access)")
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_responses").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+http_cache = HttpCache()
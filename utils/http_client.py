@@ -1,32 +1,379 @@
+import asyncio
 import requests
 from requests.adapters import HTTPAdapter
+from requests.models import PreparedRequest
+from requests.structures import CaseInsensitiveDict
 from urllib3.util.retry import Retry
+from utils.rate_limiter import rate_limiter
+from utils.http_cache import HttpCache, http_cache
+
+# httpx is optional: it provides the native async client and the HTTP/2 transport
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Failures of the network or the remote host, as opposed to bugs in the caller
+NETWORK_ERRORS = (requests.exceptions.RequestException, ConnectionError, TimeoutError) + ((httpx.HTTPError,) if httpx is not None else ())
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+STREAM_MAX_BYTES = 2 * 1024 * 1024
+# How far before the newly read bytes `fetch_streaming`'s predicate is told to resume, so a
+# marker split between two reads is still found
+STOP_WHEN_OVERLAP = 64
+
+# Connection settings of clients that don't pass their own; applications change the
+# shared client's with `HttpClient.configure`
+DEFAULT_POOL_CONNECTIONS = 20
+DEFAULT_POOL_MAXSIZE = 20
+DEFAULT_TIMEOUT = 10
+DEFAULT_KEEP_ALIVE = True
+DEFAULT_KEEP_ALIVE_EXPIRY = 30.0
+DEFAULT_HTTP2 = False
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+class StreamedPage:
+    """
+    The part of a response body read by `HttpClient.fetch_streaming`. `complete` is False
+    when reading stopped at the byte cap or because the caller's predicate was met.
+    """
+
+    def __init__(self, url: str, status_code: int, headers, content: bytes, complete: bool):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.complete = complete
+
+    @property
+    def encoding(self) -> str:
+        return requests.utils.get_encoding_from_headers(self.headers) or "utf-8"
+
+    @property
+    def text(self) -> str:
+        # A cut-off body may end inside a multi-byte character
+        try:
+            return self.content.decode(self.encoding, errors="replace")
+        except LookupError:
+            return self.content.decode("utf-8", errors="replace")
 
 class HttpClient:
-    def __init__(self):
+    """
+    Connection-pooled HTTP client shared by the `scrapers` package and the
+    `src/agent/sources` scrapers, so repeated requests to a host reuse warm
+    TCP/TLS connections instead of handshaking every time.
+
+    The sync interface uses a `requests.Session`, or an `httpx.Client` when `http2`
+    is enabled and `httpx[http2]` is installed. The async interface uses an
+    `httpx.AsyncClient` when httpx is installed and otherwise runs the sync client
+    in a worker thread. Both paths go through the shared rate limiter.
+
+    With a `cache`, fresh cached responses are served without touching the network,
+    stale ones are revalidated with a conditional request, and cached responses stand
+    in for the upstream when it fails.
+    """
+
+    def __init__(self, pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE, timeout: float = DEFAULT_TIMEOUT, keep_alive: bool = DEFAULT_KEEP_ALIVE, keep_alive_expiry: float = DEFAULT_KEEP_ALIVE_EXPIRY, http2: bool = DEFAULT_HTTP2, cache: HttpCache = None, max_retries: int = 3):
+        """
+        Args:
+            pool_connections: Number of per-host connection pools kept.
+            pool_maxsize: Maximum connections kept open per host.
+            timeout: Request timeout in seconds.
+            keep_alive: Reuse connections between requests.
+            keep_alive_expiry: Seconds an idle connection is kept (httpx transports only).
+            http2: Use HTTP/2 where the server supports it. Requires `httpx[http2]`.
+            cache: Response cache for GET requests. None disables caching.
+            max_retries: Retries on connection errors and 5xx answers (requests transport only).
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.keep_alive_expiry = keep_alive_expiry
+        self.cache = cache
+        self.max_retries = max_retries
+        self.http2 = self._use_http2(http2)
+
         self.session = self._create_session()
+        # An AsyncClient is bound to the loop it was first used on, so each loop gets its own
+        self._async_clients = {}
+        # Clients created before `configure` changed the settings, closed on their loop's next request
+        self._outdated_async_clients = {}
+
+    def configure(self, pool_connections: int = None, pool_maxsize: int = None, timeout: float = None, keep_alive: bool = None, keep_alive_expiry: float = None, http2: bool = None):
+        """
+        Changes the connection settings given (see `__init__`) and leaves the others as they
+        are, e.g. to apply an application's configuration to the shared `http_client`. The
+        sync client is recreated at once and the async ones on their next request.
+        """
+        for name, value in (("pool_connections", pool_connections), ("pool_maxsize", pool_maxsize), ("timeout", timeout), ("keep_alive", keep_alive), ("keep_alive_expiry", keep_alive_expiry)):
+            if value is not None:
+                setattr(self, name, value)
+        if http2 is not None:
+            self.http2 = self._use_http2(http2)
+
+        session, self.session = self.session, self._create_session()
+        session.close()
+        self._outdated_async_clients.update(self._async_clients)
+        self._async_clients = {}
 
     def _create_session(self):
+        if self.http2:
+            return httpx.Client(http2=True, headers=self._default_headers(), limits=self._httpx_limits(), timeout=self.timeout, follow_redirects=True)
+
         session = requests.Session()
-        session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        })
+        session.headers.update(self._default_headers())
 
-        retries = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-        adapter = HTTPAdapter(max_retries=retries)
+        retries = Retry(total=self.max_retries, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize, max_retries=retries)
 
         session.mount("http://", adapter)
         session.mount("https://", adapter)
 
         return session
 
-    def get(self, url: str, params: dict = None) -> requests.Response:
+    def get(self, url: str, params: dict = None, headers: dict = None) -> requests.Response:
+        """
+        Fetches a URL. Returns None on network errors and error statuses. With the HTTP/2
+        transport the response is an `httpx.Response`, which offers the same basics
+        (`status_code`, `headers`, `text`, `content`).
+        """
+        url = self._full_url(url, params)
+        entry = self._cached(url, headers)
+        if entry is not None and entry.is_fresh():
+            self.cache.record(url, "hit", len(entry.body))
+            return self._build_response(entry)
+
         try:
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching URL: {url}. Error: {e}")
+            rate_limiter.acquire(url)
+            request_headers = self._with_validators(headers, entry)
+            if self.http2:
+                response = self.session.get(url, headers=request_headers)
+            else:
+                response = self.session.get(url, headers=request_headers, timeout=self.timeout)
+            return self._handle_response(url, headers, entry, response)
+        except self._errors() as e:
+            return self._handle_error(url, entry, e)
+
+    async def aget(self, url: str, params: dict = None, headers: dict = None):
+        """Async variant of `get`; never blocks the event loop."""
+        if httpx is None:
+            return await asyncio.to_thread(self.get, url, params, headers)
+
+        url = self._full_url(url, params)
+        entry = self._cached(url, headers)
+        if entry is not None and entry.is_fresh():
+            self.cache.record(url, "hit", len(entry.body))
+            return self._build_response(entry, as_httpx=True)
+
+        try:
+            await rate_limiter.acquire_async(url)
+            client = await self._get_async_client()
+            response = await client.get(url, headers=self._with_validators(headers, entry))
+            return self._handle_response(url, headers, entry, response, as_httpx=True)
+        except self._errors() as e:
+            return self._handle_error(url, entry, e, as_httpx=True)
+
+    def fetch_streaming(self, url: str, max_bytes: int = STREAM_MAX_BYTES, stop_when=None, content_types: tuple = HTML_CONTENT_TYPES, headers: dict = None, chunk_size: int = 16 * 1024) -> StreamedPage:
+        """
+        Reads a response body in chunks and stops as soon as `max_bytes` have been read or
+        `stop_when(body_so_far, start)` returns True, so callers that only need the top of a
+        page don't download or decode the rest. `start` is where the bytes read since the
+        previous call begin, less `STOP_WHEN_OVERLAP`; predicates search from there rather
+        than rescanning the whole body after every chunk. Responses whose Content-Type is not one of
+        `content_types` are rejected before any of the body is read (pass None to accept all).
+        Returns None on errors. Only complete bodies are stored in the cache.
+        """
+        entry = self._cached(url, headers)
+        if entry is not None and entry.is_fresh():
+            self.cache.record(url, "hit", len(entry.body))
+            return self._page_from_entry(entry, max_bytes, content_types)
+
+        try:
+            rate_limiter.acquire(url)
+            with self._open_stream(url, self._with_validators(headers, entry)) as response:
+                if response.status_code == 304 and entry is not None:
+                    entry = self.cache.refresh(entry, response.headers)
+                    self.cache.record(url, "revalidated", len(entry.body))
+                    return self._page_from_entry(entry, max_bytes, content_types)
+
+                response.raise_for_status()
+                if self.cache is not None:
+                    self.cache.record(url, "miss")
+                if not self._accepts(response.headers, content_types):
+                    print(f"Skipping {url}: unexpected content type {response.headers.get('Content-Type')!r}.")
+                    return None
+
+                chunks = response.iter_bytes(chunk_size) if self.http2 else response.iter_content(chunk_size)
+                content, complete = self._read_until(chunks, max_bytes, stop_when)
+                status_code, response_headers = response.status_code, response.headers
+        except self._errors() as e:
+            entry = self._stale_fallback(url, entry, e)
+            return self._page_from_entry(entry, max_bytes, content_types) if entry is not None else None
+
+        if complete and self.cache is not None:
+            self.cache.store(url, status_code, response_headers, content, self._request_headers(headers))
+        return StreamedPage(url, status_code, response_headers, content, complete)
+
+    def close(self):
+        self.session.close()
+
+    async def aclose(self):
+        """Closes the async client of the running loop, and any left by loops that have closed."""
+        loop = asyncio.get_running_loop()
+        for clients in (self._async_clients, self._outdated_async_clients):
+            client = clients.pop(loop, None)
+            if client is not None:
+                await client.aclose()
+        await self._close_stale_async_clients()
+
+    def _cached(self, url: str, headers: dict):
+        if self.cache is None:
+            return None
+        return self.cache.lookup(url, self._request_headers(headers))
+
+    def _with_validators(self, headers: dict, entry) -> dict:
+        if entry is None:
+            return headers
+        return {**entry.conditional_headers(), **(headers or {})}
+
+    def _handle_response(self, url: str, headers: dict, entry, response, as_httpx: bool = False):
+        if response.status_code == 304 and entry is not None:
+            entry = self.cache.refresh(entry, response.headers)
+            self.cache.record(url, "revalidated", len(entry.body))
+            return self._build_response(entry, as_httpx)
+
+        response.raise_for_status()
+        if self.cache is not None:
+            self.cache.record(url, "miss")
+            self.cache.store(url, response.status_code, response.headers, response.content, self._request_headers(headers))
+        return response
+
+    def _handle_error(self, url: str, entry, error: Exception, as_httpx: bool = False):
+        entry = self._stale_fallback(url, entry, error)
+        return self._build_response(entry, as_httpx) if entry is not None else None
+
+    def _stale_fallback(self, url: str, entry, error: Exception):
+        # Stale content stands in for server and network failures, not for 4xx answers
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        if entry is not None and (status is None or status >= 500) and entry.usable_on_error():
+            print(f"Serving stale cached response for {url} after error: {error}")
+            self.cache.record(url, "stale", len(entry.body))
+            return entry
+        if self.cache is not None:
+            self.cache.record(url, "miss")
+        print(f"Error fetching URL: {url}. Error: {error}")
+        return None
+
+    def _open_stream(self, url: str, headers: dict):
+        if self.http2:
+            return self.session.stream("GET", url, headers=headers)
+        return self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+
+    @staticmethod
+    def _read_until(chunks, max_bytes: int, stop_when) -> tuple[bytes, bool]:
+        body = bytearray()
+        for chunk in chunks:
+            start = max(0, len(body) - STOP_WHEN_OVERLAP)
+            body += chunk
+            if len(body) >= max_bytes:
+                return bytes(body[:max_bytes]), False
+            if stop_when is not None and stop_when(body, start):
+                return bytes(body), False
+        return bytes(body), True
+
+    def _page_from_entry(self, entry, max_bytes: int, content_types: tuple) -> StreamedPage:
+        if not self._accepts(entry.headers, content_types):
             return None
+        return StreamedPage(entry.url, entry.status, entry.headers, entry.body[:max_bytes], len(entry.body) <= max_bytes)
+
+    @staticmethod
+    def _accepts(headers, content_types: tuple) -> bool:
+        if not content_types:
+            return True
+        media_type = CaseInsensitiveDict(headers).get("Content-Type", "").split(";")[0].strip().lower()
+        # A missing Content-Type is let through; the body is still capped
+        return not media_type or media_type in content_types
+
+    def _build_response(self, entry, as_httpx: bool = False):
+        # Cached responses take the same type as the transport would have returned
+        if as_httpx or self.http2:
+            return httpx.Response(entry.status, headers=entry.headers, content=entry.body, request=httpx.Request("GET", entry.url))
+        response = requests.Response()
+        response.status_code = entry.status
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response._content = entry.body
+        response.url = entry.url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def _request_headers(self, headers: dict) -> dict:
+        return {**self._default_headers(), **(headers or {})}
+
+    @staticmethod
+    def _full_url(url: str, params: dict) -> str:
+        if not params:
+            return url
+        prepared = PreparedRequest()
+        prepared.prepare_url(url, params)
+        return prepared.url
+
+    async def _get_async_client(self):
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            outdated = self._outdated_async_clients.pop(loop, None)
+            if outdated is not None:
+                await outdated.aclose()
+            client = httpx.AsyncClient(http2=self.http2, headers=self._default_headers(), limits=self._httpx_limits(), timeout=self.timeout, follow_redirects=True)
+            self._async_clients[loop] = client
+            await self._close_stale_async_clients()
+        return client
+
+    async def _close_stale_async_clients(self):
+        # Clients of loops that have since closed (e.g. one per asyncio.run call)
+        for clients in (self._async_clients, self._outdated_async_clients):
+            for loop in [loop for loop in list(clients) if loop.is_closed()]:
+                client = clients.pop(loop, None)
+                if client is None:
+                    continue
+                try:
+                    await client.aclose()
+                except RuntimeError:
+                    # Connections still tied to the closed loop can't be closed gracefully
+                    pass
+
+    def _default_headers(self) -> dict:
+        headers = {"User-Agent": DEFAULT_USER_AGENT}
+        if not self.keep_alive:
+            headers["Connection"] = "close"
+        return headers
+
+    def _httpx_limits(self):
+        return httpx.Limits(
+            max_connections=self.pool_connections * self.pool_maxsize,
+            max_keepalive_connections=self.pool_maxsize if self.keep_alive else 0,
+            keepalive_expiry=self.keep_alive_expiry
+        )
+
+    def _errors(self) -> tuple:
+        return NETWORK_ERRORS
+
+    def _use_http2(self, http2: bool) -> bool:
+        if http2 and not self._http2_available():
+            print("HTTP/2 requested but httpx[http2] is not installed; falling back to HTTP/1.1.")
+            return False
+        return http2
+
+    @staticmethod
+    def _http2_available() -> bool:
+        if httpx is None:
+            return False
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            return False
 
-http_client = HttpClient()
+http_client = HttpClient(cache=http_cache)
@@ -0,0 +1,285 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+class JobManagerClosedError(Exception):
+    """Raised when a job is submitted to a manager that has been closed."""
+
+class JobManager:
+    """
+    Runs long scrape pipelines in the background on a bounded worker pool.
+
+    Jobs are recorded in a local SQLite table so their status and results survive
+    the request that created them. Handlers are registered per job kind and receive
+    the job's params dict; whatever JSON-serializable value they return becomes
+    the job's result.
+
+    Several managers (e.g. one per server process) can share a table. Each records
+    itself in it and keeps a heartbeat there, and each job records the manager that
+    runs it. Unfinished jobs are only failed once their manager is gone: closed, its
+    process has exited, or its heartbeat has stopped. Finished jobs are deleted once
+    they are older than `job_ttl`.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+    def __init__(self, db_path: str = "jobs.sqlite3", max_workers: int = 4, max_queued: int = 100,
+                 heartbeat_interval: float = 10.0, job_ttl: float = None):
+        """
+        Args:
+            db_path: Location of the SQLite job table.
+            max_workers: Number of jobs executed at the same time.
+            max_queued: Maximum number of jobs waiting for a worker before submissions are refused.
+            heartbeat_interval: Seconds between heartbeats. A manager that has missed three
+                is considered gone, and so are its unfinished jobs.
+            job_ttl: Seconds finished jobs and their results are kept; None keeps them forever.
+        """
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.heartbeat_interval = heartbeat_interval
+        self.job_ttl = job_ttl
+        self.instance_id = uuid.uuid4().hex
+        self._stopped = threading.Event()
+        self._handlers = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        self._executor = None
+
+    def register(self, kind: str, handler):
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, params: dict) -> dict:
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+
+        with self._lock:
+            # Checked before the job is recorded, so a refused job leaves no row behind
+            if self._stopped.is_set():
+                raise JobManagerClosedError("The job manager is shutting down. Try again later.")
+            conn = self._connection()
+            queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (self.QUEUED,)).fetchone()[0]
+            if queued >= self.max_queued:
+                raise JobQueueFullError(f"Job queue is full ({queued} jobs waiting). Try again later.")
+
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, kind, params, status, owner, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params), self.QUEUED, self.instance_id, time.time())
+            )
+            conn.commit()
+            self._futures[job_id] = self._executor.submit(self._execute, job_id)
+
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT id, kind, params, status, error, cancel_requested, created_at, started_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        return {
+            "job_id": row[0],
+            "kind": row[1],
+            "params": json.loads(row[2]),
+            "status": row[3],
+            "error": row[4],
+            "cancel_requested": bool(row[5]),
+            "created_at": row[6],
+            "started_at": row[7],
+            "finished_at": row[8],
+        }
+
+    def result(self, job_id: str):
+        """Returns the stored result of a succeeded job, or None if there is none."""
+        with self._lock:
+            row = self._connection().execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def cancel(self, job_id: str) -> dict | None:
+        """
+        Cancels a job. Queued jobs are dropped immediately. A running job cannot be
+        interrupted; it is flagged and its result is discarded when it finishes.
+        """
+        job = self.get(job_id)
+        if job is None or job["status"] in self.FINISHED_STATUSES:
+            return job
+
+        with self._lock:
+            future = self._futures.get(job_id)
+            if future is not None and future.cancel():
+                self._finish(job_id, self.CANCELLED)
+                self._futures.pop(job_id, None)
+            else:
+                conn = self._connection()
+                conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+                conn.commit()
+
+        return self.get(job_id)
+
+    def close(self):
+        """
+        Stops the heartbeat and drops the jobs still waiting for a worker; later submissions
+        raise JobManagerClosedError. Unfinished jobs are failed by the next manager to start
+        on the table, without waiting for the heartbeat to go stale.
+        """
+        self._stopped.set()
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.execute("DELETE FROM job_instances WHERE id = ?", (self.instance_id,))
+            self._conn.commit()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _execute(self, job_id: str):
+        job = self.get(job_id)
+        try:
+            if job["cancel_requested"]:
+                with self._lock:
+                    self._finish(job_id, self.CANCELLED)
+                return
+
+            with self._lock:
+                conn = self._connection()
+                conn.execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ?", (self.RUNNING, time.time(), job_id))
+                conn.commit()
+
+            try:
+                result = self._handlers[job["kind"]](job["params"])
+            except Exception as e:
+                print(f"Job {job_id} failed: {type(e).__name__} - {e}")
+                with self._lock:
+                    self._finish(job_id, self.FAILED, error=f"{type(e).__name__}: {e}")
+                return
+
+            with self._lock:
+                cancel_requested = self._connection().execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+                if cancel_requested:
+                    self._finish(job_id, self.CANCELLED)
+                else:
+                    self._finish(job_id, self.SUCCEEDED, result=json.dumps(result))
+        finally:
+            with self._lock:
+                self._futures.pop(job_id, None)
+
+    def _finish(self, job_id: str, status: str, result: str = None, error: str = None):
+        # Callers must hold self._lock. A job already failed as interrupted stays failed.
+        conn = self._connection()
+        conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ? AND status IN (?, ?)",
+            (status, result, error, time.time(), job_id, self.QUEUED, self.RUNNING)
+        )
+        conn.commit()
+
+    def _heartbeat(self):
+        while not self._stopped.wait(self.heartbeat_interval):
+            try:
+                with self._lock:
+                    if not self._stopped.is_set():
+                        self._beat(self._conn)
+            except sqlite3.Error as e:
+                print(f"Job heartbeat failed: {type(e).__name__} - {e}")
+
+    def _beat(self, conn: sqlite3.Connection):
+        """Records that this manager is alive, then fails the jobs of managers that are gone and purges expired jobs."""
+        # Callers must hold self._lock
+        now = time.time()
+        host = socket.gethostname()
+        conn.execute(
+            "INSERT OR REPLACE INTO job_instances (id, host, pid, heartbeat_at) VALUES (?, ?, ?, ?)",
+            (self.instance_id, host, os.getpid(), now)
+        )
+        stale = now - 3 * self.heartbeat_interval
+        gone = [
+            (instance_id,)
+            for instance_id, instance_host, pid, heartbeat_at in conn.execute("SELECT id, host, pid, heartbeat_at FROM job_instances")
+            if heartbeat_at < stale or (instance_host == host and not _process_exists(pid))
+        ]
+        conn.executemany("DELETE FROM job_instances WHERE id = ?", gone)
+        # Jobs stored before owners were recorded have none
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status IN (?, ?) "
+            "AND (owner IS NULL OR owner NOT IN (SELECT id FROM job_instances))",
+            (self.FAILED, "Interrupted: the process running it exited.", now, self.QUEUED, self.RUNNING)
+        )
+        if self.job_ttl is not None:
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND finished_at < ?",
+                (*self.FINISHED_STATUSES, now - self.job_ttl)
+            )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened lazily so importing an app does not create files or threads
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            """)
+            # Tables created before jobs recorded their manager
+            if "owner" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+            # Managers using the table, so jobs are only failed once the one running them is gone
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_instances (
+                    id TEXT PRIMARY KEY,
+                    host TEXT NOT NULL,
+                    pid INTEGER NOT NULL,
+                    heartbeat_at REAL NOT NULL
+                )
+            """)
+            self._beat(conn)
+            self._conn = conn
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+            threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True).start()
+        return self._conn
+
+def _process_exists(pid: int) -> bool:
+    if os.name != "posix":
+        # Signal 0 only probes on POSIX; elsewhere rely on the heartbeat
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
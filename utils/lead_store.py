@@ -0,0 +1,274 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from utils.export import stream_export, write_file
+
+_DIGEST_MODULUS = 2 ** 256
+
+class LeadStore:
+    """
+    Store of scraped leads in a local SQLite database (WAL mode), used as the system of
+    record instead of Excel files.
+
+    Each lead is kept as JSON with its fields in their original order, alongside indexed
+    copies of the fields leads are looked up by. Leads can be grouped by a run id, and
+    given a dedupe key so that a newer lead replaces the one stored under the same key.
+    Excel, CSV and NDJSON files are exports of the store, generated when they are asked
+    for by streaming the records out of the database, so exporting takes the same
+    memory however many leads there are. The store and each run have a content digest
+    (see `digest`) that exports can be cached under.
+    """
+
+    # Indexed column -> record fields it is filled from, in order of preference. Agent
+    # leads use company/source, backend results business_name/platform.
+    INDEXED_FIELDS = {
+        "website": ("website",),
+        "company": ("company", "business_name"),
+        "city": ("city",),
+        "source": ("source", "platform"),
+    }
+
+    def __init__(self, db_path: str = "leads.sqlite3"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def append(self, records: List[dict], run_id: str = None, keys: List[Optional[int]] = None) -> int:
+        """
+        Stores `records` in order and returns how many were added. When `keys` is given,
+        the newest record wins: one whose key is already stored replaces the stored
+        record in its place, and of records repeating a key only the last is kept. A
+        None key never matches.
+        """
+        now = time.time()
+        rows = []
+        last = {key: position for position, key in enumerate(keys or ()) if key is not None}
+        for position, record in enumerate(records):
+            key = keys[position] if keys is not None else None
+            if key is not None and last[key] != position:
+                continue
+            indexed = [self._indexed_value(record, column) for column in self.INDEXED_FIELDS]
+            rows.append((run_id, key, *indexed, now, json.dumps(record, default=str)))
+        if not rows:
+            return 0
+
+        columns = ", ".join(self.INDEXED_FIELDS)
+        placeholders = ", ".join("?" * (len(self.INDEXED_FIELDS) + 4))
+        assignments = ", ".join(f"{column} = ?" for column in ("run_id", *self.INDEXED_FIELDS, "created_at", "data"))
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                # Takes the write lock before reading MAX(id), so no other process can
+                # insert between the read and our rows
+                conn.execute("BEGIN IMMEDIATE")
+                last_id = conn.execute("SELECT IFNULL(MAX(id), 0) FROM leads").fetchone()[0]
+                stored = self._stored_keys(conn, [row[1] for row in rows if row[1] is not None])
+                inserts, updates, changes = [], [], {}
+                for row in rows:
+                    if row[1] not in stored:
+                        inserts.append(row)
+                        continue
+                    lead_id, stored_run_id, data = stored[row[1]]
+                    if (stored_run_id, data) != (run_id or "", row[-1]):
+                        updates.append((row[0], *row[2:], lead_id))
+                        _tally(changes, lead_id, stored_run_id, data, -1)
+                        _tally(changes, lead_id, run_id or "", row[-1], 1)
+                conn.executemany(f"INSERT INTO leads (run_id, dedupe_key, {columns}, created_at, data) VALUES ({placeholders})", inserts)
+                conn.executemany(f"UPDATE leads SET {assignments} WHERE id = ?", updates)
+                conn.executemany(
+                    "INSERT OR IGNORE INTO lead_fields (run_id, name) VALUES (?, ?)",
+                    dict.fromkeys((row[0] or "", name) for row in updates for name in json.loads(row[-2])),
+                )
+                return self._describe_leads_after(conn, last_id, changes)
+
+    def find(self, run_id: str = None, limit: int = None, **filters) -> List[dict]:
+        """Stored records in insertion order, filtered by run and by indexed fields (case-insensitive)."""
+        return list(self.iter_records(run_id, limit, **filters))
+
+    def iter_records(self, run_id: str = None, limit: int = None, **filters) -> Iterator[dict]:
+        """
+        Like `find`, but yields the records as they are read. Reads go through their own
+        connection, so they see the store as it was when iteration started and don't
+        hold up writers while the caller works through the records.
+        """
+        where, params = self._where(run_id, filters)
+        sql = f"SELECT data FROM leads{where} ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            self._connection()
+
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            for (data,) in conn.execute(sql, params):
+                yield json.loads(data)
+        finally:
+            conn.close()
+
+    def fields(self, run_id: str = None, **filters) -> List[str]:
+        """Field names of the matching records, in the order they were first stored."""
+        where, params = self._where(run_id, filters)
+        sql = f"""
+            SELECT name FROM lead_fields
+            WHERE run_id IN (SELECT DISTINCT IFNULL(run_id, '') FROM leads{where})
+            GROUP BY name ORDER BY MIN(rowid)
+        """
+        with self._lock:
+            return [name for (name,) in self._connection().execute(sql, params)]
+
+    def count(self, run_id: str = None, **filters) -> int:
+        where, params = self._where(run_id, filters)
+        with self._lock:
+            return self._connection().execute(f"SELECT COUNT(*) FROM leads{where}", params).fetchone()[0]
+
+    def digest(self, run_id: str = None) -> Optional[str]:
+        """
+        Content digest of the run's leads, or of the whole store without a run id; None
+        if there are none. It only depends on the stored records and their ids, which
+        give their order, so it changes exactly when an export of them would.
+        """
+        with self._lock:
+            row = self._connection().execute("SELECT digest FROM lead_digests WHERE scope = ?", (run_id or "",)).fetchone()
+        return row[0] if row else None
+
+    def stream_export(self, fmt: str = "xlsx", run_id: str = None, **filters) -> Iterator[bytes]:
+        """
+        Yields an export of the matching records in `fmt` (see `EXPORT_FORMATS`) in
+        chunks, as the records are read. Spreadsheet columns are every field the
+        records were stored with, in the order they first appeared.
+        """
+        return stream_export(self.iter_records(run_id, **filters), self.fields(run_id, **filters), fmt)
+
+    def export(self, path: str, fmt: str = "xlsx", run_id: str = None, **filters) -> int:
+        """
+        Writes the matching records to `path` in `fmt` and returns how many were written.
+        Nothing is written if none match. The file is replaced atomically, so a download
+        never sees a half-written export.
+        """
+        count = self.count(run_id, **filters)
+        if count:
+            write_file(path, self.stream_export(fmt, run_id, **filters))
+        return count
+
+    def export_excel(self, path: str, run_id: str = None, **filters) -> int:
+        return self.export(path, "xlsx", run_id, **filters)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _indexed_value(self, record: dict, column: str) -> Optional[str]:
+        for field in self.INDEXED_FIELDS[column]:
+            value = record.get(field)
+            if value is not None and value == value:
+                return str(value)
+        return None
+
+    def _where(self, run_id: Optional[str], filters: dict):
+        clauses, params = [], []
+        if run_id is not None:
+            clauses.append("run_id = ?")
+            params.append(run_id)
+        for column, value in filters.items():
+            if column not in self.INDEXED_FIELDS:
+                raise ValueError(f"Cannot filter leads by '{column}'. Indexed fields: {', '.join(self.INDEXED_FIELDS)}.")
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(str(value))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _stored_keys(self, conn: sqlite3.Connection, keys: List[int]) -> dict:
+        """Dedupe key -> (id, run id, JSON) of the stored leads with one of `keys`."""
+        stored = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            sql = f"SELECT dedupe_key, id, IFNULL(run_id, ''), data FROM leads WHERE dedupe_key IN ({', '.join('?' * len(chunk))})"
+            stored.update((key, rest) for key, *rest in conn.execute(sql, chunk))
+        return stored
+
+    def _describe_leads_after(self, conn: sqlite3.Connection, last_id: int, changes: Dict[str, Tuple[int, int]] = None) -> int:
+        """
+        Records the field names of the leads stored after `last_id` and adds them to the
+        digests, along with the `changes` (see `_tally`) of leads replaced in place;
+        returns how many leads were added. Each digest is the sum of its leads' hashes,
+        so it is updated by what changed rather than recomputed from every lead.
+        """
+        changes = dict(changes or {})
+        fields = {}
+        added = 0
+        for lead_id, run_id, data in conn.execute("SELECT id, IFNULL(run_id, ''), data FROM leads WHERE id > ? ORDER BY id", (last_id,)):
+            added += 1
+            fields.update(dict.fromkeys((run_id, name) for name in json.loads(data)))
+            _tally(changes, lead_id, run_id, data, 1)
+        conn.executemany("INSERT OR IGNORE INTO lead_fields (run_id, name) VALUES (?, ?)", fields)
+        for scope, (total, leads) in changes.items():
+            row = conn.execute("SELECT digest, leads FROM lead_digests WHERE scope = ?", (scope,)).fetchone()
+            if row:
+                total, leads = total + int(row[0], 16), leads + row[1]
+            if leads:
+                conn.execute("INSERT OR REPLACE INTO lead_digests (scope, digest, leads) VALUES (?, ?, ?)", (scope, f"{total % _DIGEST_MODULUS:064x}", leads))
+            else:
+                # A run whose leads all moved to another run has no digest
+                conn.execute("DELETE FROM lead_digests WHERE scope = ?", (scope,))
+        return added
+
+    def _connection(self) -> sqlite3.Connection:
+        # Callers must hold self._lock
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS leads (
+                    id INTEGER PRIMARY KEY,
+                    run_id TEXT,
+                    dedupe_key INTEGER UNIQUE,
+                    website TEXT COLLATE NOCASE,
+                    company TEXT COLLATE NOCASE,
+                    city TEXT COLLATE NOCASE,
+                    source TEXT COLLATE NOCASE,
+                    created_at REAL NOT NULL,
+                    data TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS leads_run_id ON leads (run_id)")
+            for column in self.INDEXED_FIELDS:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS leads_{column} ON leads ({column})")
+            # Field names per run ('' for leads stored without one), in the order they
+            # were first stored, so exports know their columns without reading every lead
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS lead_fields (
+                    run_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    PRIMARY KEY (run_id, name)
+                )
+            """)
+            # Content digest of the whole store ('') and of each run, with how many leads it covers
+            if "leads" not in {row[1] for row in conn.execute("PRAGMA table_info(lead_digests)")}:
+                # Digests from before they were sums of lead hashes are recomputed below
+                conn.execute("DROP TABLE IF EXISTS lead_digests")
+            conn.execute("CREATE TABLE IF NOT EXISTS lead_digests (scope TEXT PRIMARY KEY, digest TEXT NOT NULL, leads INTEGER NOT NULL)")
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                # Stores written before field names and digests were recorded
+                if conn.execute("SELECT NOT EXISTS (SELECT 1 FROM lead_digests) AND EXISTS (SELECT 1 FROM leads)").fetchone()[0]:
+                    self._describe_leads_after(conn, 0)
+            self._conn = conn
+        return self._conn
+
+def _tally(changes: Dict[str, Tuple[int, int]], lead_id: int, run_id: str, data: str, sign: int):
+    """Adds (`sign` 1) or removes (-1) a lead's hash and count in the digests of its scopes."""
+    lead_hash = int.from_bytes(hashlib.sha256(f"{lead_id}\x1f{data}".encode("utf-8")).digest(), "big")
+    for scope in ("", run_id) if run_id else ("",):
+        total, leads = changes.get(scope, (0, 0))
+        changes[scope] = (total + sign * lead_hash, leads + sign)
@@ -0,0 +1,109 @@
+import asyncio
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+# requests per second, burst size
+DEFAULT_HOST_LIMITS = {
+    "google.com": (1.0, 4),
+    "duckduckgo.com": (1.0, 3),
+    "linkedin.com": (1.0, 3),
+    "instagram.com": (1.0, 5),
+    "facebook.com": (0.5, 2),
+}
+
+class TokenBucket:
+    """
+    A token bucket that hands out reservations: every call takes a token immediately,
+    going into debt if necessary, and is told how long to wait before using it. This
+    keeps concurrent callers (threads and coroutines alike) in a fair, shared order.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int = 1) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def block_for(self, seconds: float):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+class RateLimiter:
+    """
+    Per-host pacing shared by every scraper and the HTTP client.
+
+    Hosts are matched to the most specific configured domain (so `www.google.com` and
+    `maps.google.com` share the `google.com` budget); other hosts get their own bucket
+    with the default limits. Waits get a little random jitter so throttled callers
+    don't all fire at the same instant.
+    """
+
+    def __init__(self, host_limits: dict = None, default_rate: float = 2.0, default_burst: int = 5, jitter: float = 0.25):
+        self.host_limits = DEFAULT_HOST_LIMITS if host_limits is None else host_limits
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.jitter = jitter
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host_or_url: str, tokens: int = 1) -> float:
+        """Blocks until `tokens` requests to the host may be made. Returns the time waited."""
+        wait = self._reserve(host_or_url, tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, host_or_url: str, tokens: int = 1) -> float:
+        """Same as `acquire`, but waits without blocking the event loop."""
+        wait = self._reserve(host_or_url, tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def penalize(self, host_or_url: str, seconds: float):
+        """Holds back all requests to the host for `seconds`, e.g. after it started refusing us."""
+        self.bucket(host_or_url).block_for(seconds)
+
+    def reset(self):
+        """Forgets all buckets, restoring every host's full burst allowance."""
+        with self._lock:
+            self._buckets.clear()
+
+    def bucket(self, host_or_url: str) -> TokenBucket:
+        key = self.key_for(host_or_url)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                rate, burst = self.host_limits.get(key, (self.default_rate, self.default_burst))
+                bucket = TokenBucket(rate, burst)
+                self._buckets[key] = bucket
+            return bucket
+
+    def key_for(self, host_or_url: str) -> str:
+        host = urlsplit(host_or_url).hostname if "//" in host_or_url else host_or_url
+        host = (host or "").lower().rstrip(".")
+        if host.startswith("www."):
+            host = host[4:]
+        matches = [domain for domain in self.host_limits if host == domain or host.endswith("." + domain)]
+        return max(matches, key=len) if matches else host
+
+    def _reserve(self, host_or_url: str, tokens: int) -> float:
+        wait = self.bucket(host_or_url).reserve(tokens)
+        if wait > 0 and self.jitter:
+            wait += random.uniform(0, self.jitter)
+        return wait
+
+rate_limiter = RateLimiter()
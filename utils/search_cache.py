@@ -0,0 +1,188 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from duckduckgo_search import DDGS
+from utils.rate_limiter import rate_limiter
+
+def normalize_query(query: str) -> str:
+    """Lowercases a query and collapses whitespace so equivalent queries share a key."""
+    return " ".join(query.lower().split())
+
+class SearchCache:
+    """
+    Two-tier cache for search results: an in-memory LRU in front of a SQLite table.
+
+    Entries are keyed on the normalized query and `max_results` and expire after `ttl`
+    seconds. The memory tier is bounded by entry count, the disk tier by the total size
+    of the stored results; both evict the least recently used entries first.
+
+    Both tiers keep results as JSON, so every `get` returns a fresh copy that the caller
+    can change without affecting the cache or other callers.
+
+    Hits served from memory are recorded on disk too, so the disk tier doesn't evict
+    the entries in most use. To keep memory hits off the disk, their access times are
+    written in batches, at most every `touch_interval` seconds and before disk evictions.
+    """
+
+    def __init__(self, db_path: str = ".cache/search_cache.sqlite3", ttl: float = 24 * 3600, max_memory_entries: int = 512, max_disk_bytes: int = 64 * 1024 * 1024, touch_interval: float = 5.0):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.touch_interval = touch_interval
+        self._memory = OrderedDict()
+        # Key -> last access of memory hits not yet written to disk
+        self._touched = {}
+        self._touched_flushed_at = time.time()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._disk_bytes = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def get(self, query: str, max_results: int) -> list | None:
+        key = self._key(query, max_results)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, payload = entry
+                if now - stored_at < self.ttl:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    self._touched[key] = now
+                    if now - self._touched_flushed_at >= self.touch_interval:
+                        self._flush_touched(self._connection())
+                        self._conn.commit()
+                    return json.loads(payload)
+                del self._memory[key]
+
+            conn = self._connection()
+            row = conn.execute("SELECT stored_at, results, size FROM search_results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            stored_at, payload, size = row
+            if now - stored_at >= self.ttl:
+                conn.execute("DELETE FROM search_results WHERE key = ?", (key,))
+                conn.commit()
+                self._disk_bytes -= size
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            conn.execute("UPDATE search_results SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self._remember(key, stored_at, payload)
+            self._stats["disk_hits"] += 1
+            return json.loads(payload)
+
+    def set(self, query: str, max_results: int, results: list):
+        key = self._key(query, max_results)
+        now = time.time()
+        payload = json.dumps(results)
+        with self._lock:
+            self._remember(key, now, payload)
+            self._touched.pop(key, None)
+
+            conn = self._connection()
+            previous = conn.execute("SELECT size FROM search_results WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO search_results (key, stored_at, last_access, results, size) VALUES (?, ?, ?, ?, ?)",
+                (key, now, now, payload, len(payload))
+            )
+            self._disk_bytes += len(payload) - (previous[0] if previous else 0)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._flush_touched(conn)
+            self._evict_disk(conn)
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_ratio"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_bytes"] = self._disk_bytes
+            return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            conn = self._connection()
+            conn.execute("DELETE FROM search_results")
+            conn.commit()
+            self._disk_bytes = 0
+
+    def _key(self, query: str, max_results: int) -> str:
+        return f"{normalize_query(query)}\x1f{max_results}"
+
+    def _remember(self, key: str, stored_at: float, payload: str):
+        self._memory[key] = (stored_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _flush_touched(self, conn: sqlite3.Connection):
+        conn.executemany("UPDATE search_results SET last_access = ? WHERE key = ?", [(at, key) for key, at in self._touched.items()])
+        self._touched.clear()
+        self._touched_flushed_at = time.time()
+
+    def _evict_disk(self, conn: sqlite3.Connection):
+        while self._disk_bytes > self.max_disk_bytes:
+            rows = conn.execute("SELECT key, size FROM search_results ORDER BY last_access LIMIT 64").fetchall()
+            if not rows:
+                self._disk_bytes = 0
+                return
+            for key, size in rows:
+                conn.execute("DELETE FROM search_results WHERE key = ?", (key,))
+                self._disk_bytes -= size
+                self._stats["evictions"] += 1
+                if self._disk_bytes <= self.max_disk_bytes:
+                    return
+
+    def _connection(self) -> sqlite3.Connection:
+        # Callers must hold self._lock
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_results (
+                    key TEXT PRIMARY KEY,
+                    stored_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    results TEXT NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS search_results_last_access ON search_results (last_access)")
+            self._disk_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM search_results").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+search_cache = SearchCache()
+
+def cached_text_search(query: str, max_results: int) -> list[dict]:
+    """
+    `DDGS().text(query, max_results=...)` behind the shared search cache. Empty result
+    sets are not cached, since they are usually a sign of throttling.
+    """
+    results = search_cache.get(query, max_results)
+    if results is not None:
+        return results
+
+    rate_limiter.acquire("duckduckgo.com")
+    with DDGS() as ddgs:
+        results = [r for r in ddgs.text(query, max_results=max_results)]
+
+    if results:
+        search_cache.set(query, max_results, results)
+    return results
@@ -0,0 +1,98 @@
+import asyncio
+import copy
+import threading
+from concurrent.futures import Future
+
+class _Call:
+    def __init__(self, loop=None):
+        self.future = Future()
+        # Event loop running the work, for calls started by `ado`
+        self.loop = loop
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the work and
+    every caller that arrives while it is in flight waits for and receives the same
+    result (or exception). Nothing is cached once the call has finished. `do` and `ado`
+    share one table of calls, so a sync and an async caller with the same key also
+    share the work.
+
+    When several callers shared a call, each gets its own deep copy of the result, so
+    one caller mutating it can't affect another.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        call, leader = self._join(key)
+        if not leader:
+            if call.loop is not None and call.loop is _running_loop():
+                # The work runs on this thread's event loop, which waiting would block
+                return fn(*args, **kwargs)
+            return self._share(call, call.future.result(), leader)
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, call).set_exception(e)
+            raise
+        self._finish(key, call).set_result(result)
+        return self._share(call, result, leader)
+
+    async def ado(self, key, coro_fn):
+        """
+        Async variant of `do`. `coro_fn` is called without arguments and must return an
+        awaitable. Calls in flight on another thread or event loop are waited for without
+        blocking this one. A caller that is cancelled (e.g. its client disconnected)
+        does not cancel the shared work.
+        """
+        loop = asyncio.get_running_loop()
+        call, leader = self._join(key, loop)
+        if leader:
+            task = asyncio.ensure_future(coro_fn())
+            task.add_done_callback(lambda _: self._settle(key, call, task))
+        result = await asyncio.shield(asyncio.wrap_future(call.future))
+        return self._share(call, result, leader)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def _join(self, key, loop=None):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call(loop)
+                return call, True
+            call.waiters += 1
+            return call, False
+
+    def _finish(self, key, call: _Call) -> Future:
+        # Later callers start a new call rather than joining this one
+        with self._lock:
+            del self._calls[key]
+        return call.future
+
+    def _settle(self, key, call: _Call, task: asyncio.Task):
+        future = self._finish(key, call)
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def _share(self, call: _Call, result, leader: bool):
+        # Called once the call has finished, when no more callers can join it
+        return result if leader and not call.waiters else copy.deepcopy(result)
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+single_flight = SingleFlight()
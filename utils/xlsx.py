@@ -0,0 +1,184 @@
+"""
+Low-level XLSX helpers that write the workbook's XML directly, so rows can be written
+without holding the sheet in memory.
+"""
+import math
+import re
+import zipfile
+from typing import Iterable, Iterator, List
+from xml.sax.saxutils import escape
+from openpyxl.utils import get_column_letter
+
+_CHUNK_SIZE = 1024 * 1024
+# Characters XML 1.0 can't represent; openpyxl refuses them too
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Rows a worksheet can hold; longer exports continue on another sheet
+MAX_ROWS = 1048576
+# Characters a cell can hold; Excel refuses to open workbooks with longer ones
+MAX_CELL_CHARS = 32767
+
+# Fixed timestamp for the parts of streamed workbooks, so the same rows give the same bytes
+_PART_DATE = (1980, 1, 1, 0, 0, 0)
+_SHEET_START = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_END = b"</sheetData></worksheet>"
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_WORKSHEET_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+_STATIC_PARTS = {
+    "_rels/.rels": (
+        _XML_DECLARATION +
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/styles.xml": (
+        _XML_DECLARATION +
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+
+def cell_xml(column: int, row: int, value) -> str:
+    """
+    One `<c>` element; strings are written inline, so no shared-strings table is needed.
+    Infinite floats have no representation in a cell, so they are written as text.
+    Strings longer than a cell can hold are cut at `MAX_CELL_CHARS`.
+    """
+    ref = f"{get_column_letter(column)}{row}"
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, int) or (isinstance(value, float) and math.isfinite(value)):
+        return f'<c r="{ref}"><v>{value!r}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS.sub("", str(value))[:MAX_CELL_CHARS])
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def row_xml(row: int, values: Iterable) -> str:
+    """One `<row>` element; None and NaN values are left as empty cells."""
+    cells = "".join(cell_xml(column, row, value) for column, value in enumerate(values, start=1) if value is not None and value == value)
+    return f'<row r="{row}">{cells}</row>'
+
+def stream_xlsx(rows: Iterable[Iterable], header: bool = True, max_rows: int = MAX_ROWS) -> Iterator[bytes]:
+    """
+    Yields a workbook holding `rows`, piece by piece as the rows are consumed. Rows are
+    compressed straight into the archive, which is written front to back with the sizes
+    in data descriptors, so memory use is the same for ten rows or a million. The same
+    rows always give the same bytes.
+
+    A worksheet holds at most `max_rows` rows (Excel's limit), so the rows continue on
+    Sheet2, Sheet3 and so on. With `header`, the first row is the header and each
+    further sheet starts with a copy of it.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w") as archive:
+        sheets = 0
+        sheet = None
+        pending, size = [], 0
+        for number, row, values in _sheet_rows(rows, header, max_rows):
+            if number != sheets:
+                if sheet is not None:
+                    sheet.write("".join(pending).encode("utf-8") + _SHEET_END)
+                    sheet.close()
+                    pending, size = [], 0
+                sheets = number
+                sheet = _open_sheet(archive, number)
+            xml = row_xml(row, values)
+            pending.append(xml)
+            size += len(xml)
+            if size >= _CHUNK_SIZE:
+                sheet.write("".join(pending).encode("utf-8"))
+                pending, size = [], 0
+                yield from sink.drain()
+        if sheet is None:
+            sheets = 1
+            sheet = _open_sheet(archive, 1)
+        sheet.write("".join(pending).encode("utf-8") + _SHEET_END)
+        sheet.close()
+
+        # The parts listing the sheets come last, once it's known how many there are
+        for name, content in _workbook_parts(sheets).items():
+            archive.writestr(_part_info(name), content)
+    yield from sink.drain()
+
+def _sheet_rows(rows: Iterable[Iterable], header: bool, max_rows: int) -> Iterator[tuple]:
+    """(sheet number, row number, values) for each row to write."""
+    heading = None
+    sheet, number = 1, 0
+    for values in rows:
+        if number == max_rows:
+            sheet, number = sheet + 1, 0
+            if heading is not None:
+                number += 1
+                yield sheet, number, heading
+        if header and heading is None:
+            heading = values = list(values)
+        number += 1
+        yield sheet, number, values
+
+def _open_sheet(archive: zipfile.ZipFile, number: int):
+    # Sizes aren't known up front, so leave room for a sheet over 2 GiB
+    sheet = archive.open(_part_info(f"xl/worksheets/sheet{number}.xml"), "w", force_zip64=True)
+    sheet.write(_SHEET_START)
+    return sheet
+
+def _workbook_parts(sheets: int) -> dict:
+    numbers = range(1, sheets + 1)
+    return {
+        "[Content_Types].xml": (
+            _XML_DECLARATION +
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            + "".join(f'<Override PartName="/xl/worksheets/sheet{n}.xml" ContentType="{_WORKSHEET_TYPE}"/>' for n in numbers) +
+            '</Types>'
+        ),
+        **_STATIC_PARTS,
+        "xl/workbook.xml": (
+            _XML_DECLARATION +
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets>' + "".join(f'<sheet name="Sheet{n}" sheetId="{n}" r:id="rId{n}"/>' for n in numbers) + '</sheets>'
+            '</workbook>'
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            _XML_DECLARATION +
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + "".join(f'<Relationship Id="rId{n}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{n}.xml"/>' for n in numbers) +
+            f'<Relationship Id="rId{sheets + 1}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        ),
+    }
+
+class _ChunkSink:
+    """Write-only file object that collects what the archive writes until it is drained."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        if self._chunks:
+            data = b"".join(self._chunks)
+            self._chunks = []
+            yield data
+
+def _part_info(name: str) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, date_time=_PART_DATE)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o600 << 16
+    return info